@@ -151,3 +151,29 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 CORS_ALLOW_ALL_ORIGINS = True
 
 CORS_ALLOW_CREDENTIALS = True
+
+# Hilos del pool local que procesa la cola de reportes
+REPORTES_TRABAJADORES = 2
+
+# Segundos tras los que un trabajo en 'procesando' se considera abandonado y
+# `procesar_trabajos` lo vuelve a tomar
+REPORTES_TRABAJO_TIMEOUT = 30 * 60
+
+# Procesos que renderizan PDF y Excel en paralelo (formato 'ambos'); 0 usa hilos
+REPORTES_PROCESOS = 2
+
+# Tamaño máximo del caché de reportes en disco (MEDIA_ROOT/cache_reportes)
+REPORTES_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Los reportes generados se quedan en memoria hasta este tamaño; arriba pasan a disco
+REPORTES_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+# Horas locales (inicio, fin) en que `programar_reportes --continuo` pregenera
+# los reportes programados; el intervalo puede cruzar la medianoche
+REPORTES_HORARIO_PROGRAMADO = (22, 6)
+
+# Importar reportlab/openpyxl/pandas al arrancar (útil con gunicorn --preload)
+REPORTES_PRECARGAR = False
+
+# Instantáneas Parquet de las obras para análisis (requieren pyarrow)
+ANALITICA_DIR = os.path.join(MEDIA_ROOT, 'analitica')
@@ -7,24 +7,18 @@ The `urlpatterns` list routes URLs to views. For more information please see:
 #  Proyecto\POA_Reportes\backend\core/urls.py 
 
 from django.contrib import admin
-from django.urls import path
-from django.http import JsonResponse, HttpResponse
+from django.urls import path, include
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 import json
 from datetime import datetime
 from io import BytesIO
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch, cm
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-from openpyxl.utils import get_column_letter
-from collections import Counter
-import zipfile
+
+from backend.poa.cache_reportes import cachear_reporte
+from backend.poa.condicional import condicional
+
+# reportlab, openpyxl y el generador se importan dentro de cada función:
+# así cargar las URLs (cada arranque y cada manage.py) no los paga
 
 def health_check(request):
     return JsonResponse({
@@ -37,11 +31,13 @@ def health_check(request):
             'direcciones': '/api/direcciones/',
             'vista_previa': '/api/reportes/vista_previa/',
             'generar_reporte': '/api/reportes/generar/',
+            'territorial': '/api/reportes/territorial/',
             'admin': '/admin/'
         }
     })
 
 @csrf_exempt
+@condicional('direccion')
 def lista_direcciones(request):
     """Vista para listar direcciones"""
     try:
@@ -71,30 +67,39 @@ def lista_direcciones(request):
         })
 
 @csrf_exempt
+@condicional('obra', 'direccion', por_dia=True)
 def vista_previa_reporte(request):
     """Vista previa del reporte"""    
     try:
         fecha_corte = request.GET.get('fecha_corte', datetime.now().strftime('%Y-%m-%d'))
+        try:
+            fecha = datetime.strptime(fecha_corte, '%Y-%m-%d').date()
+        except ValueError:
+            fecha = datetime.now().date()
         
-        from backend.poa.models import Obra
-        from django.db.models import Sum, Count
-        
-        total_proyectos = Obra.objects.count()
-        
-        presupuesto_result = Obra.objects.aggregate(
-            total=Sum('presupuesto_modificado')
-        )
-        presupuesto_total = presupuesto_result['total'] or 0
+        try:
+            direcciones_ids = [int(d) for d in request.GET.getlist('direcciones[]')]
+        except ValueError:
+            direcciones_ids = []
         
-        obras_por_estado = dict(Obra.objects.values('estatus_general').annotate(
-            count=Count('id')
-        ).values_list('estatus_general', 'count'))
+        if direcciones_ids:
+            # El resumen no distingue direcciones: caché columnar filtrado
+            from backend.poa.cache_columnar import estadisticas_columnares
+            estadisticas = estadisticas_columnares(fecha, direcciones_ids)
+        else:
+            from backend.poa.resumen import estadisticas_resumen
+            
+            # Totales precalculados: no recorre la tabla de obras
+            estadisticas = estadisticas_resumen(fecha)
+        total_proyectos = estadisticas['total_obras']
+        presupuesto_total = estadisticas['presupuesto_total']
+        obras_por_estado = estadisticas['obras_por_estado']
         
         return JsonResponse({
             'success': True,
             'total_proyectos': total_proyectos,
             'presupuesto_total': float(presupuesto_total),
-            'beneficiarios_total': 5000,  # Valor por defecto
+            'beneficiarios_total': estadisticas['beneficiarios_total'],
             'obras_por_estado': obras_por_estado,
             'fecha_corte': fecha_corte
         })
@@ -110,12 +115,45 @@ def vista_previa_reporte(request):
             'note': 'Usando datos de ejemplo por error'
         })
 
+@csrf_exempt
+@condicional('obra', 'direccion', por_dia=True)
+def reporte_territorial_vista(request):
+    """Presupuesto, avance y beneficiarios por alcaldía a la fecha de corte"""
+    from backend.poa.territorio import reporte_territorial
+    
+    fecha_corte = request.GET.get('fecha_corte')
+    if fecha_corte:
+        try:
+            fecha = datetime.strptime(fecha_corte, '%Y-%m-%d').date()
+        except ValueError:
+            return JsonResponse({
+                'success': False,
+                'error': 'Formato de fecha inválido. Use YYYY-MM-DD'
+            }, status=400)
+    else:
+        fecha = datetime.now().date()
+    
+    try:
+        direcciones_ids = [int(d) for d in request.GET.getlist('direcciones[]')]
+    except ValueError:
+        direcciones_ids = []
+    
+    resultado = reporte_territorial(fecha, direcciones_ids)
+    resultado['fecha_corte'] = fecha.isoformat()
+    return JsonResponse(resultado)
+
 # ============================
 # FUNCIONES AUXILIARES PARA GENERAR REPORTES
 # ============================
 
 def _crear_pdf_ejecutivo(datos, fecha_corte):
     """Crea PDF para reporte ejecutivo"""
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import cm
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=A4,
                            rightMargin=2*cm, leftMargin=2*cm,
@@ -201,6 +239,9 @@ def _crear_pdf_ejecutivo(datos, fecha_corte):
 
 def _crear_excel_ejecutivo(datos, fecha_corte):
     """Crea Excel para reporte ejecutivo"""
+    from openpyxl import Workbook
+    from openpyxl.styles import Font, Alignment, PatternFill
+    from openpyxl.utils import get_column_letter
     wb = Workbook()
     ws = wb.active
     ws.title = "Reporte Ejecutivo"
@@ -271,8 +312,15 @@ def _crear_excel_ejecutivo(datos, fecha_corte):
 
 def _crear_pdf_cartera(datos, fecha_corte):
     """Crea PDF para cartera de proyectos"""
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Table, TableStyle, Paragraph, Spacer
+    from backend.poa.generador import DocumentoReporte, TablaPorBloques, tablas_por_bloques
     buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
+    doc = DocumentoReporte(buffer, pagesize=A4)
     
     styles = getSampleStyleSheet()
     contenido = []
@@ -304,24 +352,24 @@ def _crear_pdf_cartera(datos, fecha_corte):
         contenido.append(table)
         contenido.append(Spacer(1, 1*cm))
     
-    # Lista de proyectos
-    if datos.get('detalles'):
+    # Lista de proyectos (el queryset del detalle completo no se evalúa aquí)
+    if datos.get('detalle_completo') or datos.get('detalles'):
         contenido.append(Paragraph("LISTA DE PROYECTOS", styles['Heading3']))
         
-        table_data = [['ID', 'Proyecto', 'Área', 'Presupuesto', 'Avance', 'Estado']]
+        encabezado = ['ID', 'Proyecto', 'Área', 'Presupuesto', 'Avance', 'Estado']
+        anchos = [40, 150, 80, 80, 60, 60]
         
-        for obra in datos['detalles'][:30]:  # Limitar a 30 proyectos
-            table_data.append([
+        def fila(obra):
+            return [
                 str(obra.get('id_excel', obra.get('id', ''))),
                 obra.get('programa', '')[:30],
                 obra.get('area_responsable', '')[:15],
                 f"${float(obra.get('presupuesto_modificado', 0)):,.0f}",
                 f"{float(obra.get('avance_fisico_pct', 0)):.1f}%",
                 obra.get('estatus_general', '')[:10]
-            ])
+            ]
         
-        table = Table(table_data, colWidths=[40, 150, 80, 80, 60, 60])
-        table.setStyle(TableStyle([
+        estilo = TableStyle([
             ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2563eb')),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
             ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
@@ -331,9 +379,21 @@ def _crear_pdf_cartera(datos, fecha_corte):
             ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
             ('FONTSIZE', (0, 1), (-1, -1), 8),
             ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8fafc')]),
-        ]))
+        ])
         
-        contenido.append(table)
+        if datos.get('detalle_completo'):
+            # Todos los proyectos, leídos por lotes y dibujados en tablas por bloques
+            detalles = datos['detalles']
+            if hasattr(detalles, 'iterator'):
+                detalles = detalles.iterator(chunk_size=2000)
+            contenido.append(TablaPorBloques(
+                tablas_por_bloques(encabezado, (fila(obra) for obra in detalles), estilo, anchos=anchos)
+            ))
+        else:
+            table_data = [encabezado] + [fila(obra) for obra in datos['detalles'][:30]]  # Limitar a 30 proyectos
+            table = Table(table_data, colWidths=anchos)
+            table.setStyle(estilo)
+            contenido.append(table)
     
     doc.build(contenido)
     buffer.seek(0)
@@ -341,6 +401,8 @@ def _crear_pdf_cartera(datos, fecha_corte):
 
 def _crear_pdf_riesgos(datos, fecha_corte):
     """Crea PDF para análisis de riesgos"""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
     buffer = BytesIO()
     p = canvas.Canvas(buffer, pagesize=letter)
     
@@ -379,8 +441,118 @@ def _crear_pdf_riesgos(datos, fecha_corte):
     buffer.seek(0)
     return buffer
 
+def _crear_pdf_territorial(datos, fecha_corte):
+    """Crea PDF para impacto territorial (una fila por alcaldía)"""
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import cm
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=landscape(A4),
+                           rightMargin=1.5*cm, leftMargin=1.5*cm,
+                           topMargin=1.5*cm, bottomMargin=1.5*cm)
+    
+    styles = getSampleStyleSheet()
+    titulo_style = ParagraphStyle(
+        'TituloPrincipal',
+        parent=styles['Heading1'],
+        fontSize=18,
+        spaceAfter=20,
+        alignment=TA_CENTER,
+        textColor=colors.HexColor('#1e3a8a')
+    )
+    
+    contenido = []
+    contenido.append(Paragraph("IMPACTO TERRITORIAL - POA", titulo_style))
+    contenido.append(Paragraph(f"Fecha de corte: {fecha_corte}", styles['Heading3']))
+    contenido.append(Paragraph(
+        f"<b>Total de Proyectos:</b> {datos['total_obras']:,} | "
+        f"<b>Sin alcaldía identificada:</b> {datos['obras_sin_alcaldia']:,}<br/>"
+        "Montos y beneficiarios repartidos en partes iguales entre las alcaldías de cada obra.",
+        styles['Normal']
+    ))
+    contenido.append(Spacer(1, 0.5*cm))
+    
+    table_data = [['Alcaldía', 'Obras', 'Presupuesto', 'Ejecutado', 'Avance prom.', 'Avance pond.', 'Beneficiarios']]
+    for fila in datos['alcaldias']:
+        table_data.append([
+            fila['alcaldia'],
+            f"{fila['obras']:,}",
+            f"${fila['presupuesto']:,.2f}",
+            f"${fila['ejecutado']:,.2f}",
+            f"{fila['avance_promedio']:.1f}%",
+            f"{fila['avance_ponderado']:.1f}%",
+            f"{fila['beneficiarios']:,}",
+        ])
+    
+    table = Table(table_data, colWidths=[150, 60, 120, 120, 80, 80, 100], repeatRows=1)
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1e40af')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('FONTSIZE', (0, 1), (-1, -1), 9),
+    ]))
+    contenido.append(table)
+    
+    contenido.append(Spacer(1, 1*cm))
+    contenido.append(Paragraph(f"Generado el: {datetime.now().strftime('%d/%m/%Y %H:%M')}", 
+                              ParagraphStyle('footer', parent=styles['Normal'], fontSize=8, textColor=colors.grey)))
+    
+    doc.build(contenido)
+    buffer.seek(0)
+    return buffer
+
+def _crear_excel_territorial(datos, fecha_corte):
+    """Crea Excel para impacto territorial (una fila por alcaldía)"""
+    from openpyxl import Workbook
+    from openpyxl.styles import Font, Alignment, PatternFill
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Impacto Territorial"
+    
+    header_fill = PatternFill(start_color="1e40af", end_color="1e40af", fill_type="solid")
+    header_font = Font(color="FFFFFF", bold=True)
+    center_alignment = Alignment(horizontal="center", vertical="center")
+    
+    ws['A1'] = f"IMPACTO TERRITORIAL - {fecha_corte}"
+    ws['A1'].font = Font(size=16, bold=True)
+    ws['A2'] = f"Total de proyectos: {datos['total_obras']} | Sin alcaldía identificada: {datos['obras_sin_alcaldia']}"
+    ws['A2'].font = Font(italic=True)
+    
+    headers = ['Alcaldía', 'Obras', 'Presupuesto', 'Ejecutado', 'Avance Promedio (%)',
+               'Avance Ponderado (%)', 'Beneficiarios']
+    for col, header in enumerate(headers, 1):
+        cell = ws.cell(row=4, column=col, value=header)
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = center_alignment
+        ws.column_dimensions[cell.column_letter].width = 24 if col == 1 else 20
+    
+    for row, fila in enumerate(datos['alcaldias'], start=5):
+        ws.cell(row=row, column=1, value=fila['alcaldia'])
+        ws.cell(row=row, column=2, value=fila['obras'])
+        ws.cell(row=row, column=3, value=fila['presupuesto']).number_format = '"$"#,##0.00'
+        ws.cell(row=row, column=4, value=fila['ejecutado']).number_format = '"$"#,##0.00'
+        ws.cell(row=row, column=5, value=round(fila['avance_promedio'], 2))
+        ws.cell(row=row, column=6, value=round(fila['avance_ponderado'], 2))
+        ws.cell(row=row, column=7, value=fila['beneficiarios'])
+    
+    buffer = BytesIO()
+    wb.save(buffer)
+    buffer.seek(0)
+    return buffer
+
 def _crear_excel_general(titulo, datos, fecha_corte):
     """Crea Excel genérico para cualquier reporte"""
+    from openpyxl import Workbook
+    from openpyxl.styles import Font
     wb = Workbook()
     ws = wb.active
     ws.title = titulo[:31]  # Excel limita a 31 caracteres
@@ -405,11 +577,36 @@ def _crear_excel_general(titulo, datos, fecha_corte):
     buffer.seek(0)
     return buffer
 
+def _crear_pdf_generico(tipo_reporte, fecha_corte):
+    """Crea PDF mínimo para los tipos sin formato propio"""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+    buffer = BytesIO()
+    p = canvas.Canvas(buffer, pagesize=letter)
+    p.drawString(100, 750, f"REPORTE {tipo_reporte.upper()}")
+    p.drawString(100, 730, f"Fecha: {fecha_corte}")
+    p.save()
+    buffer.seek(0)
+    return buffer
+
+def _crear_excel_generico(tipo_reporte, fecha_corte):
+    """Crea Excel mínimo para los tipos sin formato propio"""
+    from openpyxl import Workbook
+    wb = Workbook()
+    ws = wb.active
+    ws['A1'] = f"REPORTE {tipo_reporte.upper()}"
+    ws['A2'] = f"Fecha: {fecha_corte}"
+    buffer = BytesIO()
+    wb.save(buffer)
+    buffer.seek(0)
+    return buffer
+
 # ============================
 # FUNCIÓN PRINCIPAL MEJORADA
 # ============================
 
 @csrf_exempt
+@cachear_reporte('core')
 def generar_reporte(request):
     """Generar reportes de TODAS las secciones del sistema - VERSIÓN COMPLETA"""
     if request.method == 'GET':
@@ -446,17 +643,32 @@ def generar_reporte(request):
         periodo = data.get('periodo', 'mensual')
         direcciones_ids = data.get('direcciones', [])
         incluir_graficos = data.get('incluir_graficos', True)
+        detalle_completo = data.get('detalle_completo', False)
         
         print(f"📊 Generando reporte: tipo={tipo_reporte}, formato={formato}, fecha={fecha_corte}")
         
         # Importar modelos
         from backend.poa.models import Obra, Direccion
+        from backend.poa.estadisticas import calcular_estadisticas, RIESGO_ALTO
         from django.db.models import Sum, Count, Avg, F, Q
+        from reportlab.lib.pagesizes import letter
+        from reportlab.pdfgen import canvas
+        from openpyxl import Workbook
+        from openpyxl.styles import Font
+        
+        from backend.poa.direcciones import filtrar_por_direcciones
         
         # Obtener datos básicos
         obras = Obra.objects.all()
         
         # Aplicar filtros básicos
+        try:
+            direcciones_ids = [int(d) for d in direcciones_ids or []]
+        except (ValueError, TypeError):
+            direcciones_ids = []
+        obras = filtrar_por_direcciones(obras, direcciones_ids)
+        
+        fecha = None
         if fecha_corte:
             try:
                 fecha = datetime.strptime(fecha_corte, '%Y-%m-%d').date()
@@ -464,13 +676,14 @@ def generar_reporte(request):
             except:
                 pass
         
-        # Datos comunes
+        # Datos comunes: una consulta agrupada, con los mismos totales que la vista previa
+        estadisticas = calcular_estadisticas(obras, con_riesgo=True)
         datos_comunes = {
-            'total_obras': obras.count(),
-            'presupuesto_total': obras.aggregate(total=Sum('presupuesto_modificado'))['total'] or 0,
-            'avance_promedio': obras.aggregate(promedio=Avg('avance_fisico_pct'))['promedio'] or 0,
-            'proyectos_riesgo': obras.filter(riesgo_nivel__gte=4).count(),
-            'beneficiarios_totales': obras.aggregate(total=Sum('beneficiarios_directos'))['total'] or 0,
+            'total_obras': estadisticas['total_obras'],
+            'presupuesto_total': estadisticas['presupuesto_total'],
+            'avance_promedio': estadisticas['avance_promedio'],
+            'proyectos_riesgo': estadisticas['proyectos_riesgo'],
+            'beneficiarios_totales': estadisticas['beneficiarios_total'],
         }
         
         # Preparar datos específicos por tipo de reporte
@@ -502,13 +715,17 @@ def generar_reporte(request):
                 presupuesto=Sum('presupuesto_modificado')
             )
             
+            detalles = obras.values(
+                'id_excel', 'programa', 'area_responsable', 'presupuesto_modificado',
+                'avance_fisico_pct', 'estatus_general', 'fecha_inicio_prog'
+            ).order_by('estatus_general')
+            
             datos_cartera = {
                 **datos_comunes,
                 'por_estado': {item['estatus_general']: item['total'] for item in por_estado},
-                'detalles': list(obras.values(
-                    'id_excel', 'programa', 'area_responsable', 'presupuesto_modificado',
-                    'avance_fisico_pct', 'estatus_general', 'fecha_inicio_prog'
-                ).order_by('estatus_general')[:50])
+                # Con detalle_completo se pasa el queryset y se recorre por lotes
+                'detalles': detalles if detalle_completo else list(detalles[:50]),
+                'detalle_completo': detalle_completo,
             }
             
             if formato == 'pdf':
@@ -528,7 +745,7 @@ def generar_reporte(request):
         
         elif tipo_reporte == 'riesgos':
             # Datos para riesgos
-            alto_riesgo = obras.filter(riesgo_nivel__gte=4)
+            alto_riesgo = obras.filter(riesgo_nivel__gte=RIESGO_ALTO)
             viabilidad_critica = obras.filter(viabilidad_ejecucion__lte=2)
             
             datos_riesgos = {
@@ -557,7 +774,31 @@ def generar_reporte(request):
                 response['Content-Disposition'] = f'attachment; filename="analisis_riesgos_{fecha_corte}.xlsx"'
                 return response
         
-        elif tipo_reporte in ['presupuesto', 'territorial', 'transparencia']:
+        elif tipo_reporte == 'territorial':
+            # Agregados por alcaldía: una consulta sobre la tabla normalizada
+            from backend.poa.territorio import reporte_territorial
+            
+            datos_territoriales = {
+                'total_obras': datos_comunes['total_obras'],
+                **reporte_territorial(fecha, direcciones_ids),
+            }
+            
+            if formato == 'pdf':
+                pdf_buffer = _crear_pdf_territorial(datos_territoriales, fecha_corte)
+                response = HttpResponse(pdf_buffer, content_type='application/pdf')
+                response['Content-Disposition'] = f'attachment; filename="impacto_territorial_{fecha_corte}.pdf"'
+                return response
+                
+            elif formato == 'excel':
+                excel_buffer = _crear_excel_territorial(datos_territoriales, fecha_corte)
+                response = HttpResponse(
+                    excel_buffer,
+                    content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+                )
+                response['Content-Disposition'] = f'attachment; filename="impacto_territorial_{fecha_corte}.xlsx"'
+                return response
+        
+        elif tipo_reporte in ['presupuesto', 'transparencia']:
             # Reportes simples para otros tipos
             datos_generales = {
                 'tipo_reporte': tipo_reporte,
@@ -627,60 +868,37 @@ def generar_reporte(request):
         
         # MANEJO DE FORMATO "AMBOS"
         if formato == 'ambos':
-            # Crear ZIP con ambos formatos
-            zip_buffer = BytesIO()
+            import zipfile
+            from backend.poa.concurrencia import enviar, zip_en_streaming
             
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                # 1. Generar PDF
-                if tipo_reporte == 'ejecutivo':
-                    pdf_content = _crear_pdf_ejecutivo(datos_comunes, fecha_corte).getvalue()
-                elif tipo_reporte == 'cartera':
-                    pdf_content = _crear_pdf_cartera({
-                        **datos_comunes,
-                        'detalles': list(obras.values('programa', 'area_responsable', 'estatus_general')[:20])
-                    }, fecha_corte).getvalue()
-                elif tipo_reporte == 'riesgos':
-                    pdf_content = _crear_pdf_riesgos({
-                        'alto_riesgo': obras.filter(riesgo_nivel__gte=4).count(),
-                        'detalles': list(obras.filter(riesgo_nivel__gte=4).values('programa', 'riesgo_nivel')[:10])
-                    }, fecha_corte).getvalue()
-                else:
-                    # PDF genérico
-                    buffer = BytesIO()
-                    p = canvas.Canvas(buffer, pagesize=letter)
-                    p.drawString(100, 750, f"REPORTE {tipo_reporte.upper()}")
-                    p.drawString(100, 730, f"Fecha: {fecha_corte}")
-                    p.save()
-                    buffer.seek(0)
-                    pdf_content = buffer.getvalue()
-                
-                zip_file.writestr(f"reporte_{tipo_reporte}_{fecha_corte}.pdf", pdf_content)
-                
-                # 2. Generar Excel
-                if tipo_reporte == 'ejecutivo':
-                    excel_content = _crear_excel_ejecutivo(datos_comunes, fecha_corte).getvalue()
-                elif tipo_reporte in ['cartera', 'riesgos']:
-                    excel_content = _crear_excel_general(
-                        f"Reporte {tipo_reporte}",
-                        datos_comunes,
-                        fecha_corte
-                    ).getvalue()
-                else:
-                    # Excel genérico
-                    wb = Workbook()
-                    ws = wb.active
-                    ws['A1'] = f"REPORTE {tipo_reporte.upper()}"
-                    ws['A2'] = f"Fecha: {fecha_corte}"
-                    buffer = BytesIO()
-                    wb.save(buffer)
-                    buffer.seek(0)
-                    excel_content = buffer.getvalue()
-                
-                zip_file.writestr(f"reporte_{tipo_reporte}_{fecha_corte}.xlsx", excel_content)
+            # PDF y Excel a la vez en el pool de procesos, con los datos ya
+            # cargados arriba; el ZIP se envía conforme termina cada archivo
+            if tipo_reporte == 'ejecutivo':
+                pdf = enviar(_crear_pdf_ejecutivo, datos_comunes, fecha_corte)
+                excel = enviar(_crear_excel_ejecutivo, datos_comunes, fecha_corte)
+            elif tipo_reporte == 'cartera':
+                # El queryset del detalle completo no viaja a otro proceso
+                datos_cartera['detalles'] = list(datos_cartera['detalles'])
+                pdf = enviar(_crear_pdf_cartera, datos_cartera, fecha_corte)
+                excel = enviar(_crear_excel_general, "Cartera de Proyectos", datos_cartera, fecha_corte)
+            elif tipo_reporte == 'riesgos':
+                pdf = enviar(_crear_pdf_riesgos, datos_riesgos, fecha_corte)
+                excel = enviar(_crear_excel_general, "Análisis de Riesgos", datos_riesgos, fecha_corte)
+            elif tipo_reporte == 'territorial':
+                pdf = enviar(_crear_pdf_territorial, datos_territoriales, fecha_corte)
+                excel = enviar(_crear_excel_territorial, datos_territoriales, fecha_corte)
+            else:
+                pdf = enviar(_crear_pdf_generico, tipo_reporte, fecha_corte)
+                excel = enviar(_crear_excel_generico, tipo_reporte, fecha_corte)
             
-            zip_buffer.seek(0)
-            
-            response = HttpResponse(zip_buffer, content_type='application/zip')
+            entradas = {
+                f"reporte_{tipo_reporte}_{fecha_corte}.pdf": pdf,
+                f"reporte_{tipo_reporte}_{fecha_corte}.xlsx": excel,
+            }
+            response = StreamingHttpResponse(
+                zip_en_streaming(entradas, zipfile.ZIP_DEFLATED),
+                content_type='application/zip'
+            )
             filename = f"reporte_{tipo_reporte}_{fecha_corte}.zip"
             response['Content-Disposition'] = f'attachment; filename="{filename}"'
             return response
@@ -716,4 +934,6 @@ urlpatterns = [
     path('api/direcciones/', lista_direcciones, name='direcciones-list'),
     path('api/reportes/vista_previa/', vista_previa_reporte, name='vista-previa'),
     path('api/reportes/generar/', generar_reporte, name='generar-reporte'),
+    path('api/reportes/territorial/', reporte_territorial_vista, name='reporte-territorial'),
+    path('api/', include('backend.poa.urls')),
 ]
\ No newline at end of file
@@ -15,3 +15,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_wsgi_application()
+
+# Con REPORTES_PRECARGAR los workers heredan reportlab/openpyxl ya cargados
+from backend.poa.precarga import precargar_si_configurado  # noqa: E402
+
+precargar_si_configurado()
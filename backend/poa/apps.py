@@ -1,5 +1,9 @@
-﻿from django.apps import AppConfig
-
-class PoaConfig(AppConfig):
-    default_auto_field = "django.db.models.BigAutoField"
+﻿from django.apps import AppConfig
+
+class PoaConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
     name = "backend.poa"
+
+    def ready(self):
+        # Registra las señales que mantienen el resumen de obras
+        from . import signals  # noqa: F401
@@ -0,0 +1,255 @@
+# Proyecto\POA_Reporte\backend\poa\cache_columnar.py
+"""
+Caché columnar de las obras en memoria del proceso.
+
+Guarda las columnas numéricas de Obra como arreglos de NumPy y el estatus y
+el área como códigos de categoría. Los KPIs de un reporte se vuelven una
+máscara por fecha de corte y unos bincount por (estatus, área), sin consultar
+las obras. El caché se recarga cuando cambia la versión de los datos.
+
+Con las mismas columnas se arma el pivote por una o dos dimensiones de
+DIMENSIONES; los resultados se memorizan mientras no cambie la versión.
+"""
+import threading
+
+import numpy as np
+
+from .models import Obra
+from .versiones import version_datos
+from .estadisticas import combinar_grupos
+
+# Dimensiones por las que se puede agrupar (textos cortos con pocos valores)
+DIMENSIONES = (
+    'estatus_general', 'area_responsable', 'eje_institucional', 'tipo_recurso',
+    'fuente_financiamiento', 'capitulo_gasto', 'tipo_obra', 'etapa_desarrollo',
+)
+
+# Medidas del pivote; los montos usan el presupuesto vigente
+MEDIDAS = ('obras', 'presupuesto', 'ejecutado', 'avance_promedio', 'avance_ponderado')
+
+MAX_DIMENSIONES = 2
+
+# Pivotes memorizados por versión
+MAX_PIVOTES = 64
+
+CAMPOS = (
+    'fecha_inicio_prog', 'presupuesto_modificado', 'anteproyecto_total',
+    'avance_fisico_pct', 'avance_financiero_pct',
+    'poblacion_objetivo_valor', 'beneficiarios_directos_valor', 'direccion_id',
+) + DIMENSIONES
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def _codificar(valores):
+    """Códigos de categoría; None y '' comparten el código 0"""
+    categorias = [None]
+    indices = {None: 0, '': 0}
+    codigos = np.empty(len(valores), dtype=np.int32)
+    for i, valor in enumerate(valores):
+        codigo = indices.get(valor)
+        if codigo is None:
+            codigo = indices[valor] = len(categorias)
+            categorias.append(valor)
+        codigos[i] = codigo
+    return codigos, categorias
+
+
+def _escalar(valor):
+    """Número de NumPy a int/float de Python (para serializar)"""
+    return int(valor) if np.issubdtype(type(valor), np.integer) else float(valor)
+
+
+def _solo_lectura(*arreglos):
+    for arreglo in arreglos:
+        arreglo.flags.writeable = False
+
+
+class ColumnasObras:
+    """Columnas de todas las obras de una versión de los datos"""
+
+    def __init__(self, version):
+        self.version = version
+        filas = list(Obra.objects.order_by('id').values_list(*CAMPOS).iterator(chunk_size=5000))
+        columnas = list(zip(*filas)) if filas else [()] * len(CAMPOS)
+        (fechas, modificado, anteproyecto, avance_fisico, avance_financiero,
+         poblacion, beneficiarios_directos, direcciones) = columnas[:8]
+
+        self.total = len(filas)
+        self.fecha_inicio = np.array(fechas, dtype='datetime64[D]')
+        self.presupuesto_modificado = np.array(modificado, dtype=np.float64)
+        self.anteproyecto_total = np.array(anteproyecto, dtype=np.float64)
+        self.avance_fisico = np.array(avance_fisico, dtype=np.float64)
+        # Obras sin dirección: -1
+        self.direccion = np.array([d if d is not None else -1 for d in direcciones], dtype=np.int64)
+
+        # Mismas reglas que PRESUPUESTO_VIGENTE, MONTO_EJECUTADO y BENEFICIARIOS
+        self.presupuesto_vigente = np.where(
+            self.presupuesto_modificado == 0, self.anteproyecto_total, self.presupuesto_modificado
+        )
+        self.ejecutado = self.presupuesto_vigente * np.array(avance_financiero, dtype=np.float64) / 100.0
+        self.beneficiarios = np.array([
+            p if p is not None else (b if b is not None else 0)
+            for p, b in zip(poblacion, beneficiarios_directos)
+        ], dtype=np.int64)
+
+        # {dimensión: (códigos, categorías)}
+        self.dimensiones = {
+            campo: _codificar(valores) for campo, valores in zip(DIMENSIONES, columnas[8:])
+        }
+        self.estatus, self.categorias_estatus = self.dimensiones['estatus_general']
+        self.area, self.categorias_area = self.dimensiones['area_responsable']
+
+        _solo_lectura(
+            self.fecha_inicio, self.presupuesto_modificado, self.anteproyecto_total,
+            self.presupuesto_vigente, self.avance_fisico, self.ejecutado, self.beneficiarios, self.direccion,
+            *(codigos for codigos, _ in self.dimensiones.values())
+        )
+        self._pivotes = {}
+        self._pivotes_lock = threading.Lock()
+
+    def mascara(self, fecha_corte=None, direcciones=None):
+        """
+        Obras iniciadas a la fecha de corte (las que no tienen fecha no
+        entran) y, si se indican, de esas direcciones.
+        """
+        if fecha_corte is None:
+            mascara = np.ones(self.total, dtype=bool)
+        else:
+            mascara = self.fecha_inicio <= np.datetime64(fecha_corte, 'D')
+        if direcciones:
+            mascara &= np.isin(self.direccion, np.array(list(direcciones), dtype=np.int64))
+        return mascara
+
+    def agregados(self, mascara):
+        """
+        Filas por (estatus, área) con las llaves de `agregados_por_grupo`,
+        calculadas con bincount sobre las obras de la máscara.
+        """
+        n_areas = len(self.categorias_area)
+        n_grupos = len(self.categorias_estatus) * n_areas
+        grupo = self.estatus[mascara].astype(np.int64) * n_areas + self.area[mascara]
+
+        def suma(valores):
+            return np.bincount(grupo, weights=valores[mascara], minlength=n_grupos)
+
+        obras = np.bincount(grupo, minlength=n_grupos)
+        suma_modificado = suma(self.presupuesto_modificado)
+        suma_anteproyecto = suma(self.anteproyecto_total)
+        ejecutado = suma(self.ejecutado)
+        suma_avance = suma(self.avance_fisico)
+        beneficiarios = suma(self.beneficiarios)
+
+        for g in np.flatnonzero(obras):
+            yield {
+                'estatus_general': self.categorias_estatus[g // n_areas],
+                'area_responsable': self.categorias_area[g % n_areas],
+                'obras': int(obras[g]),
+                'suma_modificado': float(suma_modificado[g]),
+                'suma_anteproyecto': float(suma_anteproyecto[g]),
+                'ejecutado': float(ejecutado[g]),
+                'suma_avance': float(suma_avance[g]),
+                'beneficiarios': int(round(beneficiarios[g])),
+            }
+
+    def estadisticas(self, fecha_corte=None, direcciones=None):
+        """El mismo diccionario que `calcular_estadisticas`"""
+        return combinar_grupos(self.agregados(self.mascara(fecha_corte, direcciones)))
+
+    def pivote(self, dimensiones, medidas=MEDIDAS, fecha_corte=None):
+        """
+        Medidas agrupadas por una o dos dimensiones, más los totales. Lanza
+        ValueError si una dimensión o medida no existe.
+        """
+        dimensiones, medidas = tuple(dimensiones), tuple(medidas)
+        if not 1 <= len(dimensiones) <= MAX_DIMENSIONES:
+            raise ValueError(f"Se agrupa por 1 a {MAX_DIMENSIONES} dimensiones")
+        desconocidas = [d for d in dimensiones if d not in DIMENSIONES] + [m for m in medidas if m not in MEDIDAS]
+        if desconocidas:
+            raise ValueError(f"Dimensiones o medidas desconocidas: {', '.join(desconocidas)}")
+
+        llave = (dimensiones, medidas, fecha_corte)
+        with self._pivotes_lock:
+            resultado = self._pivotes.get(llave)
+        if resultado is None:
+            resultado = self._calcular_pivote(dimensiones, medidas, fecha_corte)
+            with self._pivotes_lock:
+                if len(self._pivotes) >= MAX_PIVOTES:
+                    self._pivotes.clear()
+                self._pivotes[llave] = resultado
+        return resultado
+
+    def _calcular_pivote(self, dimensiones, medidas, fecha_corte):
+        mascara = self.mascara(fecha_corte)
+
+        # Código combinado de las dimensiones, como en `agregados`
+        grupo = np.zeros(int(mascara.sum()), dtype=np.int64)
+        tamanos = []
+        for campo in dimensiones:
+            codigos, categorias = self.dimensiones[campo]
+            grupo = grupo * len(categorias) + codigos[mascara]
+            tamanos.append(len(categorias))
+        n_grupos = int(np.prod(tamanos))
+
+        filas = []
+        medidas_grupo = self._medidas(grupo, mascara, medidas, n_grupos)
+        for g in np.flatnonzero(medidas_grupo['obras']):
+            fila = {}
+            for campo, codigo in zip(dimensiones, np.unravel_index(g, tamanos)):
+                fila[campo] = self.dimensiones[campo][1][codigo]
+            fila.update((m, _escalar(medidas_grupo[m][g])) for m in medidas)
+            filas.append(fila)
+        filas.sort(key=lambda fila: tuple((fila[c] is None, fila[c] or '') for c in dimensiones))
+
+        totales = self._medidas(np.zeros_like(grupo), mascara, medidas, 1)
+        return {
+            'version': self.version,
+            'dimensiones': list(dimensiones),
+            'medidas': list(medidas),
+            'filas': filas,
+            'totales': {m: _escalar(totales[m][0]) for m in medidas},
+        }
+
+    def _medidas(self, grupo, mascara, medidas, n_grupos):
+        """Arreglos por grupo de las medidas pedidas (siempre incluye 'obras')"""
+        def suma(valores):
+            return np.bincount(grupo, weights=valores[mascara], minlength=n_grupos)
+
+        obras = np.bincount(grupo, minlength=n_grupos)
+        resultado = {'obras': obras}
+        presupuesto = suma(self.presupuesto_vigente)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if 'presupuesto' in medidas:
+                resultado['presupuesto'] = presupuesto
+            if 'ejecutado' in medidas:
+                resultado['ejecutado'] = suma(self.ejecutado)
+            if 'avance_promedio' in medidas:
+                resultado['avance_promedio'] = np.where(obras > 0, suma(self.avance_fisico) / obras, 0.0)
+            if 'avance_ponderado' in medidas:
+                ponderado = suma(self.avance_fisico * self.presupuesto_vigente)
+                resultado['avance_ponderado'] = np.where(presupuesto > 0, ponderado / presupuesto, 0.0)
+        return resultado
+
+
+def columnas_obras():
+    """Columnas de la versión actual de las obras (las recarga si cambiaron)"""
+    global _cache
+    version = version_datos('obra')
+    with _cache_lock:
+        if _cache is None or _cache.version != version:
+            _cache = ColumnasObras(version)
+        return _cache
+
+
+def estadisticas_columnares(fecha_corte=None, direcciones=None):
+    """
+    KPIs de las obras iniciadas a la fecha de corte (y de esas direcciones),
+    desde el caché columnar
+    """
+    return columnas_obras().estadisticas(fecha_corte, direcciones)
+
+
+def pivote_obras(dimensiones, medidas=MEDIDAS, fecha_corte=None):
+    """Pivote de las obras de la versión actual (ver `ColumnasObras.pivote`)"""
+    return columnas_obras().pivote(dimensiones, medidas, fecha_corte)
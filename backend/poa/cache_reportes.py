@@ -0,0 +1,320 @@
+# Proyecto\POA_Reporte\backend\poa\cache_reportes.py
+"""
+Caché de reportes direccionado por contenido.
+
+La llave es el hash de la solicitud normalizada más la versión de los datos
+de obras y direcciones: dos solicitudes iguales sobre los mismos datos
+comparten el archivo ya generado. Los archivos viven en disco y se desalojan
+por antigüedad de uso cuando el directorio pasa del tamaño máximo.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import date
+from functools import wraps
+
+from django.conf import settings
+from django.http import FileResponse
+
+from .versiones import version_datos
+
+MAX_BYTES_DEFECTO = 512 * 1024 * 1024
+
+_candados = {}
+_candados_lock = threading.Lock()
+
+
+# ============================
+# LLAVES
+# ============================
+
+def normalizar_solicitud(datos):
+    """Solicitud de reporte con valores por defecto y orden estables"""
+    fecha_corte = datos.get('fecha_corte')
+    if hasattr(fecha_corte, 'isoformat'):
+        fecha_corte = fecha_corte.isoformat()
+    return {
+        'tipo_reporte': datos.get('tipo_reporte'),
+        'periodo': datos.get('periodo', 'mensual'),
+        'fecha_corte': str(fecha_corte),
+        'direcciones': sorted({int(d) for d in datos.get('direcciones') or []}),
+        'incluir_todas_direcciones': bool(datos.get('incluir_todas_direcciones', True)),
+        'formato': datos.get('formato', 'pdf'),
+        'incluir_graficos': bool(datos.get('incluir_graficos', True)),
+        'incluir_anexos': bool(datos.get('incluir_anexos', False)),
+        'detalle_completo': bool(datos.get('detalle_completo', False)),
+        'nombre_reporte': datos.get('nombre_reporte') or '',
+    }
+
+
+def datos_de_configuracion(configuracion):
+    """Solicitud equivalente a un ReporteConfig guardado"""
+    return {
+        'nombre_reporte': configuracion.nombre,
+        'tipo_reporte': configuracion.tipo_reporte,
+        'periodo': configuracion.periodo,
+        'fecha_corte': configuracion.fecha_corte,
+        'direcciones': list(configuracion.direcciones.values_list('pk', flat=True)),
+        'incluir_todas_direcciones': configuracion.incluir_todas_direcciones,
+        'formato': configuracion.formato_salida,
+        'incluir_graficos': configuracion.incluir_graficos,
+        'incluir_anexos': configuracion.incluir_anexos,
+        'detalle_completo': configuracion.detalle_completo,
+    }
+
+
+def llave_reporte(datos, origen='reportes'):
+    """Hash SHA-256 de la solicitud normalizada y la versión de los datos"""
+    contenido = {
+        'origen': origen,
+        'solicitud': normalizar_solicitud(datos),
+        'obras': version_datos('obra'),
+        'direcciones': version_datos('direccion'),
+    }
+    texto = json.dumps(contenido, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+
+def tomar_candado(llave):
+    """
+    Toma el candado de una llave (espera si otro lo tiene). Cada candado
+    cuenta quién lo tiene o lo espera y se borra cuando ya no queda nadie.
+    """
+    with _candados_lock:
+        entrada = _candados.get(llave)
+        if entrada is None:
+            entrada = _candados[llave] = [threading.Lock(), 0]
+        entrada[1] += 1
+    entrada[0].acquire()
+
+
+def soltar_candado(llave):
+    """Suelta el candado tomado con `tomar_candado`"""
+    with _candados_lock:
+        entrada = _candados[llave]
+        entrada[0].release()
+        entrada[1] -= 1
+        if not entrada[1]:
+            del _candados[llave]
+
+
+@contextmanager
+def candado_reporte(llave):
+    """
+    Serializa la generación de una misma llave dentro del proceso.
+
+    Si llegan varias solicitudes iguales a la vez, la primera genera el
+    archivo y las demás esperan y lo leen del caché.
+    """
+    tomar_candado(llave)
+    try:
+        yield
+    finally:
+        soltar_candado(llave)
+
+
+def soltar_al_cerrar(respuesta, llave):
+    """
+    Deja el candado tomado hasta que el servidor cierre la respuesta.
+
+    Una respuesta en streaming se genera mientras se envía, después de que
+    la vista regresó: así las solicitudes iguales esperan a que termine y
+    la leen del caché en lugar de generarla otra vez.
+    """
+    respuesta._resource_closers.append(lambda: soltar_candado(llave))
+
+
+# ============================
+# ALMACÉN EN DISCO
+# ============================
+
+def directorio_cache():
+    directorio = getattr(settings, 'REPORTES_CACHE_DIR', None) or os.path.join(
+        settings.MEDIA_ROOT, 'cache_reportes'
+    )
+    os.makedirs(directorio, exist_ok=True)
+    return directorio
+
+
+def _rutas(llave):
+    base = os.path.join(directorio_cache(), llave)
+    return base + '.bin', base + '.json'
+
+
+def obtener_de_cache(llave):
+    """Regresa (ruta, metadatos) si la llave está en caché, o None"""
+    ruta, ruta_meta = _rutas(llave)
+    try:
+        with open(ruta_meta, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        # Marca el uso para el desalojo LRU
+        os.utime(ruta)
+    except (OSError, ValueError):
+        return None
+    return ruta, meta
+
+
+def guardar_en_cache(llave, origen, content_type, nombre):
+    """
+    Guarda un archivo en el caché.
+
+    `origen` puede ser bytes, un archivo abierto (p. ej. una SalidaReporte)
+    o la ruta de un archivo temporal, que se mueve al caché en lugar de
+    copiarse.
+    """
+    ruta, ruta_meta = _rutas(llave)
+    directorio = os.path.dirname(ruta)
+
+    if isinstance(origen, (bytes, bytearray)):
+        fd, temporal = tempfile.mkstemp(dir=directorio, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(origen)
+    elif hasattr(origen, 'read'):
+        fd, temporal = tempfile.mkstemp(dir=directorio, suffix='.tmp')
+        origen.seek(0)
+        with os.fdopen(fd, 'wb') as f:
+            shutil.copyfileobj(origen, f)
+    else:
+        fd, temporal = tempfile.mkstemp(dir=directorio, suffix='.tmp')
+        os.close(fd)
+        shutil.move(origen, temporal)
+    os.replace(temporal, ruta)
+
+    fd, temporal = tempfile.mkstemp(dir=directorio, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump({'content_type': content_type, 'nombre': nombre}, f)
+    os.replace(temporal, ruta_meta)
+
+    desalojar_cache(conservar=ruta)
+    return ruta
+
+
+def guardar_en_cache_al_vuelo(llave, partes, content_type, nombre):
+    """
+    Entrega los bytes de `partes` (una respuesta en streaming) y a la vez
+    los escribe al caché. La entrada solo se registra si el recorrido
+    termina completo; si se corta, se descarta lo escrito.
+    """
+    fd, temporal = tempfile.mkstemp(dir=directorio_cache(), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for parte in partes:
+                f.write(parte)
+                yield parte
+        guardar_en_cache(llave, temporal, content_type, nombre)
+    finally:
+        if os.path.exists(temporal):
+            os.unlink(temporal)
+
+
+def desalojar_cache(max_bytes=None, conservar=None):
+    """
+    Borra los archivos usados hace más tiempo hasta quedar bajo el límite.
+
+    `conservar` es la ruta que se acaba de guardar: nunca se desaloja, aunque
+    por sí sola pase del límite, para poder servirla.
+    """
+    if max_bytes is None:
+        max_bytes = getattr(settings, 'REPORTES_CACHE_MAX_BYTES', MAX_BYTES_DEFECTO)
+
+    directorio = directorio_cache()
+    entradas = []
+    total = 0
+    for entrada in os.scandir(directorio):
+        if not entrada.name.endswith('.bin'):
+            continue
+        try:
+            info = entrada.stat()
+        except OSError:
+            continue
+        total += info.st_size
+        if entrada.path != conservar:
+            entradas.append((info.st_mtime, info.st_size, entrada.path))
+
+    borrados = 0
+    for _, tamano, ruta in sorted(entradas):
+        if total <= max_bytes:
+            break
+        for archivo in (ruta, ruta[:-len('.bin')] + '.json'):
+            try:
+                os.unlink(archivo)
+            except OSError:
+                pass
+        total -= tamano
+        borrados += 1
+    return borrados
+
+
+def respuesta_cacheada(llave):
+    """FileResponse con el archivo en caché, o None si no existe"""
+    encontrado = obtener_de_cache(llave)
+    if encontrado is None:
+        return None
+    ruta, meta = encontrado
+    try:
+        archivo = open(ruta, 'rb')
+    except OSError:
+        return None
+    response = FileResponse(archivo, content_type=meta['content_type'])
+    response['Content-Disposition'] = f'attachment; filename="{meta["nombre"]}"'
+    return response
+
+
+def cachear_reporte(origen):
+    """
+    Decorador para vistas que reciben la solicitud de reporte como JSON.
+
+    Sirve la respuesta desde el caché si existe; si no, llama a la vista y
+    guarda su contenido cuando es un archivo adjunto con estado 200 (las
+    respuestas en streaming se guardan mientras se envían, con el candado
+    tomado hasta terminar).
+    """
+    def decorador(vista):
+        @wraps(vista)
+        def envoltura(request, *args, **kwargs):
+            if request.method != 'POST':
+                return vista(request, *args, **kwargs)
+            try:
+                datos = json.loads(request.body)
+            except ValueError:
+                datos = {}
+            if not isinstance(datos, dict):
+                return vista(request, *args, **kwargs)
+            # Mismos valores por defecto que generar_reporte
+            datos.setdefault('tipo_reporte', 'ejecutivo')
+            datos.setdefault('fecha_corte', date.today().isoformat())
+
+            try:
+                llave = llave_reporte(datos, origen)
+            except (TypeError, ValueError):
+                return vista(request, *args, **kwargs)
+
+            tomar_candado(llave)
+            en_streaming = False
+            try:
+                respuesta = respuesta_cacheada(llave)
+                if respuesta is not None:
+                    return respuesta
+
+                respuesta = vista(request, *args, **kwargs)
+                disposicion = respuesta.get('Content-Disposition', '')
+                if respuesta.status_code == 200 and 'filename="' in disposicion:
+                    nombre = disposicion.split('filename="', 1)[1].rstrip('"')
+                    if respuesta.streaming:
+                        respuesta.streaming_content = guardar_en_cache_al_vuelo(
+                            llave, respuesta.streaming_content, respuesta['Content-Type'], nombre
+                        )
+                        soltar_al_cerrar(respuesta, llave)
+                        en_streaming = True
+                    else:
+                        guardar_en_cache(llave, respuesta.content, respuesta['Content-Type'], nombre)
+                return respuesta
+            finally:
+                if not en_streaming:
+                    soltar_candado(llave)
+        return envoltura
+    return decorador
@@ -0,0 +1,235 @@
+# Proyecto\POA_Reporte\backend\poa\columnas.py
+"""
+Registro de columnas por tipo de reporte.
+
+Cada columna declara los campos de Obra que necesita, así el queryset se
+proyecta con .only()/values_list() y los renderizadores PDF y Excel leen
+solo esas columnas en lugar de los 67 campos del modelo.
+"""
+
+
+class Columna:
+    """Columna de un reporte: título, campos que lee y cómo obtener su valor"""
+    def __init__(self, titulo, campos, valor):
+        self.titulo = titulo
+        self.campos = tuple(campos)
+        self.valor = valor
+
+
+# ============================
+# VALORES BASE
+# ============================
+
+NIVELES_RIESGO = {
+    1: "Muy Bajo",
+    2: "Bajo",
+    3: "Medio",
+    4: "Alto",
+    5: "Muy Alto"
+}
+
+NIVELES_VIABILIDAD = {
+    1: "Muy Baja",
+    2: "Baja",
+    3: "Media",
+    4: "Alta",
+    5: "Muy Alta"
+}
+
+
+def texto_nivel(nivel, niveles):
+    """Convierte un nivel numérico (1-5) a texto"""
+    try:
+        nivel_int = int(nivel)
+        return niveles.get(nivel_int, f"Nivel {nivel_int}")
+    except:
+        return "N/A"
+
+
+def presupuesto_vigente(obra):
+    """Presupuesto modificado, o anteproyecto si el modificado no es positivo"""
+    presupuesto = getattr(obra, 'presupuesto_modificado', 0) or 0
+    if presupuesto <= 0:
+        presupuesto = getattr(obra, 'anteproyecto_total', 0) or 0
+    return presupuesto
+
+
+def monto_ejecutado(obra):
+    """Monto ejecutado según el avance financiero"""
+    presupuesto = presupuesto_vigente(obra)
+    avance_financiero = getattr(obra, 'avance_financiero_pct', 0) or 0
+    if presupuesto and avance_financiero:
+        return float(presupuesto) * (float(avance_financiero) / 100)
+    return 0
+
+
+def _programa(obra):
+    return str(getattr(obra, 'programa', 'Sin nombre') or 'Sin nombre')
+
+
+def _area(obra):
+    return str(getattr(obra, 'area_responsable', 'N/A') or 'N/A')
+
+
+def _estado(obra):
+    return str(getattr(obra, 'estatus_general', 'N/A') or 'N/A')
+
+
+def _id_excel(obra):
+    return getattr(obra, 'id_excel', obra.id)
+
+
+# ============================
+# FORMATOS PARA PDF
+# ============================
+
+def _recortar(valor, largo):
+    """Recorta texto largo agregando puntos suspensivos"""
+    return valor[:largo] + '...' if len(valor) > largo else valor
+
+
+def _dinero_o_na(valor):
+    return f"${float(valor):,.2f}" if valor else "N/A"
+
+
+def _pdf_proyecto(largo):
+    return Columna('Proyecto', ['programa'], lambda obra: _recortar(_programa(obra), largo))
+
+
+def _pdf_area(largo):
+    return Columna('Área', ['area_responsable'], lambda obra: _area(obra)[:largo])
+
+
+PDF_PRESUPUESTO = Columna(
+    'Presupuesto', ['presupuesto_modificado', 'anteproyecto_total'],
+    lambda obra: _dinero_o_na(presupuesto_vigente(obra))
+)
+
+PDF_AVANCE = Columna(
+    'Avance', ['avance_fisico_pct'],
+    lambda obra: f"{float(getattr(obra, 'avance_fisico_pct', 0) or 0):.1f}%"
+)
+
+COLUMNAS_PDF = {
+    'ejecutivo': [
+        _pdf_proyecto(50),
+        _pdf_area(30),
+        PDF_PRESUPUESTO,
+        PDF_AVANCE,
+        Columna('Estado', ['estatus_general'], lambda obra: _estado(obra)[:20]),
+    ],
+    'cartera': [
+        Columna('ID', ['id_excel'], lambda obra: str(_id_excel(obra))),
+        _pdf_proyecto(40),
+        _pdf_area(20),
+        PDF_PRESUPUESTO,
+        PDF_AVANCE,
+    ],
+    'presupuesto': [
+        _pdf_proyecto(40),
+        _pdf_area(20),
+        PDF_PRESUPUESTO,
+        Columna(
+            'Ejecutado', ['presupuesto_modificado', 'anteproyecto_total', 'avance_financiero_pct'],
+            lambda obra: f"${monto_ejecutado(obra):,.2f}"
+        ),
+        Columna(
+            '% Ejecución', ['avance_financiero_pct'],
+            lambda obra: f"{float(getattr(obra, 'avance_financiero_pct', 0) or 0):.1f}%"
+        ),
+    ],
+    'riesgos': [
+        _pdf_proyecto(40),
+        _pdf_area(20),
+        Columna('Riesgo', ['riesgo_nivel'],
+                lambda obra: texto_nivel(getattr(obra, 'riesgo_nivel', 1) or 1, NIVELES_RIESGO)),
+        Columna('Viabilidad', ['viabilidad_ejecucion'],
+                lambda obra: texto_nivel(getattr(obra, 'viabilidad_ejecucion', 1) or 1, NIVELES_VIABILIDAD)),
+    ],
+}
+
+
+# ============================
+# VALORES PARA EXCEL
+# ============================
+
+EXCEL = {
+    'ID': Columna('ID', ['id_excel'], _id_excel),
+    'Proyecto': Columna('Proyecto', ['programa'], _programa),
+    'Área': Columna('Área', ['area_responsable'], _area),
+    'Área Responsable': Columna('Área Responsable', ['area_responsable'], _area),
+    'Presupuesto': Columna(
+        'Presupuesto', ['presupuesto_modificado', 'anteproyecto_total'],
+        lambda obra: float(presupuesto_vigente(obra))
+    ),
+    'Avance Físico': Columna(
+        'Avance Físico', ['avance_fisico_pct'],
+        lambda obra: float(getattr(obra, 'avance_fisico_pct', 0) or 0)
+    ),
+    'Estado': Columna('Estado', ['estatus_general'], _estado),
+    'Riesgo Nivel': Columna(
+        'Riesgo Nivel', ['riesgo_nivel'],
+        lambda obra: int(getattr(obra, 'riesgo_nivel', 1) or 1)
+    ),
+    'Viabilidad Ejecución': Columna(
+        'Viabilidad Ejecución', ['viabilidad_ejecucion'],
+        lambda obra: int(getattr(obra, 'viabilidad_ejecucion', 1) or 1)
+    ),
+    'Presupuesto Modificado': Columna(
+        'Presupuesto Modificado', ['presupuesto_modificado'],
+        lambda obra: float(getattr(obra, 'presupuesto_modificado', 0) or 0)
+    ),
+    'Anteproyecto': Columna(
+        'Anteproyecto', ['anteproyecto_total'],
+        lambda obra: float(getattr(obra, 'anteproyecto_total', 0) or 0)
+    ),
+    'Avance Financiero %': Columna(
+        'Avance Financiero %', ['avance_financiero_pct'],
+        lambda obra: float(getattr(obra, 'avance_financiero_pct', 0) or 0)
+    ),
+}
+
+_EXCEL_CARTERA = ['ID', 'Proyecto', 'Área', 'Presupuesto', 'Avance Físico', 'Estado']
+
+COLUMNAS_EXCEL = {
+    'ejecutivo': [EXCEL[h] for h in ['ID', 'Proyecto', 'Área Responsable', 'Presupuesto', 'Avance Físico', 'Estado']],
+    'cartera': [EXCEL[h] for h in _EXCEL_CARTERA],
+    'presupuesto': [EXCEL[h] for h in ['ID', 'Proyecto', 'Área', 'Presupuesto Modificado', 'Anteproyecto', 'Avance Financiero %']],
+    'riesgos': [EXCEL[h] for h in ['ID', 'Proyecto', 'Área', 'Riesgo Nivel', 'Viabilidad Ejecución']],
+}
+
+
+# ============================
+# CONSULTA DEL REGISTRO
+# ============================
+
+def columnas_pdf(tipo_reporte):
+    """Columnas de la tabla de detalle del PDF (vacía si el reporte no tiene tabla)"""
+    return COLUMNAS_PDF.get(tipo_reporte, [])
+
+
+def columnas_excel(tipo_reporte):
+    """Columnas de la hoja de detalle del Excel (cartera por defecto)"""
+    return COLUMNAS_EXCEL.get(tipo_reporte, COLUMNAS_EXCEL['cartera'])
+
+
+def campos_de(columnas):
+    """Campos únicos que necesitan las columnas, siempre con 'id'"""
+    campos = ['id']
+    for columna in columnas:
+        for campo in columna.campos:
+            if campo not in campos:
+                campos.append(campo)
+    return campos
+
+
+def campos_reporte(tipo_reporte):
+    """Campos que leen los renderizadores PDF y Excel de un tipo de reporte"""
+    return campos_de(columnas_pdf(tipo_reporte) + columnas_excel(tipo_reporte))
+
+
+def proyectar_obras(obras, tipo_reporte):
+    """Limita un queryset de obras a los campos que usa el reporte"""
+    if hasattr(obras, 'only'):
+        return obras.only(*campos_reporte(tipo_reporte))
+    return obras
@@ -0,0 +1,167 @@
+# Proyecto\POA_Reporte\backend\poa\concurrencia.py
+"""
+Renderizado concurrente de los formatos de un reporte.
+
+reportlab y openpyxl son Python puro: con hilos el PDF y el Excel se turnan
+el GIL y tardan lo mismo que uno tras otro. Por eso se renderizan en un pool
+de procesos. Los datos se leen una sola vez en el proceso principal y viajan
+ya materializados, así los procesos hijos no tocan la base de datos.
+"""
+import io
+import multiprocessing
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from types import SimpleNamespace
+
+import django
+from django.conf import settings
+
+from .columnas import campos_reporte
+from .generador import GeneradorReportes
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+# ============================
+# POOL
+# ============================
+
+def get_pool_render():
+    """
+    Pool para renderizar, creado en el primer uso.
+
+    Usa REPORTES_PROCESOS procesos; con 0 usa hilos (sin paralelismo real,
+    pero sin levantar procesos extra).
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            procesos = getattr(settings, 'REPORTES_PROCESOS', 2)
+            if procesos:
+                # spawn funciona igual en Linux y Windows y el hijo no hereda
+                # los hilos ni las conexiones abiertas del servidor
+                _pool = ProcessPoolExecutor(
+                    max_workers=procesos,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=django.setup
+                )
+            else:
+                _pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='render')
+        return _pool
+
+
+def _ejecutar(funcion, args):
+    """Corre en el pool: regresa el contenido generado en bytes"""
+    resultado = funcion(*args)
+    return resultado.getvalue() if hasattr(resultado, 'getvalue') else resultado
+
+
+def enviar(funcion, *args):
+    """
+    Envía `funcion(*args)` al pool y regresa el futuro con sus bytes.
+
+    `funcion` debe ser de nivel de módulo y los argumentos serializables con
+    pickle. Si un proceso hijo murió, el pool se recrea una vez.
+    """
+    global _pool
+    try:
+        return get_pool_render().submit(_ejecutar, funcion, args)
+    except BrokenProcessPool:
+        with _pool_lock:
+            _pool = None
+        return get_pool_render().submit(_ejecutar, funcion, args)
+
+
+# ============================
+# REPORTES DEL GENERADOR
+# ============================
+
+def filas_compartidas(obras, tipo_reporte):
+    """
+    Lee una sola vez los campos del reporte en filas que se pueden enviar a
+    otro proceso (las namedtuples de values_list no se serializan).
+    """
+    if not hasattr(obras, 'values_list'):
+        return list(obras)
+
+    campos = campos_reporte(tipo_reporte)
+    return [
+        SimpleNamespace(**dict(zip(campos, valores)))
+        for valores in obras.values_list(*campos).iterator(chunk_size=GeneradorReportes.CHUNK_STREAMING)
+    ]
+
+
+def renderizar_pdf(filas, config, estadisticas):
+    destino = io.BytesIO()
+    GeneradorReportes().generar_pdf_reporte(filas, config, estadisticas, destino=destino)
+    return destino
+
+
+def renderizar_excel(filas, config, estadisticas):
+    destino = io.BytesIO()
+    GeneradorReportes().generar_excel_reporte(filas, config, estadisticas, streaming=True, destino=destino)
+    return destino
+
+
+def renderizar_ambos(obras, config, estadisticas):
+    """Lanza el PDF y el Excel a la vez; regresa {'pdf': futuro, 'excel': futuro}"""
+    filas = filas_compartidas(obras, config.tipo_reporte)
+    return {
+        'pdf': enviar(renderizar_pdf, filas, config, estadisticas),
+        'excel': enviar(renderizar_excel, filas, config, estadisticas),
+    }
+
+
+# ============================
+# ZIP EN STREAMING
+# ============================
+
+class _SalidaZip(io.RawIOBase):
+    """
+    Destino del ZIP que junta lo escrito hasta que se vacía.
+
+    No permite seek, así zipfile escribe cada entrada de corrido (con data
+    descriptor) y el ZIP se puede enviar mientras se arma.
+    """
+    def __init__(self):
+        self._partes = []
+        self._posicion = 0
+
+    def writable(self):
+        return True
+
+    def write(self, datos):
+        self._partes.append(bytes(datos))
+        self._posicion += len(datos)
+        return len(datos)
+
+    def tell(self):
+        return self._posicion
+
+    def vaciar(self):
+        datos = b''.join(self._partes)
+        self._partes.clear()
+        return datos
+
+
+def zip_en_streaming(entradas, compresion=zipfile.ZIP_STORED):
+    """
+    Genera los bytes de un ZIP conforme terminan los futuros de `entradas`
+    ({nombre de archivo: futuro con bytes}), sin archivos intermedios.
+    """
+    salida = _SalidaZip()
+    nombres = {futuro: nombre for nombre, futuro in entradas.items()}
+    try:
+        with zipfile.ZipFile(salida, 'w', compresion) as zip_file:
+            for futuro in as_completed(nombres):
+                zip_file.writestr(nombres[futuro], futuro.result())
+                yield salida.vaciar()
+        # Directorio central
+        yield salida.vaciar()
+    finally:
+        # Si el cliente se desconecta, no seguir con lo que falte
+        for futuro in nombres:
+            futuro.cancel()
@@ -0,0 +1,71 @@
+# Proyecto\POA_Reporte\backend\poa\condicional.py
+"""
+GET condicional a partir de la versión de los datos.
+
+Las obras y direcciones solo cambian al importar o editar, y cada cambio
+incrementa su VersionDatos. El ETag es el hash de esas versiones y de la
+solicitud (ruta con parámetros y Accept), y Last-Modified es la fecha del
+último cambio. Si el cliente ya tiene esa versión, recibe 304 con una sola
+consulta a VersionDatos, sin ejecutar la vista ni serializar nada.
+"""
+import hashlib
+import json
+from calendar import timegm
+from datetime import datetime, time
+from functools import wraps
+
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .versiones import estado_versiones
+
+
+def etag_datos(request, versiones, dia=None):
+    """ETag fuerte de una respuesta según la solicitud y las versiones de los datos"""
+    contenido = {
+        'ruta': request.get_full_path(),
+        'accept': request.META.get('HTTP_ACCEPT', ''),
+        'versiones': versiones,
+        'dia': dia.isoformat() if dia else None,
+    }
+    texto = json.dumps(contenido, sort_keys=True, separators=(',', ':'))
+    return quote_etag(hashlib.sha256(texto.encode('utf-8')).hexdigest())
+
+
+def condicional(*modelos, por_dia=False):
+    """
+    Decorador de vistas GET que dependen de los datos de `modelos`.
+
+    Con `por_dia=True` la respuesta también cambia con la fecha (p. ej. una
+    vista previa cuyo corte por defecto es hoy): el ETag incluye el día y
+    Last-Modified no es anterior a la medianoche.
+    """
+    def decorador(vista):
+        @wraps(vista)
+        def envoltura(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return vista(request, *args, **kwargs)
+
+            versiones, ultimo = estado_versiones(*modelos)
+            dia = None
+            if por_dia:
+                dia = timezone.localdate()
+                medianoche = timezone.make_aware(datetime.combine(dia, time.min))
+                ultimo = max(ultimo, medianoche) if ultimo else medianoche
+
+            etag = etag_datos(request, versiones, dia)
+            last_modified = timegm(ultimo.utctimetuple()) if ultimo else None
+
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = vista(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+
+            response.headers.setdefault('ETag', etag)
+            if last_modified and not response.has_header('Last-Modified'):
+                response.headers['Last-Modified'] = http_date(last_modified)
+            return response
+        return envoltura
+    return decorador
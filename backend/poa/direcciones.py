@@ -0,0 +1,82 @@
+# Proyecto\POA_Reporte\backend\poa\direcciones.py
+"""
+Relación de las obras con su dirección.
+
+La hoja POA no trae la dirección, solo el texto de `area_responsable`. La
+llave foránea Obra.direccion se deriva de ese texto comparándolo (sin
+acentos, mayúsculas ni espacios de más) con el nombre y el código de cada
+Direccion: al guardar una obra, después de importar y cuando cambian las
+direcciones. Así los reportes por dirección filtran en SQL con un índice.
+"""
+import unicodedata
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Obra, Direccion
+from .versiones import incrementar_version
+
+
+def normalizar(texto):
+    """Texto comparable: minúsculas, sin acentos y con espacios simples"""
+    sin_acentos = unicodedata.normalize('NFKD', str(texto)).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(sin_acentos.lower().split())
+
+
+def mapa_direcciones():
+    """{texto normalizado: id de la dirección}; el nombre gana sobre el código"""
+    mapa = {}
+    direcciones = list(Direccion.objects.values_list('pk', 'nombre', 'codigo'))
+    for pk, _, codigo in direcciones:
+        if codigo:
+            mapa[normalizar(codigo)] = pk
+    for pk, nombre, _ in direcciones:
+        if nombre:
+            mapa[normalizar(nombre)] = pk
+    return mapa
+
+
+def direccion_de_area(area, mapa=None):
+    """Id de la dirección de un área responsable (None si ninguna coincide)"""
+    if not area:
+        return None
+    if mapa is None:
+        mapa = mapa_direcciones()
+    return mapa.get(normalizar(area))
+
+
+def filtrar_por_direcciones(obras, direcciones, prefijo=''):
+    """Obras de esas direcciones; sin direcciones no filtra"""
+    if not direcciones:
+        return obras
+    return obras.filter(**{f'{prefijo}direccion_id__in': list(direcciones)})
+
+
+def asignar_direcciones():
+    """
+    Vuelve a derivar la dirección de todas las obras, con un UPDATE por
+    dirección sobre las que cambian. Regresa cuántas obras cambiaron (e
+    incrementa la versión de las obras si hubo cambios).
+    """
+    mapa = mapa_direcciones()
+    areas_por_direccion = defaultdict(list)
+    for area in Obra.objects.order_by().values_list('area_responsable', flat=True).distinct():
+        areas_por_direccion[direccion_de_area(area, mapa)].append(area)
+
+    cambiadas = 0
+    with transaction.atomic():
+        for direccion_id, areas in areas_por_direccion.items():
+            filtro = Q(area_responsable__in=[area for area in areas if area is not None])
+            if None in areas:
+                filtro |= Q(area_responsable__isnull=True)
+            obras = Obra.objects.filter(filtro)
+            if direccion_id is None:
+                obras = obras.filter(direccion__isnull=False)
+            else:
+                obras = obras.exclude(direccion_id=direccion_id)
+            cambiadas += obras.update(direccion_id=direccion_id)
+
+    if cambiadas:
+        incrementar_version('obra')
+    return cambiadas
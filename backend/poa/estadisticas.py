@@ -0,0 +1,178 @@
+# Proyecto\POA_Reporte\backend\poa\estadisticas.py
+import math
+import re
+
+from django.db.models import Case, Count, F, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+# Estados que ya no cuentan como obras activas
+ESTADOS_CERRADOS = ('Completado', 'Cancelado')
+
+# Nivel desde el que una obra cuenta como de alto riesgo
+RIESGO_ALTO = 4
+
+# Las expresiones aceptan un prefijo ('obra__') para usarse desde modelos
+# relacionados con Obra
+
+
+def presupuesto_vigente(prefijo=''):
+    """Presupuesto vigente: el modificado, o el anteproyecto si el modificado es 0"""
+    return Case(
+        When(**{f'{prefijo}presupuesto_modificado': 0}, then=F(f'{prefijo}anteproyecto_total')),
+        default=F(f'{prefijo}presupuesto_modificado'),
+        output_field=FloatField(),
+    )
+
+
+def monto_ejecutado(prefijo=''):
+    """Monto ejecutado calculado dentro de la base de datos"""
+    return presupuesto_vigente(prefijo) * F(f'{prefijo}avance_financiero_pct') / 100.0
+
+
+def beneficiarios_de_obra(prefijo=''):
+    """
+    Beneficiarios de una obra: la población objetivo, o los beneficiarios
+    directos si no tiene (la misma regla que el tablero del frontend)
+    """
+    return Coalesce(
+        f'{prefijo}poblacion_objetivo_valor', f'{prefijo}beneficiarios_directos_valor', Value(0)
+    )
+
+
+PRESUPUESTO_VIGENTE = presupuesto_vigente()
+MONTO_EJECUTADO = monto_ejecutado()
+BENEFICIARIOS = beneficiarios_de_obra()
+
+
+def acumulados():
+    """Agregados SQL que alimentan los KPIs (para aggregate() o annotate())"""
+    return {
+        'obras': Count('id'),
+        'suma_modificado': Sum('presupuesto_modificado'),
+        'suma_anteproyecto': Sum('anteproyecto_total'),
+        'ejecutado': Sum(MONTO_EJECUTADO),
+        'suma_avance': Sum('avance_fisico_pct'),
+        'beneficiarios': Sum(BENEFICIARIOS),
+    }
+
+
+def agregados_por_grupo(obras):
+    """
+    Agrupa las obras por estado y área en UNA sola consulta.
+
+    Cada fila trae los acumulados que necesitan los KPIs del reporte;
+    el número de filas es pequeño (estados x áreas), no el de obras.
+    """
+    return (
+        obras.order_by()
+        .values('estatus_general', 'area_responsable')
+        .annotate(**acumulados())
+    )
+
+
+def _numero_de_texto(valor):
+    """Primer número del texto ignorando todo lo que no sea dígito o punto"""
+    if valor is None:
+        return None
+    limpio = re.sub(r'[^\d.]', '', str(valor))
+    match = re.match(r'\d*\.?\d+|\d+', limpio)
+    return float(match.group(0)) if match else None
+
+
+def _redondear(numero):
+    # Math.round de JavaScript (mitades hacia arriba)
+    return int(math.floor(numero + 0.5))
+
+
+def parse_poblacion(valor):
+    """
+    Población objetivo como entero (None si no trae número).
+
+    Igual que fetchProjects en el frontend: si el texto dice "mil" o el
+    número es menor a 1000, la cifra viene en miles.
+    """
+    numero = _numero_de_texto(valor)
+    if numero is None:
+        return None
+    if 'mil' in str(valor).lower() or numero < 1000:
+        numero *= 1000
+    return _redondear(numero)
+
+
+def parse_beneficiarios_directos(valor):
+    """Beneficiarios directos como entero (None si no trae número)"""
+    numero = _numero_de_texto(valor)
+    return _redondear(numero) if numero is not None else None
+
+
+def combinar_grupos(grupos):
+    """
+    Combina las filas agregadas en el diccionario de estadísticas.
+
+    Acepta cualquier iterable de diccionarios con las llaves de
+    `agregados_por_grupo`, así que sirve igual para la consulta en vivo
+    que para totales precalculados.
+    """
+    total_obras = 0
+    suma_modificado = 0.0
+    suma_anteproyecto = 0.0
+    presupuesto_ejecutado = 0.0
+    suma_avance = 0.0
+    beneficiarios_total = 0
+    obras_cerradas = 0
+    obras_por_estado = {}
+    obras_por_area = {}
+
+    for grupo in grupos:
+        cantidad = grupo['obras'] or 0
+        estado = grupo['estatus_general']
+        area = grupo['area_responsable']
+
+        total_obras += cantidad
+        suma_modificado += grupo['suma_modificado'] or 0
+        suma_anteproyecto += grupo['suma_anteproyecto'] or 0
+        presupuesto_ejecutado += grupo['ejecutado'] or 0
+        suma_avance += grupo['suma_avance'] or 0
+        beneficiarios_total += grupo['beneficiarios'] or 0
+
+        if estado in ESTADOS_CERRADOS:
+            obras_cerradas += cantidad
+        if estado:
+            obras_por_estado[estado] = obras_por_estado.get(estado, 0) + cantidad
+        if area:
+            obras_por_area[area] = obras_por_area.get(area, 0) + cantidad
+
+    # Si no hay presupuesto modificado, usar anteproyecto
+    presupuesto_total = suma_modificado or suma_anteproyecto
+    presupuesto_promedio = presupuesto_total / total_obras if total_obras > 0 else 0
+    avance_promedio = suma_avance / total_obras if total_obras > 0 else 0
+
+    return {
+        'total_obras': total_obras,
+        'total_proyectos': total_obras,  # Alias
+        'presupuesto_total': float(presupuesto_total),
+        'presupuesto_promedio': float(presupuesto_promedio),
+        'presupuesto_ejecutado': float(presupuesto_ejecutado),
+        'beneficiarios_total': int(beneficiarios_total),
+        'avance_promedio': float(avance_promedio),
+        'obras_por_estado': obras_por_estado,
+        'obras_por_area': obras_por_area,
+        'obras_activas': total_obras - obras_cerradas,
+    }
+
+
+def calcular_estadisticas(obras, con_riesgo=False):
+    """
+    Calcula todos los KPIs del reporte para un queryset de obras.
+
+    Con `con_riesgo`, la misma consulta cuenta también las obras de alto
+    riesgo ('proyectos_riesgo').
+    """
+    grupos = agregados_por_grupo(obras)
+    if not con_riesgo:
+        return combinar_grupos(grupos)
+
+    grupos = list(grupos.annotate(riesgo_alto=Count('id', filter=Q(riesgo_nivel__gte=RIESGO_ALTO))))
+    estadisticas = combinar_grupos(grupos)
+    estadisticas['proyectos_riesgo'] = sum(grupo['riesgo_alto'] for grupo in grupos)
+    return estadisticas
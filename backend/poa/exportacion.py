@@ -0,0 +1,56 @@
+# Proyecto\POA_Reporte\backend\poa\exportacion.py
+"""
+Exportación de obras en JSON por líneas (NDJSON) para ETL.
+
+Las filas salen de un cursor del lado del servidor (.iterator) ordenado por
+id y se envían por bloques, así la memoria no crece con el tamaño de la
+tabla. Cada línea incluye el id de la obra: si la transferencia se corta, se
+reanuda pidiendo desde el último id recibido.
+"""
+import zlib
+
+from .lista_obras import filas_obras
+from .renderers import a_json
+
+# Filas por lectura del cursor y por bloque enviado
+TAMANO_BLOQUE = 1000
+
+
+def lineas_ndjson(obras, fields=None, desde=None, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Genera bloques de líneas NDJSON de las obras con id mayor que `desde`.
+
+    Las filas tienen los mismos campos que /api/obras/ (o `fields`, siempre
+    con 'id').
+    """
+    if fields is not None and 'id' not in fields:
+        fields = ['id'] + list(fields)
+    if desde is not None:
+        obras = obras.filter(id__gt=desde)
+    filas, salida = filas_obras(obras.order_by('id'), fields)
+
+    def generar():
+        bloque = []
+        for fila in filas.iterator(chunk_size=tamano_bloque):
+            bloque.append(a_json(salida(fila)))
+            if len(bloque) >= tamano_bloque:
+                yield b'\n'.join(bloque) + b'\n'
+                bloque = []
+        if bloque:
+            yield b'\n'.join(bloque) + b'\n'
+
+    # filas_obras valida `fields` aquí, antes de empezar a enviar
+    return generar()
+
+
+def gzip_en_streaming(partes, nivel=6):
+    """
+    Comprime en gzip conforme llegan las partes. Cada reanudación es un
+    miembro gzip completo: los archivos concatenados se leen como uno solo.
+    """
+    compresor = zlib.compressobj(nivel, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for parte in partes:
+        datos = compresor.compress(parte)
+        if datos:
+            yield datos
+    yield compresor.flush()
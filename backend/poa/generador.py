@@ -1,19 +1,27 @@
 # Proyecto\POA_Reporte\backend\poa\generador.py
 
 import os
-import tempfile
 from datetime import datetime
+from itertools import chain, islice
 from django.conf import settings
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, landscape, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
+from reportlab.platypus import SimpleDocTemplate, Table, LongTable, TableStyle, Paragraph, Spacer, Image, Flowable
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch, cm
 from reportlab.lib.enums import TA_CENTER
+from reportlab.pdfbase.pdfmetrics import stringWidth
 from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, PatternFill, Border, Side, NamedStyle
 from openpyxl.utils import get_column_letter
 
+from .salida import SalidaReporte
+from .columnas import (
+    columnas_pdf, columnas_excel, campos_de, texto_nivel,
+    NIVELES_RIESGO, NIVELES_VIABILIDAD
+)
+
 
 class ConfiguracionReporte:
     """Clase simple para configuración de reportes"""
@@ -25,11 +33,101 @@ class ConfiguracionReporte:
         self.formato_salida = kwargs.get('formato_salida', 'pdf')
         self.incluir_graficos = kwargs.get('incluir_graficos', True)
         self.incluir_anexos = kwargs.get('incluir_anexos', False)
+        # Sin límite de filas en el detalle del PDF (cartera completa)
+        self.detalle_completo = kwargs.get('detalle_completo', False)
+
+
+# Estilo de las tablas de detalle; se arma una vez y lo comparten todos los bloques
+ESTILO_TABLA_DATOS = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1e40af')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('FONTSIZE', (0, 1), (-1, -1), 8),
+    ('LEFTPADDING', (0, 0), (-1, -1), 6),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+])
+
+
+class TablaPorBloques(Flowable):
+    """
+    Tabla larga que se arma por bloques mientras se construye el PDF.
+
+    DocumentoReporte la reemplaza por la siguiente tabla del iterador
+    `bloques` cuando llega al frente de la lista, así en memoria solo vive
+    el bloque que se está dibujando.
+    """
+    def __init__(self, bloques):
+        super().__init__()
+        self.bloques = bloques
+
+    def wrap(self, availWidth, availHeight):
+        return (0, 0)
+
+    def draw(self):
+        pass
+
+
+class DocumentoReporte(SimpleDocTemplate):
+    """SimpleDocTemplate que expande las TablaPorBloques al dibujarlas"""
+    def filterFlowables(self, flowables):
+        while flowables and isinstance(flowables[0], TablaPorBloques):
+            bloque = next(flowables[0].bloques, None)
+            if bloque is None:
+                # handle_flowable descarta los None sin vaciar la lista
+                flowables[0] = None
+            else:
+                flowables.insert(0, bloque)
+
+
+def anchos_columnas(encabezado, filas, tamano_encabezado=10, tamano_filas=8, relleno=12):
+    """Ancho de cada columna según el texto más largo del encabezado y las filas"""
+    anchos = [stringWidth(str(titulo), 'Helvetica-Bold', tamano_encabezado) for titulo in encabezado]
+    for fila in filas:
+        for i, valor in enumerate(fila):
+            anchos[i] = max(anchos[i], stringWidth(str(valor), 'Helvetica', tamano_filas))
+    return [ancho + relleno for ancho in anchos]
+
+
+def tablas_por_bloques(encabezado, filas, estilo, filas_por_tabla=500, anchos=None):
+    """
+    Genera LongTables de `filas_por_tabla` filas con el encabezado repetido.
+
+    Sin `anchos`, se calculan con el primer bloque y se reutilizan en los
+    demás para que las columnas no cambien de una tabla a otra.
+    """
+    filas = iter(filas)
+    while True:
+        bloque = list(islice(filas, filas_por_tabla))
+        if not bloque:
+            return
+        if anchos is None:
+            anchos = anchos_columnas(encabezado, bloque)
+        tabla = LongTable([encabezado] + bloque, colWidths=anchos, repeatRows=1)
+        tabla.setStyle(estilo)
+        yield tabla
 
 
 class GeneradorReportes:
     """Clase para generar reportes en diferentes formatos"""
     
+    # Filas leídas por consulta en modo streaming
+    CHUNK_STREAMING = 2000
+    
+    # Filas usadas para calcular los anchos de columna en modo streaming
+    MUESTRA_ANCHOS = 500
+    
+    # Filas del detalle mostradas en el PDF sin detalle_completo
+    LIMITE_DETALLE_PDF = 50
+    
+    # Filas por tabla del detalle completo; Table.split copia las filas
+    # restantes en cada página, así que tablas cortas mantienen el costo lineal
+    FILAS_POR_TABLA = 500
+    
     def __init__(self):
         self.styles = getSampleStyleSheet()
         self._configurar_estilos()
@@ -88,16 +186,22 @@ class GeneradorReportes:
             fontName='Helvetica-Bold'
         ))
     
-    def generar_pdf_reporte(self, obras, config, estadisticas):
-        """Genera reporte en formato PDF"""
+    def generar_pdf_reporte(self, obras, config, estadisticas, destino=None):
+        """
+        Genera reporte en formato PDF.
+
+        Escribe en `destino` (ruta o archivo abierto) si se indica; si no, en
+        una SalidaReporte nueva. Regresa el destino usado.
+        """
+        nueva = destino is None
+        if nueva:
+            destino = SalidaReporte(f"{config.nombre}.pdf")
         try:
-            # Crear archivo temporal
-            temp_file = tempfile.NamedTemporaryFile(suffix='.pdf', delete=False)
             
             # Configurar documento según tipo de reporte
             if config.tipo_reporte in ['cartera', 'presupuesto']:
-                doc = SimpleDocTemplate(
-                    temp_file.name,
+                doc = DocumentoReporte(
+                    destino,
                     pagesize=landscape(A4),
                     topMargin=1*cm,
                     bottomMargin=1*cm,
@@ -105,8 +209,8 @@ class GeneradorReportes:
                     rightMargin=1.5*cm
                 )
             else:
-                doc = SimpleDocTemplate(
-                    temp_file.name,
+                doc = DocumentoReporte(
+                    destino,
                     pagesize=A4,
                     topMargin=2*cm,
                     bottomMargin=2*cm,
@@ -136,10 +240,12 @@ class GeneradorReportes:
             # Generar PDF
             doc.build(elements)
             
-            return temp_file.name
+            return destino
             
         except Exception as e:
             print(f"Error al generar PDF: {str(e)}")
+            if nueva:
+                destino.close()
             raise
     
     def _crear_encabezado(self, config):
@@ -234,109 +340,34 @@ class GeneradorReportes:
         
         elementos.append(Paragraph("DETALLE DE PROYECTOS", self.styles['Seccion']))
         
-        # Preparar datos según tipo de reporte
-        data = []
-        
-        if config.tipo_reporte == 'ejecutivo':
-            headers = ['Proyecto', 'Área', 'Presupuesto', 'Avance', 'Estado']
-            data.append(headers)
-            
-            for obra in obras[:50]:  # Limitar a 50 para evitar PDFs muy grandes
-                presupuesto = getattr(obra, 'presupuesto_modificado', 0) or 0
-                if presupuesto <= 0:
-                    presupuesto = getattr(obra, 'anteproyecto_total', 0) or 0
-                
-                programa = getattr(obra, 'programa', 'Sin nombre') or 'Sin nombre'
-                area = getattr(obra, 'area_responsable', 'N/A') or 'N/A'
-                avance = getattr(obra, 'avance_fisico_pct', 0) or 0
-                estado = getattr(obra, 'estatus_general', 'N/A') or 'N/A'
-                
-                data.append([
-                    str(programa)[:50] + '...' if len(str(programa)) > 50 else str(programa),
-                    str(area)[:30],
-                    f"${float(presupuesto):,.2f}" if presupuesto else "N/A",
-                    f"{float(avance):.1f}%",
-                    str(estado)[:20]
-                ])
+        # Columnas declaradas para el tipo de reporte
+        columnas = columnas_pdf(config.tipo_reporte)
         
-        elif config.tipo_reporte == 'cartera':
-            headers = ['ID', 'Proyecto', 'Área', 'Presupuesto', 'Avance']
-            data.append(headers)
-            
-            for obra in obras[:50]:
-                presupuesto = getattr(obra, 'presupuesto_modificado', 0) or 0
-                if presupuesto <= 0:
-                    presupuesto = getattr(obra, 'anteproyecto_total', 0) or 0
-                
-                id_excel = getattr(obra, 'id_excel', obra.id)
-                programa = getattr(obra, 'programa', 'Sin nombre') or 'Sin nombre'
-                area = getattr(obra, 'area_responsable', 'N/A') or 'N/A'
-                avance = getattr(obra, 'avance_fisico_pct', 0) or 0
-                
-                data.append([
-                    str(id_excel),
-                    str(programa)[:40] + '...' if len(str(programa)) > 40 else str(programa),
-                    str(area)[:20],
-                    f"${float(presupuesto):,.2f}" if presupuesto else "N/A",
-                    f"{float(avance):.1f}%"
-                ])
+        if columnas and getattr(config, 'detalle_completo', False):
+            # Todas las obras: se leen por lotes y se dibujan en tablas por bloques
+            encabezado = [columna.titulo for columna in columnas]
+            filas = (
+                [columna.valor(obra) for columna in columnas]
+                for obra in self._iterar_filas(obras, columnas)
+            )
+            elementos.append(TablaPorBloques(
+                tablas_por_bloques(encabezado, filas, ESTILO_TABLA_DATOS, self.FILAS_POR_TABLA)
+            ))
+            elementos.append(Spacer(1, 1*cm))
+            return elementos
         
-        elif config.tipo_reporte == 'presupuesto':
-            headers = ['Proyecto', 'Área', 'Presupuesto', 'Ejecutado', '% Ejecución']
-            data.append(headers)
-            
-            for obra in obras[:50]:
-                presupuesto_mod = getattr(obra, 'presupuesto_modificado', 0) or 0
-                anteproyecto = getattr(obra, 'anteproyecto_total', 0) or 0
-                avance_financiero = getattr(obra, 'avance_financiero_pct', 0) or 0
-                
-                presupuesto = presupuesto_mod if presupuesto_mod > 0 else anteproyecto
-                ejecutado = float(presupuesto) * (float(avance_financiero) / 100) if presupuesto and avance_financiero else 0
-                
-                programa = getattr(obra, 'programa', 'Sin nombre') or 'Sin nombre'
-                area = getattr(obra, 'area_responsable', 'N/A') or 'N/A'
-                
-                data.append([
-                    str(programa)[:40] + '...' if len(str(programa)) > 40 else str(programa),
-                    str(area)[:20],
-                    f"${float(presupuesto):,.2f}" if presupuesto else "N/A",
-                    f"${ejecutado:,.2f}",
-                    f"{float(avance_financiero):.1f}%"
-                ])
+        data = []
         
-        elif config.tipo_reporte == 'riesgos':
-            headers = ['Proyecto', 'Área', 'Riesgo', 'Viabilidad']
-            data.append(headers)
-            
-            for obra in obras[:50]:
-                programa = getattr(obra, 'programa', 'Sin nombre') or 'Sin nombre'
-                area = getattr(obra, 'area_responsable', 'N/A') or 'N/A'
-                riesgo = getattr(obra, 'riesgo_nivel', 1) or 1
-                viabilidad = getattr(obra, 'viabilidad_ejecucion', 1) or 1
-                
-                data.append([
-                    str(programa)[:40] + '...' if len(str(programa)) > 40 else str(programa),
-                    str(area)[:20],
-                    self._get_riesgo_text(riesgo),
-                    self._get_viabilidad_text(viabilidad)
-                ])
+        if columnas:
+            data.append([columna.titulo for columna in columnas])
+            
+            for obra in obras[:self.LIMITE_DETALLE_PDF]:  # Limitar para evitar PDFs muy grandes
+                data.append([columna.valor(obra) for columna in columnas])
         
         # Crear tabla solo si hay datos
         if len(data) > 1:
             table = Table(data, repeatRows=1)
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1e40af')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('FONTSIZE', (0, 1), (-1, -1), 8),
-                ('LEFTPADDING', (0, 0), (-1, -1), 6),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-            ]))
+            table.setStyle(ESTILO_TABLA_DATOS)
             
             elementos.append(table)
         
@@ -383,11 +414,23 @@ class GeneradorReportes:
         
         return elementos
     
-    def generar_excel_reporte(self, obras, config, estadisticas):
-        """Genera reporte en formato Excel"""
+    def generar_excel_reporte(self, obras, config, estadisticas, streaming=None, destino=None):
+        """
+        Genera reporte en formato Excel.
+
+        Con streaming=True (por defecto cuando `obras` es un QuerySet) usa el
+        modo de solo escritura; con False construye el Workbook completo.
+        `destino` funciona igual que en generar_pdf_reporte.
+        """
+        if streaming is None:
+            streaming = hasattr(obras, 'values_list')
+        if streaming:
+            return self._generar_excel_streaming(obras, config, estadisticas, destino)
+        
+        nueva = destino is None
+        if nueva:
+            destino = SalidaReporte(f"{config.nombre}.xlsx")
         try:
-            # Crear archivo temporal
-            temp_file = tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False)
             
             wb = Workbook()
             
@@ -441,19 +484,12 @@ class GeneradorReportes:
             # Hoja de datos detallados
             ws_detalle = wb.create_sheet("Detalle")
             
-            # Encabezados según tipo de reporte
-            if config.tipo_reporte == 'ejecutivo':
-                headers = ['ID', 'Proyecto', 'Área Responsable', 'Presupuesto', 'Avance Físico', 'Estado']
-            elif config.tipo_reporte == 'presupuesto':
-                headers = ['ID', 'Proyecto', 'Área', 'Presupuesto Modificado', 'Anteproyecto', 'Avance Financiero %']
-            elif config.tipo_reporte == 'riesgos':
-                headers = ['ID', 'Proyecto', 'Área', 'Riesgo Nivel', 'Viabilidad Ejecución']
-            else:  # cartera o por defecto
-                headers = ['ID', 'Proyecto', 'Área', 'Presupuesto', 'Avance Físico', 'Estado']
+            # Columnas según tipo de reporte
+            columnas = columnas_excel(config.tipo_reporte)
             
             # Escribir encabezados
-            for col, header in enumerate(headers, 1):
-                cell = ws_detalle.cell(row=1, column=col, value=header)
+            for col, columna in enumerate(columnas, 1):
+                cell = ws_detalle.cell(row=1, column=col, value=columna.titulo)
                 cell.fill = header_fill
                 cell.font = header_font
                 cell.alignment = center_alignment
@@ -462,8 +498,8 @@ class GeneradorReportes:
             # Escribir datos
             row = 2
             for obra in obras:
-                for col, header in enumerate(headers, 1):
-                    value = self._get_excel_cell_value(obra, header, config.tipo_reporte)
+                for col, columna in enumerate(columnas, 1):
+                    value = self._get_excel_cell_value(obra, columna)
                     cell = ws_detalle.cell(row=row, column=col, value=value)
                     cell.border = border
                 
@@ -483,77 +519,147 @@ class GeneradorReportes:
                 ws_detalle.column_dimensions[column_letter].width = adjusted_width
             
             # Guardar archivo
-            wb.save(temp_file.name)
+            wb.save(destino)
             
-            return temp_file.name
+            return destino
             
         except Exception as e:
             print(f"Error al generar Excel: {str(e)}")
+            if nueva:
+                destino.close()
             raise
     
-    def _get_excel_cell_value(self, obra, header, tipo_reporte):
-        """Obtiene el valor para una celda de Excel según el header"""
+    def _registrar_estilos_excel(self, wb):
+        """Registra los estilos con nombre compartidos por todas las celdas"""
+        border = Border(
+            left=Side(style='thin'),
+            right=Side(style='thin'),
+            top=Side(style='thin'),
+            bottom=Side(style='thin')
+        )
+        wb.add_named_style(NamedStyle(
+            name='encabezado_detalle',
+            fill=PatternFill(start_color="1e40af", end_color="1e40af", fill_type="solid"),
+            font=Font(color="FFFFFF", bold=True),
+            alignment=Alignment(horizontal="center", vertical="center"),
+            border=border
+        ))
+        wb.add_named_style(NamedStyle(name='celda_detalle', border=border))
+    
+    def _celda(self, ws, value, style=None, font=None, alignment=None):
+        """Crea una celda para una hoja de solo escritura"""
+        cell = WriteOnlyCell(ws, value=value)
+        if style:
+            cell.style = style
+        if font:
+            cell.font = font
+        if alignment:
+            cell.alignment = alignment
+        return cell
+    
+    def _iterar_filas(self, obras, columnas):
+        """
+        Itera las obras leyendo de la BD solo los campos de las columnas.
+        
+        Las filas son namedtuples, así que las columnas las leen igual que
+        a instancias del modelo.
+        """
+        if not hasattr(obras, 'values_list'):
+            return iter(obras)
+        
+        return obras.values_list(*campos_de(columnas), named=True).iterator(chunk_size=self.CHUNK_STREAMING)
+    
+    def _generar_excel_streaming(self, obras, config, estadisticas, destino=None):
+        """Genera el Excel en modo de solo escritura, fila por fila"""
+        nueva = destino is None
+        if nueva:
+            destino = SalidaReporte(f"{config.nombre}.xlsx")
         try:
-            if header == 'ID':
-                return getattr(obra, 'id_excel', obra.id)
-            elif header == 'Proyecto':
-                return str(getattr(obra, 'programa', 'Sin nombre') or 'Sin nombre')
-            elif header in ['Área', 'Área Responsable']:
-                return str(getattr(obra, 'area_responsable', 'N/A') or 'N/A')
-            elif header == 'Presupuesto':
-                presupuesto = getattr(obra, 'presupuesto_modificado', 0) or 0
-                if presupuesto <= 0:
-                    presupuesto = getattr(obra, 'anteproyecto_total', 0) or 0
-                return float(presupuesto)
-            elif header == 'Avance Físico':
-                return float(getattr(obra, 'avance_fisico_pct', 0) or 0)
-            elif header == 'Estado':
-                return str(getattr(obra, 'estatus_general', 'N/A') or 'N/A')
-            elif header == 'Riesgo Nivel':
-                return int(getattr(obra, 'riesgo_nivel', 1) or 1)
-            elif header == 'Viabilidad Ejecución':
-                return int(getattr(obra, 'viabilidad_ejecucion', 1) or 1)
-            elif header == 'Presupuesto Modificado':
-                return float(getattr(obra, 'presupuesto_modificado', 0) or 0)
-            elif header == 'Anteproyecto':
-                return float(getattr(obra, 'anteproyecto_total', 0) or 0)
-            elif header == 'Avance Financiero %':
-                return float(getattr(obra, 'avance_financiero_pct', 0) or 0)
-            else:
-                return ''
+            
+            wb = Workbook(write_only=True)
+            self._registrar_estilos_excel(wb)
+            
+            # Hoja de resumen
+            ws_resumen = wb.create_sheet("Resumen")
+            
+            fecha_display = config.fecha_corte.strftime('%d/%m/%Y') if hasattr(config.fecha_corte, 'strftime') else str(config.fecha_corte)
+            
+            ws_resumen.merged_cells.add('A1:E1')
+            ws_resumen.append([self._celda(
+                ws_resumen,
+                f"REPORTE {self._get_tipo_reporte_display(config.tipo_reporte).upper()} - POA 2026",
+                font=Font(size=16, bold=True),
+                alignment=Alignment(horizontal="center", vertical="center")
+            )])
+            ws_resumen.append([
+                f"Período: {self._get_periodo_display(config.periodo)}",
+                f"Fecha de corte: {fecha_display}",
+                f"Total proyectos: {estadisticas.get('total_obras', 0)}",
+                f"Presupuesto total: ${estadisticas.get('presupuesto_total', 0):,.2f}",
+                f"Beneficiarios: {estadisticas.get('beneficiarios_total', 0):,}",
+            ])
+            ws_resumen.append([])
+            ws_resumen.append([self._celda(ws_resumen, "ESTADÍSTICAS DEL REPORTE", font=Font(bold=True, size=12))])
+            ws_resumen.append(['Total de Proyectos', estadisticas.get('total_obras', 0)])
+            ws_resumen.append(['Presupuesto Total', f"${estadisticas.get('presupuesto_total', 0):,.2f}"])
+            ws_resumen.append(['Beneficiarios Totales', estadisticas.get('beneficiarios_total', 0)])
+            ws_resumen.append(['Avance Promedio', f"{estadisticas.get('avance_promedio', 0):.1f}%"])
+            ws_resumen.append(['Presupuesto Promedio', f"${estadisticas.get('presupuesto_promedio', 0):,.2f}"])
+            
+            # Hoja de datos detallados
+            ws_detalle = wb.create_sheet("Detalle")
+            columnas = columnas_excel(config.tipo_reporte)
+            filas = self._iterar_filas(obras, columnas)
+            
+            # El xlsx guarda los anchos antes que los datos: se calculan con
+            # las primeras filas del mismo recorrido, que luego se escriben
+            anchos = [len(columna.titulo) for columna in columnas]
+            muestra = []
+            for obra in islice(filas, self.MUESTRA_ANCHOS):
+                valores = [self._get_excel_cell_value(obra, columna) for columna in columnas]
+                for i, value in enumerate(valores):
+                    if value and len(str(value)) > anchos[i]:
+                        anchos[i] = len(str(value))
+                muestra.append(valores)
+            
+            for col, ancho in enumerate(anchos, 1):
+                ws_detalle.column_dimensions[get_column_letter(col)].width = min(ancho + 2, 50)
+            
+            ws_detalle.append([self._celda(ws_detalle, columna.titulo, style='encabezado_detalle') for columna in columnas])
+            
+            resto = (
+                [self._get_excel_cell_value(obra, columna) for columna in columnas]
+                for obra in filas
+            )
+            for valores in chain(muestra, resto):
+                ws_detalle.append([self._celda(ws_detalle, value, style='celda_detalle') for value in valores])
+            
+            # Guardar archivo
+            wb.save(destino)
+            
+            return destino
+            
+        except Exception as e:
+            print(f"Error al generar Excel: {str(e)}")
+            if nueva:
+                destino.close()
+            raise
+    
+    def _get_excel_cell_value(self, obra, columna):
+        """Obtiene el valor para una celda de Excel según la columna"""
+        try:
+            return columna.valor(obra)
         except Exception as e:
-            print(f"Error obteniendo valor para {header}: {str(e)}")
+            print(f"Error obteniendo valor para {columna.titulo}: {str(e)}")
             return ''
     
     def _get_riesgo_text(self, nivel):
         """Convierte nivel de riesgo numérico a texto"""
-        niveles = {
-            1: "Muy Bajo",
-            2: "Bajo", 
-            3: "Medio",
-            4: "Alto",
-            5: "Muy Alto"
-        }
-        try:
-            nivel_int = int(nivel)
-            return niveles.get(nivel_int, f"Nivel {nivel_int}")
-        except:
-            return "N/A"
+        return texto_nivel(nivel, NIVELES_RIESGO)
     
     def _get_viabilidad_text(self, nivel):
         """Convierte viabilidad numérica a texto"""
-        niveles = {
-            1: "Muy Baja",
-            2: "Baja",
-            3: "Media",
-            4: "Alta",
-            5: "Muy Alta"
-        }
-        try:
-            nivel_int = int(nivel)
-            return niveles.get(nivel_int, f"Nivel {nivel_int}")
-        except:
-            return "N/A"
+        return texto_nivel(nivel, NIVELES_VIABILIDAD)
     
     def _get_tipo_reporte_display(self, tipo_reporte):
         """Obtiene el nombre display del tipo de reporte"""
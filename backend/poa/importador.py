@@ -0,0 +1,243 @@
+# Proyecto\POA_Reporte\backend\poa\importador.py
+"""
+Importación masiva de la hoja POA (67 columnas) al modelo Obra.
+
+La hoja se lee completa con pandas, cada columna se limpia con las
+funciones por Series de utils.py y las filas se cargan con
+bulk_create por lotes (upsert sobre las existentes), usando id_excel
+como llave.
+"""
+import importlib.util
+import time
+
+import numpy as np
+import pandas as pd
+from django.db import transaction
+
+from .models import Obra
+from .utils import (
+    clean_money_series, clean_percentage_series, interpretar_escala_series,
+    poblacion_series, beneficiarios_directos_series
+)
+from .resumen import recalcular_resumen
+from .territorio import recalcular_alcaldias
+from .direcciones import mapa_direcciones, direccion_de_area
+from .versiones import incrementar_version
+from .signals import senales_en_pausa
+
+# Campos de Obra en el orden de las columnas de la hoja (col 0 a col 66)
+COLUMNAS_POA = (
+    'id_excel', 'programa', 'area_responsable', 'eje_institucional', 'tipo_recurso',
+    'concentrado_programas', 'capitulo_gasto',
+    'presupuesto_modificado', 'anteproyecto_total', 'meta_2025', 'meta_2026',
+    'unidad_medida', 'costo_unitario', 'proyecto_2025_presupuesto', 'multianualidad',
+    'tipo_obra', 'alcance_territorial', 'fuente_financiamiento', 'etapa_desarrollo',
+    'complejidad_tecnica', 'impacto_social', 'alineacion_estrategica', 'impacto_social_nivel',
+    'urgencia', 'viabilidad_ejecucion', 'recursos_disponibles', 'riesgo_nivel',
+    'dependencias_nivel',
+    'puntuacion_final', 'viabilidad_tecnica_semaforo', 'viabilidad_presupuestal_semaforo',
+    'viabilidad_juridica_semaforo', 'viabilidad_temporal_semaforo',
+    'viabilidad_administrativa_semaforo',
+    'alcaldias', 'ubicacion_especifica', 'beneficiarios_directos', 'poblacion_objetivo_num',
+    'fecha_inicio_prog', 'fecha_termino_prog', 'duracion_meses', 'fecha_inicio_real',
+    'fecha_termino_real',
+    'avance_fisico_pct', 'avance_financiero_pct', 'estatus_general', 'permisos_requeridos',
+    'estatus_permisos',
+    'requisitos_especificos', 'responsable_operativo', 'contratista', 'observaciones',
+    'problemas_identificados', 'acciones_correctivas', 'ultima_actualizacion',
+    'problema_resuelve', 'solucion_ofrece', 'beneficio_ciudadania', 'dato_destacable',
+    'alineacion_gobierno', 'poblacion_perfil',
+    'relevancia_comunicacional', 'hitos_comunicacionales', 'mensajes_clave',
+    'estrategia_comunicacion', 'control_captura', 'control_notas',
+)
+
+CAMPOS_DINERO = (
+    'presupuesto_modificado', 'anteproyecto_total', 'meta_2025', 'meta_2026',
+    'costo_unitario', 'proyecto_2025_presupuesto', 'puntuacion_final',
+)
+CAMPOS_PORCENTAJE = ('avance_fisico_pct', 'avance_financiero_pct')
+CAMPOS_ESCALA = (
+    'complejidad_tecnica', 'impacto_social', 'alineacion_estrategica', 'impacto_social_nivel',
+    'urgencia', 'viabilidad_ejecucion', 'recursos_disponibles', 'riesgo_nivel',
+    'dependencias_nivel',
+)
+CAMPOS_FECHA = (
+    'fecha_inicio_prog', 'fecha_termino_prog', 'fecha_inicio_real', 'fecha_termino_real',
+    'ultima_actualizacion',
+)
+
+# Columnas calculadas a partir de la hoja (no vienen en ella)
+CAMPOS_DERIVADOS = ('beneficiarios_directos_valor', 'poblacion_objetivo_valor')
+
+TAMANO_LOTE = 1000
+
+# python-calamine (opcional) lee .xlsx varias veces más rápido que openpyxl
+MOTOR_EXCEL = 'calamine' if importlib.util.find_spec('python_calamine') else None
+
+
+# ============================
+# LECTURA
+# ============================
+
+def leer_hoja(archivo, hoja=0, fila_encabezado=0):
+    """Lee la hoja POA (Excel o CSV) en un DataFrame con las columnas del modelo"""
+    nombre = str(getattr(archivo, 'name', archivo)).lower()
+    if nombre.endswith('.csv'):
+        df = pd.read_csv(archivo, header=fila_encabezado, dtype=object)
+    else:
+        df = pd.read_excel(archivo, sheet_name=hoja, header=fila_encabezado, engine=MOTOR_EXCEL)
+
+    if df.shape[1] < len(COLUMNAS_POA):
+        raise ValueError(
+            f"La hoja tiene {df.shape[1]} columnas; se esperaban {len(COLUMNAS_POA)}"
+        )
+
+    df = df.iloc[:, :len(COLUMNAS_POA)]
+    df.columns = COLUMNAS_POA
+    # Filas totalmente vacías (formato sobrante al final de la hoja)
+    return df.dropna(how='all').reset_index(drop=True)
+
+
+# ============================
+# LIMPIEZA POR COLUMNA
+# ============================
+
+def _nulos_a_none(serie):
+    return serie.astype(object).where(serie.notna(), None)
+
+
+def _texto(serie, max_length=None):
+    """Texto recortado; vacíos a None y números enteros sin '.0'"""
+    if pd.api.types.is_float_dtype(serie):
+        enteros = serie.notna() & (serie % 1 == 0)
+        texto = serie.astype(str).astype(object)
+        texto[enteros] = serie[enteros].astype('int64').astype(str)
+    else:
+        texto = serie.astype(str).astype(object).where(serie.notna())
+    texto = texto.str.strip()
+    if max_length:
+        texto = texto.str.slice(0, max_length)
+    return _nulos_a_none(texto.where(texto != ''))
+
+
+def _fecha(serie):
+    """Fechas ISO (lo que entrega Excel) y, para el resto, formato día/mes/año"""
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        fechas = serie
+    else:
+        fechas = pd.to_datetime(serie, errors='coerce', format='ISO8601')
+        resto = fechas.isna() & serie.notna()
+        if resto.any():
+            fechas[resto] = pd.to_datetime(serie[resto], errors='coerce', dayfirst=True, format='mixed')
+    return _nulos_a_none(fechas.dt.date.where(fechas.notna()))
+
+
+def _entero(serie):
+    numeros = clean_money_series(serie, nulo=np.nan)
+    return _nulos_a_none(numeros.round().astype('Int64'))
+
+
+def limpiar_hoja(df):
+    """Convierte el DataFrame crudo en columnas listas para Obra"""
+    limpio = {}
+    for nombre in COLUMNAS_POA:
+        campo = Obra._meta.get_field(nombre)
+        serie = df[nombre]
+
+        if nombre == 'id_excel':
+            limpio[nombre] = _entero(serie)
+        elif nombre in CAMPOS_ESCALA:
+            limpio[nombre] = interpretar_escala_series(serie)
+        elif nombre in CAMPOS_PORCENTAJE:
+            limpio[nombre] = clean_percentage_series(serie)
+        elif nombre in CAMPOS_DINERO:
+            if campo.null:
+                limpio[nombre] = _nulos_a_none(clean_money_series(serie, nulo=np.nan))
+            else:
+                limpio[nombre] = clean_money_series(serie)
+        elif nombre in CAMPOS_FECHA:
+            limpio[nombre] = _fecha(serie)
+        else:
+            limpio[nombre] = _texto(serie, getattr(campo, 'max_length', None))
+
+    limpio['beneficiarios_directos_valor'] = beneficiarios_directos_series(limpio['beneficiarios_directos'])
+    limpio['poblacion_objetivo_valor'] = poblacion_series(limpio['poblacion_objetivo_num'])
+
+    limpio = pd.DataFrame(limpio)
+
+    # Si un id_excel se repite, gana la última fila
+    con_id = limpio['id_excel'].notna()
+    duplicados = con_id & limpio['id_excel'].duplicated(keep='last')
+    return limpio[~duplicados].reset_index(drop=True)
+
+
+# ============================
+# CARGA
+# ============================
+
+def importar_obras(archivo, hoja=0, fila_encabezado=0, reemplazar=False, tamano_lote=TAMANO_LOTE):
+    """
+    Importa la hoja POA: crea las obras nuevas y actualiza las existentes.
+
+    Con `reemplazar=True` también borra las obras cuyo id_excel ya no
+    aparece en la hoja. Las filas sin id_excel se omiten (no hay con qué
+    encontrarlas en la siguiente importación y se duplicarían); se cuentan
+    en 'sin_id'. Regresa un resumen con los conteos.
+    """
+    inicio = time.perf_counter()
+    df = limpiar_hoja(leer_hoja(archivo, hoja=hoja, fila_encabezado=fila_encabezado))
+
+    registros = [r for r in df.to_dict('records') if r['id_excel'] is not None]
+    ids_hoja = {r['id_excel'] for r in registros}
+
+    with transaction.atomic():
+        existentes = {}
+        ids = list(ids_hoja)
+        for i in range(0, len(ids), tamano_lote):
+            existentes.update(
+                Obra.objects.filter(id_excel__in=ids[i:i + tamano_lote]).values_list('id_excel', 'pk')
+            )
+
+        eliminadas = 0
+        if reemplazar:
+            conservar = set(existentes.values())
+            sobrantes = [pk for pk in Obra.objects.values_list('pk', flat=True) if pk not in conservar]
+            with senales_en_pausa():
+                for i in range(0, len(sobrantes), tamano_lote):
+                    # delete()[0] también cuenta las filas borradas en cascada
+                    _, borradas = Obra.objects.filter(pk__in=sobrantes[i:i + tamano_lote]).delete()
+                    eliminadas += borradas.get(Obra._meta.label, 0)
+
+        obras = []
+        actualizadas = 0
+        direcciones = mapa_direcciones()
+        for registro in registros:
+            pk = existentes.get(registro['id_excel'])
+            if pk is not None:
+                actualizadas += 1
+            direccion_id = direccion_de_area(registro['area_responsable'], direcciones)
+            obras.append(Obra(pk=pk, direccion_id=direccion_id, **registro))
+
+        # Las obras con pk se actualizan con INSERT ... ON CONFLICT (upsert);
+        # bulk_update arma un CASE por campo y es mucho más lento con 66 columnas
+        Obra.objects.bulk_create(
+            obras,
+            batch_size=tamano_lote,
+            update_conflicts=True,
+            unique_fields=['id'],
+            update_fields=[c for c in COLUMNAS_POA + CAMPOS_DERIVADOS if c != 'id_excel'] + ['direccion'],
+        )
+
+        # bulk_create/bulk_update no disparan señales
+        recalcular_resumen()
+        recalcular_alcaldias()
+        incrementar_version('obra')
+
+    return {
+        'filas': len(df),
+        'creadas': len(obras) - actualizadas,
+        'actualizadas': actualizadas,
+        'eliminadas': eliminadas,
+        'sin_id': len(df) - len(registros),
+        'segundos': round(time.perf_counter() - inicio, 2),
+    }
@@ -0,0 +1,146 @@
+# Proyecto\POA_Reporte\backend\poa\instantanea.py
+"""
+Instantánea columnar (Parquet) de las obras para análisis.
+
+Los análisis leen el archivo y no la base de datos. Las columnas van con
+tipo: escalas 1-5 como int8, montos como float64, fechas como date32 y los
+textos cortos (áreas, estatus, semáforos) codificados con diccionario. El
+archivo lleva la versión de los datos en el nombre y solo se vuelve a
+escribir cuando las obras cambian.
+
+Requiere pyarrow (en requirements.txt); si no está instalado se lanza
+ImproperlyConfigured.
+"""
+import glob
+import importlib.util
+import os
+import tempfile
+from itertools import islice
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models
+from django.utils import timezone
+
+from .models import Obra
+from .versiones import version_datos
+from .cache_reportes import candado_reporte
+
+PYARROW_DISPONIBLE = importlib.util.find_spec('pyarrow') is not None
+
+CONTENT_TYPE = 'application/vnd.apache.parquet'
+
+# Filas por lectura del cursor y por lote (row group) del archivo
+TAMANO_LOTE = 5000
+
+# Escalas 1-5: caben en int8
+CAMPOS_ESCALA = (
+    'complejidad_tecnica', 'impacto_social', 'alineacion_estrategica', 'impacto_social_nivel',
+    'urgencia', 'viabilidad_ejecucion', 'recursos_disponibles', 'riesgo_nivel',
+    'dependencias_nivel',
+)
+
+
+def directorio():
+    """Carpeta de las instantáneas (ANALITICA_DIR o MEDIA_ROOT/analitica)"""
+    return getattr(settings, 'ANALITICA_DIR', os.path.join(settings.MEDIA_ROOT, 'analitica'))
+
+
+def ruta_instantanea(version):
+    return os.path.join(directorio(), f"obras_v{version}.parquet")
+
+
+# ============================
+# ESQUEMA
+# ============================
+
+def tipo_arrow(pa, campo):
+    """Tipo Arrow de un campo de Obra"""
+    if isinstance(campo, (models.BigIntegerField, models.ForeignKey)):
+        return pa.int64()
+    if campo.name in CAMPOS_ESCALA:
+        return pa.int8()
+    if isinstance(campo, models.IntegerField):
+        return pa.int32()
+    if isinstance(campo, models.FloatField):
+        return pa.float64()
+    if isinstance(campo, models.DateTimeField):
+        return pa.timestamp('us', tz='UTC')
+    if isinstance(campo, models.DateField):
+        return pa.date32()
+    if isinstance(campo, models.CharField):
+        # Dimensiones con pocos valores distintos
+        return pa.dictionary(pa.int32(), pa.string())
+    return pa.string()
+
+
+def esquema(pa, version):
+    campos = Obra._meta.concrete_fields
+    return pa.schema(
+        [pa.field(campo.attname, tipo_arrow(pa, campo)) for campo in campos],
+        metadata={'poa_version': str(version), 'generado_en': timezone.now().isoformat()}
+    )
+
+
+def _lote(pa, esquema, filas):
+    """RecordBatch de una lista de tuplas de values_list"""
+    arreglos = []
+    for campo, valores in zip(esquema, zip(*filas)):
+        if pa.types.is_dictionary(campo.type):
+            arreglos.append(pa.array(valores, type=pa.string()).dictionary_encode())
+        else:
+            arreglos.append(pa.array(valores, type=campo.type))
+    return pa.RecordBatch.from_arrays(arreglos, schema=esquema)
+
+
+# ============================
+# GENERACIÓN
+# ============================
+
+def generar_instantanea(forzar=False):
+    """
+    Ruta de la instantánea de la versión actual de las obras; la escribe
+    si no existe (o si `forzar`). Las de versiones anteriores se borran.
+    """
+    if not PYARROW_DISPONIBLE:
+        raise ImproperlyConfigured("Las instantáneas Parquet requieren pyarrow (pip install pyarrow)")
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    version = version_datos('obra')
+    ruta = ruta_instantanea(version)
+    with candado_reporte(ruta):
+        if os.path.exists(ruta) and not forzar:
+            return ruta
+
+        os.makedirs(directorio(), exist_ok=True)
+        esquema_obras = esquema(pa, version)
+        filas = (
+            Obra.objects.order_by('id')
+            .values_list(*esquema_obras.names)
+            .iterator(chunk_size=TAMANO_LOTE)
+        )
+
+        # Se escribe en un temporal y se renombra: nadie lee un archivo a medias
+        fd, temporal = tempfile.mkstemp(dir=directorio(), suffix='.parquet.tmp')
+        os.close(fd)
+        try:
+            with pq.ParquetWriter(temporal, esquema_obras) as escritor:
+                while True:
+                    lote = list(islice(filas, TAMANO_LOTE))
+                    if not lote:
+                        break
+                    escritor.write_batch(_lote(pa, esquema_obras, lote))
+            os.replace(temporal, ruta)
+        except BaseException:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            raise
+
+    for anterior in glob.glob(os.path.join(directorio(), 'obras_v*.parquet')):
+        if anterior != ruta:
+            try:
+                os.remove(anterior)
+            except OSError:
+                pass
+    return ruta
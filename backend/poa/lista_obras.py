@@ -0,0 +1,88 @@
+# Proyecto\POA_Reporte\backend\poa\lista_obras.py
+"""
+Lista de obras en bloque.
+
+ObraSerializer calcula el semáforo, el presupuesto final, el monto ejecutado
+y las etiquetas de las escalas con un SerializerMethodField por obra y por
+campo, el camino más lento de DRF. Para listar la cartera, esos campos se
+calculan en la misma consulta con expresiones CASE y cada fila sale de
+values() con las mismas llaves, en el mismo orden, que el serializer.
+"""
+from django.db.models import Case, CharField, F, FloatField, Q, Value, When
+from django.db.models.functions import Cast, Concat
+
+from .serializers import ObraSerializer, TEXTOS_ESCALA
+
+# Prefijo de las anotaciones (no pueden llamarse igual que un campo de Obra)
+PREFIJO = 'calc_'
+
+
+def etiqueta_escala(campo):
+    """CASE equivalente a ObraSerializer._to_text"""
+    return Case(
+        *[When(**{campo: valor}, then=Value(texto)) for valor, texto in TEXTOS_ESCALA.items()],
+        default=Concat(Cast(campo, CharField()), Value(' - Definido')),
+        output_field=CharField()
+    )
+
+
+# Igual que get_presupuesto_final: modificado si es positivo, si no anteproyecto
+PRESUPUESTO_FINAL = Case(
+    When(presupuesto_modificado__gt=0, then=F('presupuesto_modificado')),
+    default=F('anteproyecto_total'),
+    output_field=FloatField()
+)
+
+# Campos calculados del serializer como expresiones SQL
+CALCULADOS = {
+    'semaforo': Case(
+        When(riesgo_nivel__gte=4, then=Value('ROJO')),
+        When(Q(avance_fisico_pct__lt=20) & Q(urgencia__gte=4), then=Value('ROJO')),
+        When(riesgo_nivel=3, then=Value('AMARILLO')),
+        default=Value('VERDE'),
+        output_field=CharField()
+    ),
+    'presupuesto_final': PRESUPUESTO_FINAL,
+    'monto_ejecutado': PRESUPUESTO_FINAL * (F('avance_financiero_pct') / Value(100.0)),
+    'urgencia': etiqueta_escala('urgencia'),
+    'impacto_social': etiqueta_escala('impacto_social'),
+    'alineacion_estrategica': etiqueta_escala('alineacion_estrategica'),
+    'complejidad_tecnica': etiqueta_escala('complejidad_tecnica'),
+    'riesgo_nivel': etiqueta_escala('riesgo_nivel'),
+}
+
+
+def columnas_lista(fields=None):
+    """
+    (nombre de salida, columna de values()) en el orden del serializer y las
+    anotaciones que hacen falta. Valida `fields` igual que el serializer.
+    """
+    columnas = []
+    anotaciones = {}
+    for nombre, campo in ObraSerializer(fields=fields).fields.items():
+        if nombre in CALCULADOS:
+            origen = PREFIJO + nombre
+            anotaciones[origen] = CALCULADOS[nombre]
+        else:
+            origen = campo.source
+        columnas.append((nombre, origen))
+    return columnas, anotaciones
+
+
+def filas_obras(obras, fields=None):
+    """
+    Queryset de values() con los campos del serializer (y 'id', que usa la
+    paginación por cursor) más la función que convierte cada fila a la salida.
+    """
+    columnas, anotaciones = columnas_lista(fields)
+    origenes = list(dict.fromkeys(['id'] + [origen for _, origen in columnas]))
+    filas = obras.annotate(**anotaciones).values(*origenes)
+
+    def salida(fila):
+        resultado = {nombre: fila[origen] for nombre, origen in columnas}
+        # get_presupuesto_final regresa `anteproyecto_total or 0`: el cero es entero
+        if 'presupuesto_final' in resultado and not resultado['presupuesto_final']:
+            resultado['presupuesto_final'] = 0
+        return resultado
+
+    return filas, salida
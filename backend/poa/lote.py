@@ -0,0 +1,207 @@
+# Proyecto\POA_Reporte\backend\poa\lote.py
+"""
+Generación en lote de los reportes de cierre de mes.
+
+Renderiza cada tipo de reporte por dirección (y, si se pide, el general de
+todas) en PDF y Excel. Las obras se leen una sola vez con los campos de
+todos los tipos pedidos y se reparten por dirección en memoria; las
+estadísticas salen del caché columnar. Los archivos se generan en un pool
+de procesos y cada tarea recibe solo las filas de su dirección.
+
+Cada reporte queda en un ReporteGenerado con la misma llave que usa la
+cola de trabajos: una solicitud igual posterior lo reutiliza, y volver a
+correr el lote sin cambios en los datos no genera nada.
+"""
+import multiprocessing
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from decimal import Decimal
+from types import SimpleNamespace
+
+import django
+from django.core.files.base import ContentFile
+
+from .models import Obra, ReporteGenerado
+from .columnas import campos_reporte
+from .generador import ConfiguracionReporte, GeneradorReportes
+from .concurrencia import renderizar_pdf, renderizar_excel
+from .cache_reportes import llave_reporte
+from .cache_columnar import estadisticas_columnares
+from .trabajos import crear_configuracion, reporte_en_cache
+
+FORMATOS = ('pdf', 'excel')
+
+EXTENSIONES = {'pdf': 'pdf', 'excel': 'xlsx'}
+
+RENDERIZADORES = {'pdf': renderizar_pdf, 'excel': renderizar_excel}
+
+
+# ============================
+# RENDERIZADO (en el pool)
+# ============================
+
+def _renderizar(formato, filas, config, estadisticas):
+    """Corre en el pool: regresa el archivo generado en bytes"""
+    return RENDERIZADORES[formato](filas, config, estadisticas).getvalue()
+
+
+def _pool(jobs):
+    """Procesos con `jobs` > 0; con 0, un hilo (sin levantar procesos)"""
+    if jobs:
+        return ProcessPoolExecutor(
+            max_workers=jobs,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=django.setup
+        )
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix='lote')
+
+
+# ============================
+# DATOS
+# ============================
+
+def filas_por_direccion(fecha_corte, tipos):
+    """
+    Lee una vez las obras iniciadas a la fecha de corte con los campos de
+    todos los tipos y las reparte por dirección: {direccion_id: [filas]}.
+    """
+    campos = []
+    for tipo in tipos:
+        campos.extend(c for c in campos_reporte(tipo) if c not in campos)
+    columnas = campos + ['direccion_id']
+
+    por_direccion = defaultdict(list)
+    obras = (
+        Obra.objects.filter(fecha_inicio_prog__lte=fecha_corte)
+        .order_by('id')
+        .values_list(*columnas)
+        .iterator(chunk_size=GeneradorReportes.CHUNK_STREAMING)
+    )
+    for valores in obras:
+        por_direccion[valores[-1]].append(SimpleNamespace(**dict(zip(campos, valores))))
+    return por_direccion
+
+
+def _solicitud(tipo, direccion, fecha_corte, periodo, formatos, detalle_completo):
+    """Datos del reporte con la forma de `datos_de_configuracion`"""
+    etiqueta = direccion.codigo if direccion is not None else 'todas'
+    return {
+        'nombre_reporte': f"{tipo}_{etiqueta}_{fecha_corte:%Y%m%d}",
+        'tipo_reporte': tipo,
+        'periodo': periodo,
+        'fecha_corte': fecha_corte,
+        'direcciones': [direccion.pk] if direccion is not None else [],
+        'incluir_todas_direcciones': direccion is None,
+        'formato': 'ambos' if len(formatos) > 1 else formatos[0],
+        'incluir_graficos': True,
+        'incluir_anexos': False,
+        'detalle_completo': detalle_completo,
+    }
+
+
+def _guardar(datos, estadisticas, archivos, llave):
+    """Crea el ReporteConfig y el ReporteGenerado con los archivos en bytes"""
+    configuracion = crear_configuracion(datos)
+    reporte = ReporteGenerado(
+        configuracion=configuracion,
+        nombre_archivo=datos['nombre_reporte'],
+        total_proyectos=estadisticas['total_obras'],
+        presupuesto_total=Decimal(str(round(estadisticas['presupuesto_total'], 2))),
+        beneficiarios_total=estadisticas['beneficiarios_total'],
+        resumen_json=estadisticas,
+        llave_cache=llave,
+    )
+    for formato, contenido in archivos.items():
+        campo = reporte.archivo_pdf if formato == 'pdf' else reporte.archivo_excel
+        campo.save(f"{datos['nombre_reporte']}.{EXTENSIONES[formato]}", ContentFile(contenido), save=False)
+    reporte.save()
+    return reporte
+
+
+# ============================
+# LOTE
+# ============================
+
+def generar_lote(fecha_corte, tipos, direcciones, formatos=FORMATOS, periodo='mensual',
+                 general=False, jobs=2, forzar=False, detalle_completo=False, avisar=None):
+    """
+    Genera los reportes de `tipos` × `direcciones` (más el general si
+    `general`). Regresa una lista de (nombre, ReporteGenerado o excepción,
+    si venía del caché). `avisar(nombre, resultado, en_cache)` se llama
+    conforme termina cada reporte.
+    """
+    formatos = tuple(formatos)
+    destinos = list(direcciones) + ([None] if general else [])
+
+    resultados = []
+    pendientes = []
+    for tipo in tipos:
+        for direccion in destinos:
+            datos = _solicitud(tipo, direccion, fecha_corte, periodo, formatos, detalle_completo)
+            llave = llave_reporte(datos, origen='trabajos')
+            reporte = None if forzar else reporte_en_cache(llave)
+            if reporte is not None:
+                resultados.append((datos['nombre_reporte'], reporte, True))
+                if avisar:
+                    avisar(datos['nombre_reporte'], reporte, True)
+            else:
+                pendientes.append((tipo, direccion, datos, llave))
+    if not pendientes:
+        return resultados
+
+    # Una sola lectura de las obras para todos los reportes pendientes
+    por_direccion = filas_por_direccion(fecha_corte, {tipo for tipo, _, _, _ in pendientes})
+    todas = None
+
+    with _pool(jobs) as pool:
+        futuros = {}
+        restantes = {}
+        for indice, (tipo, direccion, datos, llave) in enumerate(pendientes):
+            if direccion is None:
+                if todas is None:
+                    todas = sorted(
+                        (fila for filas in por_direccion.values() for fila in filas),
+                        key=lambda fila: fila.id
+                    )
+                filas = todas
+                estadisticas = estadisticas_columnares(fecha_corte)
+            else:
+                filas = por_direccion.get(direccion.pk, [])
+                estadisticas = estadisticas_columnares(fecha_corte, [direccion.pk])
+            config = ConfiguracionReporte(
+                nombre=datos['nombre_reporte'],
+                tipo_reporte=tipo,
+                periodo=periodo,
+                fecha_corte=fecha_corte,
+                formato_salida=datos['formato'],
+                detalle_completo=detalle_completo,
+            )
+            restantes[indice] = {'estadisticas': estadisticas, 'archivos': {}, 'faltan': len(formatos)}
+            for formato in formatos:
+                futuro = pool.submit(_renderizar, formato, filas, config, estadisticas)
+                futuros[futuro] = (indice, formato)
+
+        for futuro in as_completed(futuros):
+            indice, formato = futuros[futuro]
+            _, _, datos, llave = pendientes[indice]
+            estado = restantes[indice]
+            if estado is None:
+                continue  # ya falló otro formato del mismo reporte
+
+            try:
+                estado['archivos'][formato] = futuro.result()
+                estado['faltan'] -= 1
+                resultado = None
+                if not estado['faltan']:
+                    resultado = _guardar(datos, estado['estadisticas'], estado['archivos'], llave)
+                    restantes[indice] = None
+            except Exception as e:
+                resultado = e
+                restantes[indice] = None
+
+            if resultado is not None:
+                resultados.append((datos['nombre_reporte'], resultado, False))
+                if avisar:
+                    avisar(datos['nombre_reporte'], resultado, False)
+
+    return resultados
@@ -0,0 +1,25 @@
+# Proyecto\POA_Reporte\backend\poa\management\commands\exportar_instantanea.py
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from ...instantanea import generar_instantanea
+
+
+class Command(BaseCommand):
+    help = "Escribe la instantánea Parquet de las obras (solo si cambiaron los datos)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--forzar', action='store_true',
+                            help="La vuelve a escribir aunque ya exista la de esta versión")
+
+    def handle(self, *args, **options):
+        try:
+            ruta = generar_instantanea(forzar=options['forzar'])
+        except ImproperlyConfigured as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Instantánea: {ruta} ({os.path.getsize(ruta) / 1024:.1f} KB)"
+        ))
@@ -0,0 +1,77 @@
+# Proyecto\POA_Reporte\backend\poa\management\commands\generar_reportes.py
+import os
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...models import Direccion, ReporteConfig
+
+
+class Command(BaseCommand):
+    help = "Genera en lote los reportes de cada tipo por dirección (PDF y Excel)"
+
+    def add_arguments(self, parser):
+        tipos = [tipo for tipo, _ in ReporteConfig.TIPO_REPORTE_CHOICES]
+        parser.add_argument('--tipos', nargs='+', choices=tipos, default=tipos,
+                            help="Tipos de reporte (por defecto todos)")
+        parser.add_argument('--direcciones', nargs='+', metavar='CODIGO',
+                            help="Códigos de las direcciones (por defecto las activas)")
+        parser.add_argument('--formatos', nargs='+', choices=['pdf', 'excel'], default=['pdf', 'excel'])
+        parser.add_argument('--fecha-corte', type=date.fromisoformat, default=None,
+                            help="AAAA-MM-DD (por defecto hoy)")
+        parser.add_argument('--periodo', default='mensual',
+                            choices=[periodo for periodo, _ in ReporteConfig.PERIODO_CHOICES])
+        parser.add_argument('--general', action='store_true',
+                            help="Genera también el reporte de todas las direcciones")
+        parser.add_argument('--detalle-completo', action='store_true',
+                            help="Sin límite de filas en el detalle del PDF")
+        parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                            help="Procesos para renderizar (0: en este proceso, con un hilo)")
+        parser.add_argument('--forzar', action='store_true',
+                            help="Los vuelve a generar aunque ya existan para estos datos")
+
+    def handle(self, *args, **options):
+        # reportlab/openpyxl/numpy solo se cargan si de verdad se genera el lote
+        from ...lote import generar_lote
+
+        direcciones = Direccion.objects.filter(activa=True)
+        if options['direcciones']:
+            direcciones = Direccion.objects.filter(codigo__in=options['direcciones'])
+            faltantes = set(options['direcciones']) - set(direcciones.values_list('codigo', flat=True))
+            if faltantes:
+                raise CommandError(f"Direcciones desconocidas: {', '.join(sorted(faltantes))}")
+        direcciones = list(direcciones.order_by('codigo'))
+        if not direcciones and not options['general']:
+            raise CommandError("No hay direcciones para generar (use --general para el reporte de todas)")
+
+        def avisar(nombre, resultado, en_cache):
+            if isinstance(resultado, Exception):
+                self.stderr.write(self.style.ERROR(f"✗ {nombre}: {resultado}"))
+            elif en_cache:
+                self.stdout.write(f"= {nombre} (sin cambios, reporte {resultado.pk})")
+            else:
+                self.stdout.write(f"✓ {nombre}: {resultado.total_proyectos} obras (reporte {resultado.pk})")
+
+        inicio = time.perf_counter()
+        resultados = generar_lote(
+            options['fecha_corte'] or date.today(),
+            options['tipos'],
+            direcciones,
+            formatos=options['formatos'],
+            periodo=options['periodo'],
+            general=options['general'],
+            jobs=max(options['jobs'], 0),
+            forzar=options['forzar'],
+            detalle_completo=options['detalle_completo'],
+            avisar=avisar,
+        )
+
+        fallidos = sum(1 for _, resultado, _ in resultados if isinstance(resultado, Exception))
+        generados = sum(1 for _, resultado, en_cache in resultados
+                        if not en_cache and not isinstance(resultado, Exception))
+        resumen = (f"Reportes generados: {generados}, sin cambios: {len(resultados) - generados - fallidos}, "
+                   f"fallidos: {fallidos} ({time.perf_counter() - inicio:.1f} s)")
+        if fallidos:
+            raise CommandError(resumen)
+        self.stdout.write(self.style.SUCCESS(resumen))
@@ -0,0 +1,42 @@
+# Proyecto\POA_Reporte\backend\poa\management\commands\importar_poa.py
+from django.core.management.base import BaseCommand, CommandError
+
+from ...importador import importar_obras
+
+
+class Command(BaseCommand):
+    help = "Importa la hoja POA (Excel o CSV) creando y actualizando obras por id_excel"
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help="Ruta del archivo .xlsx o .csv")
+        parser.add_argument('--hoja', default=0, help="Nombre o índice de la hoja (Excel)")
+        parser.add_argument('--fila-encabezado', type=int, default=0,
+                            help="Fila (desde 0) donde están los encabezados")
+        parser.add_argument('--reemplazar', action='store_true',
+                            help="Borra las obras que ya no aparecen en la hoja")
+        parser.add_argument('--lote', type=int, default=1000, help="Tamaño de los lotes de escritura")
+
+    def handle(self, *args, **options):
+        hoja = options['hoja']
+        if isinstance(hoja, str) and hoja.isdigit():
+            hoja = int(hoja)
+        try:
+            resultado = importar_obras(
+                options['archivo'],
+                hoja=hoja,
+                fila_encabezado=options['fila_encabezado'],
+                reemplazar=options['reemplazar'],
+                tamano_lote=options['lote'],
+            )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Importadas {resultado['filas']} filas en {resultado['segundos']}s: "
+            f"{resultado['creadas']} nuevas, {resultado['actualizadas']} actualizadas, "
+            f"{resultado['eliminadas']} eliminadas"
+        ))
+        if resultado['sin_id']:
+            self.stderr.write(self.style.WARNING(
+                f"{resultado['sin_id']} filas sin id_excel omitidas"
+            ))
@@ -0,0 +1,95 @@
+# Proyecto\POA_Reporte\backend\poa\management\commands\medir_arranque.py
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Paquetes que no deberían cargarse solo por arrancar
+PAQUETES_PESADOS = ('reportlab', 'openpyxl', 'pandas', 'numpy')
+
+# Corre en un intérprete nuevo: importa la aplicación, carga las URLs y luego
+# el generador (lo que paga el primer reporte)
+SCRIPT_MEDICION = '''
+import importlib, json, sys, time
+inicio = time.perf_counter()
+importlib.import_module(sys.argv[1])
+aplicacion = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+urls = time.perf_counter()
+pesados = [p for p in sys.argv[2:] if p in sys.modules]
+importlib.import_module('backend.poa.generador')
+importlib.import_module('backend.poa.concurrencia')
+primer_reporte = time.perf_counter()
+print(json.dumps({
+    'aplicacion': aplicacion - inicio,
+    'urls': urls - aplicacion,
+    'primer_reporte': primer_reporte - urls,
+    'pesados': pesados,
+}))
+'''
+
+
+def modulos_aplicacion():
+    """Módulos wsgi y asgi del proyecto, a partir de WSGI_APPLICATION"""
+    wsgi = settings.WSGI_APPLICATION.rsplit('.', 1)[0]
+    asgi = getattr(settings, 'ASGI_APPLICATION', None)
+    asgi = asgi.rsplit('.', 1)[0] if asgi else wsgi.rsplit('.', 1)[0] + '.asgi'
+    return {'wsgi': wsgi, 'asgi': asgi}
+
+
+def medir(modulo):
+    """Una medición en un proceso nuevo (sin nada importado de antemano)"""
+    entorno = dict(os.environ)
+    entorno['DJANGO_SETTINGS_MODULE'] = os.environ.get('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE)
+    entorno['PYTHONPATH'] = os.pathsep.join(p for p in sys.path if p)
+    resultado = subprocess.run(
+        [sys.executable, '-c', SCRIPT_MEDICION, modulo, *PAQUETES_PESADOS],
+        env=entorno, capture_output=True, text=True
+    )
+    if resultado.returncode != 0:
+        raise CommandError(f"No se pudo importar {modulo}:\n{resultado.stderr}")
+    return json.loads(resultado.stdout.strip().splitlines()[-1])
+
+
+class Command(BaseCommand):
+    help = "Mide el tiempo de importar la aplicación WSGI/ASGI y cargar las URLs"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticiones', type=int, default=5,
+                            help="Procesos por aplicación; se reporta la mediana")
+        parser.add_argument('--max-segundos', type=float, default=None,
+                            help="Falla si aplicación + URLs tarda más que esto")
+        parser.add_argument('--estricto', action='store_true',
+                            help="Falla si arrancar carga reportlab, openpyxl o pandas")
+
+    def handle(self, *args, **options):
+        fallas = []
+        for nombre, modulo in modulos_aplicacion().items():
+            mediciones = [medir(modulo) for _ in range(max(options['repeticiones'], 1))]
+            mediana = {
+                fase: statistics.median(m[fase] for m in mediciones)
+                for fase in ('aplicacion', 'urls', 'primer_reporte')
+            }
+            total = mediana['aplicacion'] + mediana['urls']
+            pesados = sorted({p for m in mediciones for p in m['pesados']})
+
+            self.stdout.write(
+                f"{nombre:5} {modulo}: aplicación {mediana['aplicacion']:.3f}s, "
+                f"URLs {mediana['urls']:.3f}s, arranque {total:.3f}s, "
+                f"primer reporte +{mediana['primer_reporte']:.3f}s"
+            )
+            if pesados:
+                self.stdout.write(self.style.WARNING(f"      cargados al arrancar: {', '.join(pesados)}"))
+
+            if options['max_segundos'] is not None and total > options['max_segundos']:
+                fallas.append(f"{nombre} tarda {total:.3f}s en arrancar (máximo {options['max_segundos']}s)")
+            if options['estricto'] and pesados:
+                fallas.append(f"{nombre} carga {', '.join(pesados)} al arrancar")
+
+        if fallas:
+            raise CommandError('\n'.join(fallas))
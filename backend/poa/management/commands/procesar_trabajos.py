@@ -0,0 +1,29 @@
+# Proyecto\POA_Reporte\backend\poa\management\commands\procesar_trabajos.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...trabajos import procesar_pendientes
+
+
+class Command(BaseCommand):
+    help = "Procesa los trabajos de reportes pendientes en la cola"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--continuo', action='store_true',
+            help="Sigue revisando la cola en lugar de terminar cuando se vacía"
+        )
+        parser.add_argument(
+            '--intervalo', type=float, default=5.0,
+            help="Segundos de espera entre revisiones en modo continuo"
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            procesados = procesar_pendientes()
+            if procesados:
+                self.stdout.write(self.style.SUCCESS(f"Trabajos procesados: {procesados}"))
+            if not options['continuo']:
+                break
+            time.sleep(options['intervalo'])
@@ -0,0 +1,47 @@
+# Proyecto\POA_Reporte\backend\poa\management\commands\programar_reportes.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...programacion import pregenerar, en_horario
+
+
+class Command(BaseCommand):
+    help = (
+        "Pregenera los reportes programados con corte al cierre de su periodo. "
+        "Pensado para cron fuera de horario (p. ej. '0 2 * * *'); con --continuo "
+        "se queda corriendo y solo genera dentro de REPORTES_HORARIO_PROGRAMADO"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--continuo', action='store_true',
+            help="Sigue revisando en lugar de terminar después de una pasada"
+        )
+        parser.add_argument(
+            '--intervalo', type=float, default=900.0,
+            help="Segundos de espera entre revisiones en modo continuo"
+        )
+
+    def avisar(self, configuracion, resultado, existia):
+        if isinstance(resultado, Exception):
+            self.stderr.write(self.style.ERROR(f"✗ {configuracion}: {resultado}"))
+        elif existia:
+            self.stdout.write(f"= {configuracion} (corte {configuracion.fecha_corte}, sin cambios)")
+        else:
+            self.stdout.write(f"✓ {configuracion} (corte {configuracion.fecha_corte}, reporte {resultado.pk})")
+
+    def handle(self, *args, **options):
+        if not options['continuo']:
+            resultados = pregenerar(avisar=self.avisar)
+            fallidos = sum(1 for _, resultado, _ in resultados if isinstance(resultado, Exception))
+            resumen = f"Reportes programados: {len(resultados)}, fallidos: {fallidos}"
+            if fallidos:
+                raise CommandError(resumen)
+            self.stdout.write(self.style.SUCCESS(resumen))
+            return
+
+        while True:
+            if en_horario():
+                pregenerar(avisar=self.avisar)
+            time.sleep(options['intervalo'])
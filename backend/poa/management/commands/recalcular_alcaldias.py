@@ -0,0 +1,12 @@
+# Proyecto\POA_Reporte\backend\poa\management\commands\recalcular_alcaldias.py
+from django.core.management.base import BaseCommand
+
+from ...territorio import recalcular_alcaldias
+
+
+class Command(BaseCommand):
+    help = "Reconstruye la tabla de alcaldías por obra usada por el reporte territorial"
+
+    def handle(self, *args, **options):
+        filas = recalcular_alcaldias()
+        self.stdout.write(self.style.SUCCESS(f"Alcaldías recalculadas: {filas} filas"))
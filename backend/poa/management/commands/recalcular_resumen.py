@@ -0,0 +1,12 @@
+# Proyecto\POA_Reporte\backend\poa\management\commands\recalcular_resumen.py
+from django.core.management.base import BaseCommand
+
+from ...resumen import recalcular_resumen
+
+
+class Command(BaseCommand):
+    help = "Reconstruye la tabla de resumen de obras usada por la vista previa"
+
+    def handle(self, *args, **options):
+        filas = recalcular_resumen()
+        self.stdout.write(self.style.SUCCESS(f"Resumen recalculado: {filas} filas"))
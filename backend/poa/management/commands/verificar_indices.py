@@ -0,0 +1,71 @@
+# Proyecto\POA_Reporte\backend\poa\management\commands\verificar_indices.py
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Sum
+
+from ...models import Obra, ResumenObras
+from ...estadisticas import agregados_por_grupo
+
+
+def consultas_reportes():
+    """
+    Consultas de los reportes y los índices que deben usar.
+
+    Un índice esperado None acepta cualquier índice (p. ej. el de
+    unique_together, cuyo nombre cambia según la base de datos).
+    """
+    hoy = date.today()
+    obras = Obra.objects.filter(fecha_inicio_prog__lte=hoy)
+    return [
+        ("Estadísticas por corte (agrupadas por estatus/área)",
+         agregados_por_grupo(obras), ['obra_fecha_estatus_area_idx']),
+        ("Recalcular una fila del resumen",
+         Obra.objects.filter(fecha_inicio_prog=hoy, area_responsable='', estatus_general=''),
+         ['obra_fecha_estatus_area_idx']),
+        ("Obras de alto riesgo",
+         obras.filter(riesgo_nivel__gte=4), ['obra_riesgo_fecha_idx']),
+        ("Viabilidad crítica",
+         obras.filter(viabilidad_ejecucion__lte=2), ['obra_viabilidad_fecha_idx']),
+        ("Top por presupuesto",
+         obras.order_by('-presupuesto_modificado')[:15], ['obra_presupuesto_desc_idx']),
+        ("Importación por id_excel",
+         Obra.objects.filter(id_excel__in=[1, 2, 3]), ['obra_id_excel_idx']),
+        ("Vista previa desde el resumen",
+         ResumenObras.objects.filter(fecha_inicio__lte=hoy).order_by()
+         .values('estatus_general', 'area_responsable').annotate(total=Sum('obras')), None),
+    ]
+
+
+def usa_indice(plan, esperados):
+    """True si el plan de ejecución usa alguno de los índices esperados"""
+    if esperados is None:
+        # SQLite: "USING INDEX"/"USING COVERING INDEX"; PostgreSQL: "Index Scan"/"Index Only Scan"
+        return 'INDEX' in plan.upper()
+    return any(nombre in plan for nombre in esperados)
+
+
+class Command(BaseCommand):
+    help = "Revisa con EXPLAIN que las consultas de los reportes usen sus índices"
+
+    def handle(self, *args, **options):
+        fallas = 0
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                # Con tablas pequeñas PostgreSQL prefiere el seq scan; se
+                # desactiva para comprobar que el índice es utilizable
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+
+            for descripcion, queryset, esperados in consultas_reportes():
+                plan = queryset.explain()
+                if usa_indice(plan, esperados):
+                    self.stdout.write(self.style.SUCCESS(f"OK     {descripcion}"))
+                else:
+                    fallas += 1
+                    self.stdout.write(self.style.ERROR(f"FALLA  {descripcion}"))
+                    self.stdout.write(f"       {plan}")
+
+        if fallas:
+            raise CommandError(f"{fallas} consultas no usan sus índices")
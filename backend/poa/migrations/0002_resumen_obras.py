@@ -0,0 +1,116 @@
+# Generated by Django 4.2.7 on 2026-10-18 00:32
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def poblar_resumen(apps, schema_editor):
+    """Llena el resumen con las obras existentes"""
+    Obra = apps.get_model('poa', 'Obra')
+    ResumenObras = apps.get_model('poa', 'ResumenObras')
+
+    filas = {}
+    obras = Obra.objects.exclude(fecha_inicio_prog__isnull=True).values_list(
+        'fecha_inicio_prog', 'area_responsable', 'estatus_general',
+        'presupuesto_modificado', 'anteproyecto_total', 'avance_financiero_pct',
+        'avance_fisico_pct', 'poblacion_objetivo_num',
+    )
+    for fecha, area, estatus, modificado, anteproyecto, financiero, fisico, poblacion in obras.iterator():
+        fila = filas.setdefault((fecha, area or '', estatus or ''), {
+            'obras': 0, 'suma_modificado': 0.0, 'suma_anteproyecto': 0.0,
+            'ejecutado': 0.0, 'suma_avance': 0.0, 'beneficiarios': 0,
+        })
+        vigente = anteproyecto if modificado == 0 else modificado
+        fila['obras'] += 1
+        fila['suma_modificado'] += modificado or 0
+        fila['suma_anteproyecto'] += anteproyecto or 0
+        fila['ejecutado'] += (vigente or 0) * (financiero or 0) / 100.0
+        fila['suma_avance'] += fisico or 0
+        try:
+            fila['beneficiarios'] += int(str(poblacion).replace(',', ''))
+        except (ValueError, TypeError):
+            pass
+
+    ResumenObras.objects.bulk_create([
+        ResumenObras(fecha_inicio=fecha, area_responsable=area, estatus_general=estatus, **totales)
+        for (fecha, area, estatus), totales in filas.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('poa', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReporteConfig',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=200)),
+                ('tipo_reporte', models.CharField(choices=[('ejecutivo', 'Reporte Ejecutivo'), ('cartera', 'Cartera de Proyectos'), ('presupuesto', 'Ejecución Presupuestal'), ('riesgos', 'Análisis de Riesgos'), ('territorial', 'Impacto Territorial')], max_length=50)),
+                ('periodo', models.CharField(choices=[('semanal', 'Semanal'), ('mensual', 'Mensual'), ('trimestral', 'Trimestral'), ('anual', 'Anual')], max_length=50)),
+                ('fecha_corte', models.DateField()),
+                ('incluir_todas_direcciones', models.BooleanField(default=True)),
+                ('incluir_graficos', models.BooleanField(default=True)),
+                ('incluir_anexos', models.BooleanField(default=False)),
+                ('formato_salida', models.CharField(choices=[('pdf', 'PDF'), ('excel', 'Excel'), ('ambos', 'PDF y Excel')], default='pdf', max_length=20)),
+                ('creado_en', models.DateTimeField(auto_now_add=True)),
+                ('actualizado_en', models.DateTimeField(auto_now=True)),
+                ('direcciones', models.ManyToManyField(blank=True, to='poa.direccion')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Configuración de Reporte',
+                'verbose_name_plural': 'Configuraciones de Reportes',
+                'ordering': ['-creado_en'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumenObras',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha_inicio', models.DateField()),
+                ('area_responsable', models.CharField(blank=True, default='', max_length=255)),
+                ('estatus_general', models.CharField(blank=True, default='', max_length=255)),
+                ('obras', models.IntegerField(default=0)),
+                ('suma_modificado', models.FloatField(default=0)),
+                ('suma_anteproyecto', models.FloatField(default=0)),
+                ('ejecutado', models.FloatField(default=0)),
+                ('suma_avance', models.FloatField(default=0)),
+                ('beneficiarios', models.BigIntegerField(default=0)),
+                ('actualizado_en', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Resumen de Obras',
+                'verbose_name_plural': 'Resúmenes de Obras',
+                'ordering': ['fecha_inicio'],
+                'unique_together': {('fecha_inicio', 'area_responsable', 'estatus_general')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ReporteGenerado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('archivo_pdf', models.FileField(blank=True, null=True, upload_to='reportes/pdf/%Y/%m/')),
+                ('archivo_excel', models.FileField(blank=True, null=True, upload_to='reportes/excel/%Y/%m/')),
+                ('nombre_archivo', models.CharField(max_length=255)),
+                ('total_proyectos', models.IntegerField(default=0)),
+                ('presupuesto_total', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('beneficiarios_total', models.BigIntegerField(default=0)),
+                ('resumen_json', models.JSONField(default=dict)),
+                ('fecha_generacion', models.DateTimeField(auto_now_add=True)),
+                ('configuracion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='poa.reporteconfig')),
+                ('generado_por', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Reporte Generado',
+                'verbose_name_plural': 'Reportes Generados',
+                'ordering': ['-fecha_generacion'],
+            },
+        ),
+        migrations.RunPython(poblar_resumen, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 4.2.7 on 2026-10-18 00:52
+
+import math
+import re
+
+from django.db import migrations, models
+from django.db.models import Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def _numero(valor):
+    if valor is None:
+        return None
+    match = re.match(r'\d*\.?\d+|\d+', re.sub(r'[^\d.]', '', str(valor)))
+    return float(match.group(0)) if match else None
+
+
+def llenar_beneficiarios(apps, schema_editor):
+    """Calcula las columnas numéricas de las obras existentes y actualiza el resumen"""
+    Obra = apps.get_model('poa', 'Obra')
+    ResumenObras = apps.get_model('poa', 'ResumenObras')
+
+    obras = []
+    for obra in Obra.objects.only('beneficiarios_directos', 'poblacion_objetivo_num').iterator():
+        directos = _numero(obra.beneficiarios_directos)
+        poblacion = _numero(obra.poblacion_objetivo_num)
+        if poblacion is not None and ('mil' in str(obra.poblacion_objetivo_num).lower() or poblacion < 1000):
+            poblacion *= 1000
+        obra.beneficiarios_directos_valor = int(math.floor(directos + 0.5)) if directos is not None else None
+        obra.poblacion_objetivo_valor = int(math.floor(poblacion + 0.5)) if poblacion is not None else None
+        obras.append(obra)
+    Obra.objects.bulk_update(
+        obras, ['beneficiarios_directos_valor', 'poblacion_objetivo_valor'], batch_size=1000
+    )
+
+    grupos = (
+        Obra.objects.exclude(fecha_inicio_prog__isnull=True).order_by()
+        .values('fecha_inicio_prog', 'area_responsable', 'estatus_general')
+        .annotate(total=Sum(Coalesce('poblacion_objetivo_valor', 'beneficiarios_directos_valor', Value(0))))
+    )
+    totales = {}
+    for grupo in grupos:
+        llave = (grupo['fecha_inicio_prog'], grupo['area_responsable'] or '', grupo['estatus_general'] or '')
+        totales[llave] = totales.get(llave, 0) + (grupo['total'] or 0)
+    filas = list(ResumenObras.objects.all())
+    for fila in filas:
+        fila.beneficiarios = totales.get((fila.fecha_inicio, fila.area_responsable, fila.estatus_general), 0)
+    ResumenObras.objects.bulk_update(filas, ['beneficiarios'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poa', '0004_cache_reportes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='obra',
+            name='beneficiarios_directos_valor',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='obra',
+            name='poblacion_objetivo_valor',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(llenar_beneficiarios, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 00:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poa', '0005_beneficiarios_numericos'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='obra',
+            index=models.Index(fields=['fecha_inicio_prog', 'estatus_general', 'area_responsable', 'presupuesto_modificado', 'anteproyecto_total', 'avance_financiero_pct', 'avance_fisico_pct', 'poblacion_objetivo_valor', 'beneficiarios_directos_valor'], name='obra_fecha_estatus_area_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='obra',
+            index=models.Index(fields=['riesgo_nivel', 'fecha_inicio_prog'], name='obra_riesgo_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='obra',
+            index=models.Index(fields=['viabilidad_ejecucion', 'fecha_inicio_prog'], name='obra_viabilidad_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='obra',
+            index=models.Index(fields=['-presupuesto_modificado'], name='obra_presupuesto_desc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='obra',
+            index=models.Index(fields=['id_excel'], name='obra_id_excel_idx'),
+        ),
+    ]
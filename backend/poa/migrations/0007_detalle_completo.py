@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 00:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poa', '0006_indices_reportes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reporteconfig',
+            name='detalle_completo',
+            field=models.BooleanField(default=False, help_text='Incluir todas las obras en el detalle del PDF (sin límite de filas)'),
+        ),
+    ]
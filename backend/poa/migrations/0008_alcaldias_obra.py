@@ -0,0 +1,89 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:36
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+ALCALDIAS = {
+    'Álvaro Obregón': (),
+    'Azcapotzalco': (),
+    'Benito Juárez': (),
+    'Coyoacán': (),
+    'Cuajimalpa de Morelos': ('cuajimalpa',),
+    'Cuauhtémoc': (),
+    'Gustavo A. Madero': ('gustavo a madero', 'gustavo madero', 'gam'),
+    'Iztacalco': (),
+    'Iztapalapa': (),
+    'La Magdalena Contreras': ('magdalena contreras',),
+    'Miguel Hidalgo': (),
+    'Milpa Alta': (),
+    'Tláhuac': (),
+    'Tlalpan': (),
+    'Venustiano Carranza': (),
+    'Xochimilco': (),
+}
+
+TODAS = ('todas las alcaldias', 'las 16 alcaldias', 'toda la ciudad')
+
+
+def _normalizar(texto):
+    sin_acentos = unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('ascii')
+    return ' ' + ' '.join(re.findall(r'[a-z0-9]+', sin_acentos.lower())) + ' '
+
+
+def _pesos_alcaldias(texto):
+    if not texto:
+        return ()
+    normalizado = _normalizar(texto)
+    if any(_normalizar(todas) in normalizado for todas in TODAS):
+        encontradas = list(ALCALDIAS)
+    else:
+        encontradas = [
+            nombre for nombre, formas in ALCALDIAS.items()
+            if any(_normalizar(forma) in normalizado for forma in (nombre,) + formas)
+        ]
+    if not encontradas:
+        return ()
+    peso = 1.0 / len(encontradas)
+    return tuple((nombre, peso) for nombre in encontradas)
+
+
+def llenar_alcaldias(apps, schema_editor):
+    """Lee las alcaldías del texto de las obras existentes"""
+    Obra = apps.get_model('poa', 'Obra')
+    ObraAlcaldia = apps.get_model('poa', 'ObraAlcaldia')
+
+    filas = [
+        ObraAlcaldia(obra_id=pk, alcaldia=alcaldia, peso=peso)
+        for pk, texto in Obra.objects.values_list('pk', 'alcaldias').iterator()
+        for alcaldia, peso in _pesos_alcaldias(texto)
+    ]
+    ObraAlcaldia.objects.bulk_create(filas, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poa', '0007_detalle_completo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ObraAlcaldia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alcaldia', models.CharField(max_length=100)),
+                ('peso', models.FloatField(default=1)),
+                ('obra', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='territorios', to='poa.obra')),
+            ],
+            options={
+                'verbose_name': 'Alcaldía de Obra',
+                'verbose_name_plural': 'Alcaldías de Obras',
+                'indexes': [models.Index(fields=['alcaldia', 'obra', 'peso'], name='obra_alcaldia_idx')],
+                'unique_together': {('obra', 'alcaldia')},
+            },
+        ),
+        migrations.RunPython(llenar_alcaldias, migrations.RunPython.noop),
+    ]
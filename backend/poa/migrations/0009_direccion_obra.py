@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:40
+
+import unicodedata
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def normalizar(texto):
+    sin_acentos = unicodedata.normalize('NFKD', str(texto)).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(sin_acentos.lower().split())
+
+
+def llenar_direcciones(apps, schema_editor):
+    """Liga las obras existentes con la dirección de su área responsable"""
+    Obra = apps.get_model('poa', 'Obra')
+    Direccion = apps.get_model('poa', 'Direccion')
+
+    mapa = {}
+    direcciones = list(Direccion.objects.values_list('pk', 'nombre', 'codigo'))
+    for pk, _, codigo in direcciones:
+        if codigo:
+            mapa[normalizar(codigo)] = pk
+    for pk, nombre, _ in direcciones:
+        if nombre:
+            mapa[normalizar(nombre)] = pk
+
+    for area in Obra.objects.exclude(area_responsable=None).values_list('area_responsable', flat=True).distinct():
+        direccion_id = mapa.get(normalizar(area))
+        if direccion_id is not None:
+            Obra.objects.filter(area_responsable=area).update(direccion_id=direccion_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poa', '0008_alcaldias_obra'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='obra',
+            name='direccion',
+            field=models.ForeignKey(blank=True, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='obras', to='poa.direccion'),
+        ),
+        migrations.AddIndex(
+            model_name='obra',
+            index=models.Index(fields=['direccion', 'fecha_inicio_prog'], name='obra_direccion_fecha_idx'),
+        ),
+        migrations.RunPython(llenar_direcciones, migrations.RunPython.noop),
+    ]
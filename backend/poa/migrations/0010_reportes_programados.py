@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poa', '0009_direccion_obra'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reporteconfig',
+            name='programado',
+            field=models.BooleanField(default=False, help_text='Generar el reporte fuera de horario al cierre de cada periodo'),
+        ),
+    ]
@@ -2,12 +2,20 @@
 from django.db import models
 from django.conf import settings
 
+from .estadisticas import parse_beneficiarios_directos, parse_poblacion
+
 
 class Obra(models.Model):
     # --- Identificadores y Clasificación (Cols 0-6) ---
     id_excel = models.IntegerField(null=True)            # col 0: id
     programa = models.TextField(null=True, blank=True)   # col 1
     area_responsable = models.CharField(max_length=255, null=True, blank=True) # col 2
+    # Dirección de la col 2, derivada al guardar/importar para filtrar en SQL
+    # (el índice compuesto de Meta también sirve para la llave foránea)
+    direccion = models.ForeignKey(
+        'Direccion', on_delete=models.SET_NULL, null=True, blank=True,
+        editable=False, db_index=False, related_name='obras'
+    )
     eje_institucional = models.CharField(max_length=255, null=True, blank=True) # col 3
     tipo_recurso = models.CharField(max_length=255, null=True, blank=True)      # col 4
     concentrado_programas = models.CharField(max_length=255, null=True, blank=True) # col 5
@@ -53,6 +61,9 @@ class Obra(models.Model):
     ubicacion_especifica = models.TextField(null=True, blank=True) # col 35
     beneficiarios_directos = models.CharField(max_length=255, null=True, blank=True) # col 36
     poblacion_objetivo_num = models.CharField(max_length=255, null=True, blank=True) # col 37
+    # Cols 36-37 como enteros, calculados al guardar/importar para sumar en SQL
+    beneficiarios_directos_valor = models.BigIntegerField(null=True, blank=True, editable=False)
+    poblacion_objetivo_valor = models.BigIntegerField(null=True, blank=True, editable=False)
 
     # --- Fechas (Cols 38-42) ---
     fecha_inicio_prog = models.DateField(null=True, blank=True)   # col 38
@@ -91,8 +102,78 @@ class Obra(models.Model):
     control_captura = models.TextField(null=True, blank=True)           # col 65
     control_notas = models.TextField(null=True, blank=True)             # col 66
 
+    class Meta:
+        indexes = [
+            # Corte por fecha + agrupación por estatus/área (estadísticas y
+            # resumen). Las columnas que se suman van al final de la llave
+            # para que la consulta agrupada se resuelva solo con el índice
+            # (SQLite no soporta INCLUDE).
+            models.Index(
+                fields=[
+                    'fecha_inicio_prog', 'estatus_general', 'area_responsable',
+                    'presupuesto_modificado', 'anteproyecto_total', 'avance_financiero_pct',
+                    'avance_fisico_pct', 'poblacion_objetivo_valor', 'beneficiarios_directos_valor',
+                ],
+                name='obra_fecha_estatus_area_idx',
+            ),
+            # Reportes por dirección: filtro por dirección + corte por fecha
+            models.Index(fields=['direccion', 'fecha_inicio_prog'], name='obra_direccion_fecha_idx'),
+            # Filtros de riesgo y viabilidad de los reportes de riesgos
+            models.Index(fields=['riesgo_nivel', 'fecha_inicio_prog'], name='obra_riesgo_fecha_idx'),
+            models.Index(fields=['viabilidad_ejecucion', 'fecha_inicio_prog'], name='obra_viabilidad_fecha_idx'),
+            # Top de obras por presupuesto (reporte ejecutivo)
+            models.Index(fields=['-presupuesto_modificado'], name='obra_presupuesto_desc_idx'),
+            # Llave de la importación
+            models.Index(fields=['id_excel'], name='obra_id_excel_idx'),
+        ]
+
     def __str__(self):
         return str(self.programa)[:50]
+
+    def actualizar_beneficiarios(self):
+        """Recalcula las columnas numéricas de beneficiarios desde el texto"""
+        self.beneficiarios_directos_valor = parse_beneficiarios_directos(self.beneficiarios_directos)
+        self.poblacion_objetivo_valor = parse_poblacion(self.poblacion_objetivo_num)
+
+    def actualizar_direccion(self):
+        """Dirección cuyo nombre o código coincide con el área responsable"""
+        from .direcciones import direccion_de_area
+        self.direccion_id = direccion_de_area(self.area_responsable)
+
+    def save(self, *args, **kwargs):
+        self.actualizar_beneficiarios()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'area_responsable' in update_fields:
+            self.actualizar_direccion()
+        if update_fields is not None:
+            derivados = {'beneficiarios_directos_valor', 'poblacion_objetivo_valor'}
+            if 'area_responsable' in update_fields:
+                derivados.add('direccion')
+            kwargs['update_fields'] = set(update_fields) | derivados
+        super().save(*args, **kwargs)
+
+
+class ObraAlcaldia(models.Model):
+    """
+    Alcaldías de cada obra, leídas del texto de `Obra.alcaldias` al guardar
+    o importar. `peso` es la parte del presupuesto (y de los beneficiarios)
+    que le toca a la alcaldía: 1/n si la obra abarca n alcaldías.
+    """
+    obra = models.ForeignKey(Obra, on_delete=models.CASCADE, related_name='territorios')
+    alcaldia = models.CharField(max_length=100)
+    peso = models.FloatField(default=1)
+
+    class Meta:
+        verbose_name = "Alcaldía de Obra"
+        verbose_name_plural = "Alcaldías de Obras"
+        unique_together = ('obra', 'alcaldia')
+        indexes = [
+            # Agregación territorial: agrupa por alcaldía y une con la obra por pk
+            models.Index(fields=['alcaldia', 'obra', 'peso'], name='obra_alcaldia_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.alcaldia} - {self.obra_id} ({self.peso:.2f})"
     
     
 class Direccion(models.Model):
@@ -144,11 +225,20 @@ class ReporteConfig(models.Model):
     # Configuración adicional
     incluir_graficos = models.BooleanField(default=True)
     incluir_anexos = models.BooleanField(default=False)
+    detalle_completo = models.BooleanField(
+        default=False,
+        help_text="Incluir todas las obras en el detalle del PDF (sin límite de filas)"
+    )
     formato_salida = models.CharField(max_length=20, choices=[
         ('pdf', 'PDF'),
         ('excel', 'Excel'),
         ('ambos', 'PDF y Excel')
     ], default='pdf')
+    # Se pregenera al cierre de cada periodo (comando programar_reportes)
+    programado = models.BooleanField(
+        default=False,
+        help_text="Generar el reporte fuera de horario al cierre de cada periodo"
+    )
     
     creado_en = models.DateTimeField(auto_now_add=True)
     actualizado_en = models.DateTimeField(auto_now=True)
@@ -173,6 +263,7 @@ class ReporteGenerado(models.Model):
     presupuesto_total = models.DecimalField(max_digits=20, decimal_places=2, default=0)
     beneficiarios_total = models.BigIntegerField(default=0)
     resumen_json = models.JSONField(default=dict)  # Resumen estadístico
+    llave_cache = models.CharField(max_length=64, blank=True, default='', db_index=True)  # Hash de filtros + versión de datos
     
     fecha_generacion = models.DateTimeField(auto_now_add=True)
     generado_por = models.ForeignKey(
@@ -194,4 +285,97 @@ class ReporteGenerado(models.Model):
             return self.archivo_pdf.url
         elif formato == 'excel' and self.archivo_excel:
             return self.archivo_excel.url
-        return None
\ No newline at end of file
+        return None
+
+
+class TrabajoReporte(models.Model):
+    """Trabajo de generación de reporte procesado en segundo plano"""
+    ESTADO_CHOICES = [
+        ('pendiente', 'Pendiente'),
+        ('procesando', 'Procesando'),
+        ('completado', 'Completado'),
+        ('error', 'Error'),
+    ]
+    
+    configuracion = models.ForeignKey(
+        ReporteConfig,
+        on_delete=models.CASCADE,
+        related_name='trabajos'
+    )
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='pendiente', db_index=True)
+    reporte = models.ForeignKey(
+        ReporteGenerado,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True
+    )
+    error = models.TextField(blank=True, null=True)
+    solicitado_por = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True
+    )
+    
+    creado_en = models.DateTimeField(auto_now_add=True)
+    iniciado_en = models.DateTimeField(null=True, blank=True)
+    terminado_en = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = "Trabajo de Reporte"
+        verbose_name_plural = "Trabajos de Reportes"
+        ordering = ['creado_en']
+    
+    def __str__(self):
+        return f"Trabajo {self.pk} - {self.configuracion.nombre} ({self.estado})"
+
+
+class ResumenObras(models.Model):
+    """
+    Totales precalculados de obras por fecha de inicio, área y estatus.
+
+    La vista previa suma las filas con fecha_inicio <= fecha_corte en lugar
+    de recorrer la tabla de obras. Se mantiene al día con las señales de
+    Obra y con `recalcular_resumen()` después de cargas masivas.
+    """
+    fecha_inicio = models.DateField()
+    area_responsable = models.CharField(max_length=255, blank=True, default='')
+    estatus_general = models.CharField(max_length=255, blank=True, default='')
+
+    obras = models.IntegerField(default=0)
+    suma_modificado = models.FloatField(default=0)
+    suma_anteproyecto = models.FloatField(default=0)
+    ejecutado = models.FloatField(default=0)
+    suma_avance = models.FloatField(default=0)
+    beneficiarios = models.BigIntegerField(default=0)
+
+    actualizado_en = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Resumen de Obras"
+        verbose_name_plural = "Resúmenes de Obras"
+        ordering = ['fecha_inicio']
+        unique_together = ('fecha_inicio', 'area_responsable', 'estatus_general')
+
+    def __str__(self):
+        return f"{self.fecha_inicio} - {self.area_responsable} - {self.estatus_general}"
+
+
+class VersionDatos(models.Model):
+    """
+    Contador de cambios por modelo.
+
+    Cada alta, edición o baja de obras (o direcciones) incrementa la versión;
+    las llaves del caché de reportes la incluyen, así un reporte guardado
+    nunca se sirve con datos viejos.
+    """
+    modelo = models.CharField(max_length=50, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+    actualizado_en = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Versión de Datos"
+        verbose_name_plural = "Versiones de Datos"
+
+    def __str__(self):
+        return f"{self.modelo} v{self.version}"
@@ -0,0 +1,18 @@
+# Proyecto\POA_Reporte\backend\poa\paginacion.py
+"""
+Paginación de la API de obras.
+
+Con PageNumberPagination cada página hace COUNT(*) y un OFFSET que recorre
+todas las filas anteriores, así que leer la cartera completa cuesta cada vez
+más. La paginación por cursor sigue el índice de la llave primaria
+(WHERE id > último ORDER BY id LIMIT n): cada página cuesta lo mismo.
+"""
+from rest_framework.pagination import CursorPagination
+
+
+class ObraCursorPagination(CursorPagination):
+    """Páginas de obras por id; ?page_size=N para cargas grandes del tablero"""
+    ordering = 'id'
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 5000
@@ -0,0 +1,28 @@
+# Proyecto\POA_Reporte\backend\poa\precarga.py
+"""
+Precarga opcional de los módulos pesados de los reportes.
+
+reportlab, openpyxl, pandas y numpy se importan dentro de las funciones que los
+usan, así arrancar el servidor (o correr cualquier manage.py) no los paga y
+el costo se mueve al primer reporte. Con REPORTES_PRECARGAR = True, wsgi.py y
+asgi.py los importan al arrancar: conviene con servidores que cargan la
+aplicación una vez y luego hacen fork de los workers (gunicorn --preload),
+porque los workers heredan los módulos ya cargados.
+"""
+import importlib
+
+from django.conf import settings
+
+# Relativos a este paquete; arrastran reportlab, openpyxl, pandas y numpy
+MODULOS_PESADOS = ('.generador', '.concurrencia', '.importador', '.cache_columnar')
+
+
+def precargar(modulos=MODULOS_PESADOS):
+    """Importa los módulos pesados de antemano"""
+    for nombre in modulos:
+        importlib.import_module(nombre, __package__)
+
+
+def precargar_si_configurado():
+    if getattr(settings, 'REPORTES_PRECARGAR', False):
+        precargar()
@@ -0,0 +1,99 @@
+# Proyecto\POA_Reporte\backend\poa\programacion.py
+"""
+Pregeneración de los reportes recurrentes.
+
+Un ReporteConfig con `programado` se renderiza fuera del horario de oficina
+con corte al cierre de su periodo (semanal, mensual, trimestral o anual).
+El comando `programar_reportes` (desde cron, o en un proceso con
+--continuo) mueve la fecha de corte de cada configuración al último cierre
+y la renderiza con la misma llave que la cola de trabajos. Cuando alguien
+pide la configuración, el archivo ya está generado; solo se vuelve a
+generar si cambiaron los datos. Pedirla no cambia la fecha de corte
+guardada: eso solo lo hace el comando.
+"""
+import traceback
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import ReporteConfig
+from .cache_reportes import datos_de_configuracion, llave_reporte
+from .trabajos import reporte_de_configuracion, reporte_en_cache, renderizar_configuracion
+
+# Horas locales entre las que corre el modo continuo (cruza la medianoche)
+HORARIO_POR_DEFECTO = (22, 6)
+
+
+def cierre_periodo(periodo, hoy=None):
+    """Último día del periodo completo más reciente, anterior a `hoy`"""
+    hoy = hoy or timezone.localdate()
+    if periodo == 'semanal':
+        # Domingo de la semana anterior
+        return hoy - timedelta(days=hoy.isoweekday())
+    if periodo == 'mensual':
+        return hoy.replace(day=1) - timedelta(days=1)
+    if periodo == 'trimestral':
+        return date(hoy.year, 3 * ((hoy.month - 1) // 3) + 1, 1) - timedelta(days=1)
+    if periodo == 'anual':
+        return date(hoy.year, 1, 1) - timedelta(days=1)
+    raise ValueError(f"Periodo desconocido: {periodo}")
+
+
+def en_horario(ahora=None):
+    """True dentro de REPORTES_HORARIO_PROGRAMADO (horas locales)"""
+    inicio, fin = getattr(settings, 'REPORTES_HORARIO_PROGRAMADO', HORARIO_POR_DEFECTO)
+    hora = timezone.localtime(ahora).hour
+    if inicio <= fin:
+        return inicio <= hora < fin
+    return hora >= inicio or hora < fin
+
+
+def avanzar_corte(configuracion, hoy=None):
+    """Lleva la fecha de corte de una configuración programada al último cierre"""
+    corte = cierre_periodo(configuracion.periodo, hoy)
+    if configuracion.fecha_corte != corte:
+        configuracion.fecha_corte = corte
+        configuracion.save(update_fields=['fecha_corte', 'actualizado_en'])
+    return configuracion
+
+
+def reporte_programado(configuracion, hoy=None):
+    """
+    Reporte ya generado de una configuración para los datos actuales (None
+    si falta). Las programadas buscan primero el pregenerado con corte al
+    último cierre, calculado en memoria; si no está, el de su fecha de
+    corte guardada.
+    """
+    if configuracion.programado:
+        datos = datos_de_configuracion(configuracion)
+        datos['fecha_corte'] = cierre_periodo(configuracion.periodo, hoy)
+        reporte = reporte_en_cache(llave_reporte(datos, origen='trabajos'))
+        if reporte is not None:
+            return reporte
+    return reporte_de_configuracion(configuracion)
+
+
+def pregenerar(hoy=None, avisar=None):
+    """
+    Renderiza las configuraciones programadas que no tienen reporte para su
+    último cierre y los datos actuales. Regresa una lista de (configuración,
+    ReporteGenerado o excepción, si ya existía). `avisar` recibe cada tupla.
+    """
+    resultados = []
+    for configuracion in ReporteConfig.objects.filter(programado=True).order_by('pk'):
+        close_old_connections()
+        try:
+            avanzar_corte(configuracion, hoy)
+            reporte = reporte_de_configuracion(configuracion)
+            existia = reporte is not None
+            if not existia:
+                reporte = renderizar_configuracion(configuracion, configuracion.usuario)
+        except Exception as e:
+            traceback.print_exc()
+            reporte, existia = e, False
+        resultados.append((configuracion, reporte, existia))
+        if avisar:
+            avisar(configuracion, reporte, existia)
+    return resultados
@@ -0,0 +1,49 @@
+# Proyecto\POA_Reporte\backend\poa\renderers.py
+"""
+JSON con orjson cuando está instalado.
+
+orjson (opcional) codifica listas grandes de diccionarios varias veces más
+rápido que json. La salida es la misma que la de JSONRenderer: compacta,
+UTF-8 sin escapar y con fechas y decimales convertidos por el encoder de DRF.
+"""
+import importlib.util
+import json
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+if importlib.util.find_spec('orjson'):
+    import orjson
+else:
+    orjson = None
+
+
+def a_json(datos):
+    """JSON compacto en bytes, igual al de JSONRenderer"""
+    if orjson is not None:
+        # Fechas y horas pasan al encoder de DRF para que salgan igual que con json
+        return orjson.dumps(datos, default=JSONEncoder().default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+    return json.dumps(datos, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class JSONRapidoRenderer(JSONRenderer):
+    """JSONRenderer que usa orjson si está disponible"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Con indentación pedida (p. ej. desde la API navegable) se usa json
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return a_json(data)
+
+
+class NDJSONRenderer(JSONRapidoRenderer):
+    """JSON por líneas; en la exportación solo renderiza las respuestas de error"""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return a_json(data) + b'\n'
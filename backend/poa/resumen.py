@@ -0,0 +1,130 @@
+# Proyecto\POA_Reporte\backend\poa\resumen.py
+from django.db import transaction
+from django.db.models import Q, Sum
+
+from .models import Obra, ResumenObras
+from .estadisticas import acumulados, combinar_grupos
+
+CAMPOS_LLAVE = ('fecha_inicio_prog', 'area_responsable', 'estatus_general')
+
+
+def llave_resumen(fecha, area, estatus):
+    """Normaliza la llave del resumen (None y '' se guardan igual)"""
+    return (fecha, area or '', estatus or '')
+
+
+def llave_de_obra(obra):
+    """Obtiene la llave del resumen a la que pertenece una obra"""
+    return llave_resumen(*(getattr(obra, campo) for campo in CAMPOS_LLAVE))
+
+
+def _filtro_texto(campo, valor):
+    """Filtro que trata igual un texto vacío y un NULL"""
+    if valor:
+        return Q(**{campo: valor})
+    return Q(**{campo: ''}) | Q(**{f'{campo}__isnull': True})
+
+
+def recalcular_bucket(fecha, area, estatus):
+    """Recalcula una sola fila del resumen a partir de sus obras"""
+    if fecha is None:
+        # Las obras sin fecha de inicio nunca entran en un corte
+        return
+
+    fecha, area, estatus = llave_resumen(fecha, area, estatus)
+    obras = Obra.objects.filter(
+        Q(fecha_inicio_prog=fecha),
+        _filtro_texto('area_responsable', area),
+        _filtro_texto('estatus_general', estatus),
+    )
+    totales = obras.aggregate(**acumulados())
+
+    if not totales['obras']:
+        ResumenObras.objects.filter(
+            fecha_inicio=fecha, area_responsable=area, estatus_general=estatus
+        ).delete()
+        return
+
+    ResumenObras.objects.update_or_create(
+        fecha_inicio=fecha,
+        area_responsable=area,
+        estatus_general=estatus,
+        defaults={
+            'obras': totales['obras'],
+            'suma_modificado': totales['suma_modificado'] or 0,
+            'suma_anteproyecto': totales['suma_anteproyecto'] or 0,
+            'ejecutado': totales['ejecutado'] or 0,
+            'suma_avance': totales['suma_avance'] or 0,
+            'beneficiarios': totales['beneficiarios'] or 0,
+        },
+    )
+
+
+def recalcular_resumen():
+    """
+    Reconstruye todo el resumen con una consulta agrupada.
+
+    Se usa después de importaciones masivas (bulk_create/bulk_update no
+    disparan señales) y desde el comando `recalcular_resumen`.
+    """
+    obras = Obra.objects.exclude(fecha_inicio_prog__isnull=True).order_by()
+
+    filas = {}
+    grupos = obras.values(*CAMPOS_LLAVE).annotate(**acumulados())
+    for grupo in grupos:
+        llave = llave_resumen(*(grupo[campo] for campo in CAMPOS_LLAVE))
+        fila = filas.setdefault(llave, {
+            'obras': 0, 'suma_modificado': 0.0, 'suma_anteproyecto': 0.0,
+            'ejecutado': 0.0, 'suma_avance': 0.0, 'beneficiarios': 0,
+        })
+        for campo in fila:
+            fila[campo] += grupo[campo] or 0
+
+    with transaction.atomic():
+        ResumenObras.objects.all().delete()
+        ResumenObras.objects.bulk_create([
+            ResumenObras(
+                fecha_inicio=fecha,
+                area_responsable=area,
+                estatus_general=estatus,
+                **totales
+            )
+            for (fecha, area, estatus), totales in filas.items()
+        ], batch_size=1000)
+
+    return len(filas)
+
+
+def estadisticas_resumen(fecha_corte):
+    """
+    Estadísticas de la vista previa leídas del resumen precalculado.
+
+    Devuelve el mismo diccionario que `calcular_estadisticas` para las obras
+    con fecha_inicio_prog <= fecha_corte.
+    """
+    filas = (
+        ResumenObras.objects.filter(fecha_inicio__lte=fecha_corte)
+        .order_by()
+        .values('estatus_general', 'area_responsable')
+        .annotate(
+            total_obras=Sum('obras'),
+            total_modificado=Sum('suma_modificado'),
+            total_anteproyecto=Sum('suma_anteproyecto'),
+            total_ejecutado=Sum('ejecutado'),
+            total_avance=Sum('suma_avance'),
+            total_beneficiarios=Sum('beneficiarios'),
+        )
+    )
+    grupos = []
+    for fila in filas:
+        grupos.append({
+            'estatus_general': fila['estatus_general'],
+            'area_responsable': fila['area_responsable'],
+            'obras': fila['total_obras'],
+            'suma_modificado': fila['total_modificado'],
+            'suma_anteproyecto': fila['total_anteproyecto'],
+            'ejecutado': fila['total_ejecutado'],
+            'suma_avance': fila['total_avance'],
+            'beneficiarios': fila['total_beneficiarios'],
+        })
+    return combinar_grupos(grupos)
@@ -0,0 +1,59 @@
+# Proyecto\POA_Reporte\backend\poa\salida.py
+"""
+Salida de los reportes generados.
+
+Los generadores escriben en una SalidaReporte: vive en memoria mientras el
+archivo es chico y pasa a un temporal en disco solo si rebasa el umbral.
+El temporal no tiene nombre visible y se borra al cerrarse, así que al
+servirla con FileResponse se limpia sola cuando la respuesta se cierra.
+"""
+import os
+import tempfile
+
+from django.conf import settings
+from django.http import FileResponse
+
+# Por encima de este tamaño la salida se pasa a disco
+MAX_MEMORIA_DEFECTO = 8 * 1024 * 1024
+
+CONTENT_TYPES = {
+    'pdf': 'application/pdf',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'zip': 'application/zip',
+}
+
+
+class SalidaReporte(tempfile.SpooledTemporaryFile):
+    """Archivo de un reporte en memoria (o en disco si es grande) con su nombre y tipo"""
+
+    def __init__(self, nombre, content_type=None, max_memoria=None):
+        if max_memoria is None:
+            max_memoria = getattr(settings, 'REPORTES_SPOOL_MAX_BYTES', MAX_MEMORIA_DEFECTO)
+        super().__init__(max_size=max_memoria)
+        self.nombre = nombre
+        extension = os.path.splitext(nombre)[1].lstrip('.').lower()
+        self.content_type = content_type or CONTENT_TYPES.get(extension, 'application/octet-stream')
+
+    @property
+    def en_disco(self):
+        return self._rolled
+
+    @property
+    def tamano(self):
+        """Tamaño en bytes de lo escrito"""
+        posicion = self.tell()
+        self.seek(0, os.SEEK_END)
+        tamano = self.tell()
+        self.seek(posicion)
+        return tamano
+
+    def respuesta(self):
+        """
+        FileResponse de descarga con Content-Length; la respuesta cierra (y
+        con eso borra) la salida al terminar de enviarse.
+        """
+        self.seek(0)
+        response = FileResponse(self, content_type=self.content_type)
+        response['Content-Length'] = self.tamano
+        response['Content-Disposition'] = f'attachment; filename="{self.nombre}"'
+        return response
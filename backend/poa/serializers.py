@@ -1,6 +1,16 @@
 # # Proyecto\POA_Reporte\backend\poa\serializers.py
+from datetime import date
 from rest_framework import serializers
-from .models import Obra, Direccion, ReporteConfig, ReporteGenerado
+from .models import Obra, Direccion, ReporteConfig, ReporteGenerado, TrabajoReporte
+
+# Etiquetas de las escalas 1-5
+TEXTOS_ESCALA = {
+    1: "1 - Muy Bajo",
+    2: "2 - Bajo",
+    3: "3 - Regular",
+    4: "4 - Alto",
+    5: "5 - Muy Alto"
+}
 
 
 class ObraSerializer(serializers.ModelSerializer):
@@ -45,11 +55,42 @@ class ObraSerializer(serializers.ModelSerializer):
         source='viabilidad_administrativa_semaforo', read_only=True
     )
 
+    # Campos de Obra que leen los campos calculados (los demás leen el suyo)
+    CAMPOS_CALCULADOS = {
+        'semaforo': ('riesgo_nivel', 'avance_fisico_pct', 'urgencia'),
+        'presupuesto_final': ('presupuesto_modificado', 'anteproyecto_total'),
+        'monto_ejecutado': ('presupuesto_modificado', 'anteproyecto_total', 'avance_financiero_pct'),
+    }
+
     class Meta:
         """Configuración del Meta para ObraSerializer."""
         model = Obra
         fields = '__all__'
 
+    def __init__(self, *args, fields=None, **kwargs):
+        """`fields` limita la salida a esos campos (sparse fieldset)."""
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            desconocidos = [nombre for nombre in fields if nombre not in self.fields]
+            if desconocidos:
+                raise serializers.ValidationError({
+                    'fields': f"Campos desconocidos: {', '.join(desconocidos)}"
+                })
+            for nombre in set(self.fields) - set(fields):
+                self.fields.pop(nombre)
+
+    @classmethod
+    def campos_modelo(cls, fields):
+        """Campos de Obra que hay que leer para serializar `fields` (para .only())."""
+        campos = ['id']
+        for nombre, campo in cls(fields=fields).fields.items():
+            if isinstance(campo, serializers.SerializerMethodField):
+                fuentes = cls.CAMPOS_CALCULADOS.get(nombre, (nombre,))
+            else:
+                fuentes = (campo.source,)
+            campos.extend(f for f in fuentes if f not in campos)
+        return campos
+
     def get_presupuesto_final(self, obj):
         """Calcula el presupuesto final según documentación."""
         if obj.presupuesto_modificado and obj.presupuesto_modificado > 0:
@@ -73,14 +114,7 @@ class ObraSerializer(serializers.ModelSerializer):
 
     def _to_text(self, valor):
         """Convierte valores numéricos a texto descriptivo."""
-        textos = {
-            1: "1 - Muy Bajo",
-            2: "2 - Bajo",
-            3: "3 - Regular",
-            4: "4 - Alto",
-            5: "5 - Muy Alto"
-        }
-        return textos.get(valor, f"{valor} - Definido")
+        return TEXTOS_ESCALA.get(valor, f"{valor} - Definido")
 
     def get_urgencia(self, obj):
         """Obtiene urgencia como texto."""
@@ -128,8 +162,8 @@ class ReporteConfigSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'nombre', 'tipo_reporte', 'periodo', 'fecha_corte',
             'direcciones', 'direcciones_info', 'incluir_todas_direcciones',
-            'incluir_graficos', 'incluir_anexos', 'formato_salida',
-            'creado_en', 'actualizado_en'
+            'incluir_graficos', 'incluir_anexos', 'detalle_completo', 'formato_salida',
+            'programado', 'creado_en', 'actualizado_en'
         ]
         read_only_fields = ['creado_en', 'actualizado_en']
 
@@ -164,6 +198,7 @@ class GenerarReporteSerializer(serializers.Serializer):
     )
     incluir_graficos = serializers.BooleanField(default=True)
     incluir_anexos = serializers.BooleanField(default=False)
+    detalle_completo = serializers.BooleanField(default=False)
     
     def validate_fecha_corte(self, value):
         """Validar que la fecha de corte no sea futura"""
@@ -190,3 +225,19 @@ class ReporteGeneradoSerializer(serializers.ModelSerializer):
             'fecha_generacion', 'archivo_pdf', 'archivo_excel'
         ]
         read_only_fields = fields
+
+
+class TrabajoReporteSerializer(serializers.ModelSerializer):
+    """
+    Serializer para el estado de un trabajo de reporte en la cola.
+    """
+    reporte_info = ReporteGeneradoSerializer(source='reporte', read_only=True)
+
+    class Meta:
+        """Configuración del Meta para TrabajoReporteSerializer."""
+        model = TrabajoReporte
+        fields = [
+            'id', 'configuracion', 'estado', 'error', 'reporte', 'reporte_info',
+            'creado_en', 'iniciado_en', 'terminado_en'
+        ]
+        read_only_fields = fields
@@ -0,0 +1,111 @@
+# Proyecto\POA_Reporte\backend\poa\signals.py
+import threading
+from contextlib import contextmanager
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Obra, Direccion
+from .resumen import CAMPOS_LLAVE, llave_de_obra, llave_resumen, recalcular_bucket
+from .territorio import sincronizar_alcaldias
+from .direcciones import asignar_direcciones
+from .versiones import incrementar_version
+
+_estado = threading.local()
+
+
+@contextmanager
+def senales_en_pausa():
+    """
+    Desactiva el recálculo por obra dentro del bloque.
+
+    Para operaciones masivas que al terminar llaman a recalcular_resumen()
+    e incrementar_version() una sola vez.
+    """
+    anterior = getattr(_estado, 'pausa', False)
+    _estado.pausa = True
+    try:
+        yield
+    finally:
+        _estado.pausa = anterior
+
+
+def _en_pausa():
+    return getattr(_estado, 'pausa', False)
+
+
+@receiver(pre_save, sender=Obra)
+def recordar_llave_resumen(sender, instance, raw=False, **kwargs):
+    """Guarda la llave del resumen antes de editar, por si cambia"""
+    instance._llave_resumen_anterior = None
+    if raw or instance.pk is None or _en_pausa():
+        return
+    anterior = Obra.objects.filter(pk=instance.pk).values_list(*CAMPOS_LLAVE).first()
+    if anterior:
+        instance._llave_resumen_anterior = llave_resumen(*anterior)
+
+
+@receiver(post_save, sender=Obra)
+def actualizar_resumen_al_guardar(sender, instance, raw=False, **kwargs):
+    """Actualiza solo las filas del resumen afectadas por la obra"""
+    if raw or _en_pausa():
+        return
+    llaves = {llave_de_obra(instance)}
+    anterior = getattr(instance, '_llave_resumen_anterior', None)
+    if anterior:
+        llaves.add(anterior)
+    for llave in llaves:
+        recalcular_bucket(*llave)
+
+
+@receiver(post_save, sender=Obra)
+def actualizar_alcaldias_al_guardar(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Vuelve a leer las alcaldías de la obra (las filas se borran en cascada)"""
+    if raw or _en_pausa():
+        return
+    if update_fields is not None and 'alcaldias' not in update_fields:
+        return
+    sincronizar_alcaldias(instance)
+
+
+@receiver(post_delete, sender=Obra)
+def actualizar_resumen_al_borrar(sender, instance, **kwargs):
+    """Descuenta la obra borrada de su fila del resumen"""
+    if _en_pausa():
+        return
+    recalcular_bucket(*llave_de_obra(instance))
+
+
+@receiver(post_save, sender=Obra)
+@receiver(post_delete, sender=Obra)
+def versionar_obras(sender, **kwargs):
+    """Invalida los reportes en caché cuando cambian las obras"""
+    if _en_pausa():
+        return
+    incrementar_version('obra')
+
+
+@receiver(post_save, sender=Direccion)
+@receiver(post_delete, sender=Direccion)
+def versionar_direcciones(sender, **kwargs):
+    """Invalida los reportes en caché cuando cambian las direcciones"""
+    incrementar_version('direccion')
+
+
+@receiver(post_save, sender=Direccion)
+def reasignar_obras(sender, raw=False, **kwargs):
+    """Un nombre o código nuevo puede cambiar la dirección de las obras"""
+    if raw:
+        return
+    asignar_direcciones()
+
+
+@receiver(post_delete, sender=Direccion)
+def reasignar_obras_al_borrar(sender, **kwargs):
+    """
+    Al borrar una dirección, la base ya dejó en NULL la dirección de sus
+    obras (SET_NULL) sin pasar por asignar_direcciones: la versión de las
+    obras se incrementa siempre para invalidar cachés y ETags.
+    """
+    if not asignar_direcciones():
+        incrementar_version('obra')
@@ -0,0 +1,187 @@
+# Proyecto\POA_Reporte\backend\poa\territorio.py
+"""
+Agregación territorial de las obras por alcaldía.
+
+`Obra.alcaldias` es texto libre que puede nombrar varias alcaldías
+("Coyoacán, Tlalpan", "Álvaro Obregón y Benito Juárez"). Se lee una sola
+vez, al guardar o importar, y se guarda en ObraAlcaldia con el peso de cada
+alcaldía. El reporte territorial es entonces una consulta agrupada sobre
+ObraAlcaldia unida con Obra por llave primaria, en lugar de un LIKE por
+alcaldía. Los textos que no nombran ninguna alcaldía conocida quedan fuera
+de la tabla y se cuentan como "sin alcaldía".
+"""
+import re
+import unicodedata
+from functools import lru_cache
+
+from django.db import transaction
+from django.db.models import Avg, Count, ExpressionWrapper, F, FloatField, Sum
+
+from .models import Obra, ObraAlcaldia
+from .estadisticas import presupuesto_vigente, monto_ejecutado, beneficiarios_de_obra
+from .direcciones import filtrar_por_direcciones
+
+# Nombre oficial -> otras formas en que aparece en la hoja
+ALCALDIAS = {
+    'Álvaro Obregón': (),
+    'Azcapotzalco': (),
+    'Benito Juárez': (),
+    'Coyoacán': (),
+    'Cuajimalpa de Morelos': ('cuajimalpa',),
+    'Cuauhtémoc': (),
+    'Gustavo A. Madero': ('gustavo a madero', 'gustavo madero', 'gam'),
+    'Iztacalco': (),
+    'Iztapalapa': (),
+    'La Magdalena Contreras': ('magdalena contreras',),
+    'Miguel Hidalgo': (),
+    'Milpa Alta': (),
+    'Tláhuac': (),
+    'Tlalpan': (),
+    'Venustiano Carranza': (),
+    'Xochimilco': (),
+}
+
+# Textos que cubren toda la ciudad
+TODAS = ('todas las alcaldias', 'las 16 alcaldias', 'toda la ciudad')
+
+TAMANO_LOTE = 2000
+
+
+def _normalizar(texto):
+    """Minúsculas, sin acentos y solo letras y números separados por un espacio"""
+    sin_acentos = unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('ascii')
+    return ' ' + ' '.join(re.findall(r'[a-z0-9]+', sin_acentos.lower())) + ' '
+
+
+_FORMAS = [
+    (nombre, [_normalizar(forma) for forma in (nombre,) + formas])
+    for nombre, formas in ALCALDIAS.items()
+]
+
+
+@lru_cache(maxsize=4096)
+def pesos_alcaldias(texto):
+    """
+    ((alcaldía, peso), ...) de un texto de `Obra.alcaldias`, con el nombre
+    oficial de cada alcaldía y el presupuesto repartido en partes iguales.
+    """
+    if not texto:
+        return ()
+    normalizado = _normalizar(texto)
+    if any(_normalizar(todas) in normalizado for todas in TODAS):
+        encontradas = list(ALCALDIAS)
+    else:
+        encontradas = [
+            nombre for nombre, formas in _FORMAS
+            if any(forma in normalizado for forma in formas)
+        ]
+    if not encontradas:
+        return ()
+    peso = 1.0 / len(encontradas)
+    return tuple((nombre, peso) for nombre in encontradas)
+
+
+# ============================
+# SINCRONIZACIÓN
+# ============================
+
+def sincronizar_alcaldias(obra):
+    """Actualiza las filas de ObraAlcaldia de una obra si cambió su texto"""
+    pesos = dict(pesos_alcaldias(obra.alcaldias))
+    actuales = dict(ObraAlcaldia.objects.filter(obra=obra).values_list('alcaldia', 'peso'))
+    if actuales == pesos:
+        return
+    with transaction.atomic():
+        ObraAlcaldia.objects.filter(obra=obra).delete()
+        ObraAlcaldia.objects.bulk_create([
+            ObraAlcaldia(obra=obra, alcaldia=alcaldia, peso=peso) for alcaldia, peso in pesos.items()
+        ])
+
+
+def recalcular_alcaldias():
+    """
+    Reconstruye ObraAlcaldia desde el texto de todas las obras.
+
+    Se usa después de importaciones masivas (bulk_create no dispara
+    señales) y desde el comando `recalcular_alcaldias`. Regresa el número
+    de filas creadas.
+    """
+    creadas = 0
+    with transaction.atomic():
+        ObraAlcaldia.objects.all().delete()
+        lote = []
+        for pk, texto in Obra.objects.values_list('pk', 'alcaldias').iterator(chunk_size=TAMANO_LOTE):
+            lote.extend(
+                ObraAlcaldia(obra_id=pk, alcaldia=alcaldia, peso=peso)
+                for alcaldia, peso in pesos_alcaldias(texto)
+            )
+            if len(lote) >= TAMANO_LOTE:
+                ObraAlcaldia.objects.bulk_create(lote)
+                creadas += len(lote)
+                lote = []
+        ObraAlcaldia.objects.bulk_create(lote)
+        creadas += len(lote)
+    return creadas
+
+
+# ============================
+# AGREGACIÓN
+# ============================
+
+def _ponderado(expresion):
+    """Expresión de la obra multiplicada por el peso de la alcaldía"""
+    return ExpressionWrapper(expresion * F('peso'), output_field=FloatField())
+
+
+def agregados_por_alcaldia(fecha_corte=None, direcciones=None):
+    """
+    Presupuesto, ejecutado, beneficiarios y avance por alcaldía de las obras
+    iniciadas a la fecha de corte (y de esas direcciones), en una consulta.
+
+    Los montos y beneficiarios van ponderados por el peso (la suma de todas
+    las alcaldías da el total de la ciudad); `obras` cuenta cada obra en
+    todas las alcaldías que abarca.
+    """
+    filas = filtrar_por_direcciones(ObraAlcaldia.objects.all(), direcciones, prefijo='obra__')
+    if fecha_corte is not None:
+        filas = filas.filter(obra__fecha_inicio_prog__lte=fecha_corte)
+
+    vigente = presupuesto_vigente('obra__')
+    grupos = (
+        filas.order_by()
+        .values('alcaldia')
+        .annotate(
+            obras=Count('obra_id'),
+            presupuesto=Sum(_ponderado(vigente)),
+            ejecutado=Sum(_ponderado(monto_ejecutado('obra__'))),
+            beneficiarios=Sum(_ponderado(beneficiarios_de_obra('obra__'))),
+            avance_promedio=Avg('obra__avance_fisico_pct'),
+            suma_avance_presupuesto=Sum(_ponderado(vigente * F('obra__avance_fisico_pct'))),
+        )
+    )
+
+    resultado = []
+    for grupo in grupos:
+        presupuesto = grupo['presupuesto'] or 0.0
+        suma_avance_presupuesto = grupo.pop('suma_avance_presupuesto') or 0.0
+        grupo.update(
+            presupuesto=float(presupuesto),
+            ejecutado=float(grupo['ejecutado'] or 0.0),
+            beneficiarios=int(round(grupo['beneficiarios'] or 0)),
+            avance_promedio=float(grupo['avance_promedio'] or 0.0),
+            avance_ponderado=suma_avance_presupuesto / presupuesto if presupuesto > 0 else 0.0,
+        )
+        resultado.append(grupo)
+    resultado.sort(key=lambda grupo: grupo['presupuesto'], reverse=True)
+    return resultado
+
+
+def reporte_territorial(fecha_corte=None, direcciones=None):
+    """Agregados por alcaldía más las obras que no nombran ninguna"""
+    sin_alcaldia = filtrar_por_direcciones(Obra.objects.filter(territorios__isnull=True), direcciones)
+    if fecha_corte is not None:
+        sin_alcaldia = sin_alcaldia.filter(fecha_inicio_prog__lte=fecha_corte)
+    return {
+        'alcaldias': agregados_por_alcaldia(fecha_corte, direcciones),
+        'obras_sin_alcaldia': sin_alcaldia.count(),
+    }
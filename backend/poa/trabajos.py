@@ -0,0 +1,261 @@
+# Proyecto\POA_Reporte\backend\poa\trabajos.py
+"""
+Cola local de trabajos de reportes.
+
+La cola es la propia tabla TrabajoReporte: un trabajador toma un trabajo
+pendiente cambiando su estado con un UPDATE condicional, así dos hilos (o
+dos procesos con `manage.py procesar_trabajos`) nunca procesan el mismo.
+No necesita ningún broker externo.
+"""
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import Obra, ReporteConfig, ReporteGenerado, TrabajoReporte
+from .columnas import proyectar_obras
+from .direcciones import filtrar_por_direcciones
+from .cache_reportes import datos_de_configuracion, llave_reporte
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Segundos tras los que un trabajo en 'procesando' se da por abandonado
+TIMEOUT_TRABAJO = 30 * 60
+
+
+# ============================
+# RENDERIZADO
+# ============================
+
+def direcciones_de_configuracion(configuracion):
+    """Ids de las direcciones elegidas (vacío: todas)"""
+    return list(configuracion.direcciones.values_list('pk', flat=True))
+
+
+def obras_de_configuracion(configuracion):
+    """Obras que entran en un reporte según su configuración"""
+    obras = Obra.objects.all()
+
+    # Filtrar por direcciones si se especificaron
+    obras = filtrar_por_direcciones(obras, direcciones_de_configuracion(configuracion))
+
+    # Filtrar por fecha
+    return obras.filter(fecha_inicio_prog__lte=configuracion.fecha_corte)
+
+
+def configuracion_generador(configuracion):
+    """Convierte un ReporteConfig guardado en la configuración del generador"""
+    from .generador import ConfiguracionReporte
+
+    return ConfiguracionReporte(
+        nombre=configuracion.nombre,
+        tipo_reporte=configuracion.tipo_reporte,
+        periodo=configuracion.periodo,
+        fecha_corte=configuracion.fecha_corte,
+        formato_salida=configuracion.formato_salida,
+        incluir_graficos=configuracion.incluir_graficos,
+        incluir_anexos=configuracion.incluir_anexos,
+        detalle_completo=configuracion.detalle_completo
+    )
+
+
+def _guardar_archivo(campo, salida, nombre):
+    """Copia una SalidaReporte al FileField y la cierra"""
+    with salida:
+        salida.seek(0)
+        campo.save(nombre, File(salida), save=False)
+
+
+def reporte_en_cache(llave):
+    """ReporteGenerado previo con la misma llave, si sus archivos siguen en disco"""
+    for reporte in ReporteGenerado.objects.filter(llave_cache=llave):
+        archivos = [a for a in (reporte.archivo_pdf, reporte.archivo_excel) if a]
+        if archivos and all(a.storage.exists(a.name) for a in archivos):
+            return reporte
+    return None
+
+
+def reporte_de_configuracion(configuracion):
+    """ReporteGenerado de una configuración con los datos actuales, si ya existe"""
+    return reporte_en_cache(llave_reporte(datos_de_configuracion(configuracion), origen='trabajos'))
+
+
+def renderizar_configuracion(configuracion, usuario=None):
+    """Genera los archivos de un ReporteConfig y los guarda en un ReporteGenerado"""
+    # reportlab/openpyxl se cargan con el primer reporte, no al importar la cola
+    from .generador import GeneradorReportes
+    from .concurrencia import renderizar_ambos
+    from .cache_columnar import estadisticas_columnares
+
+    llave = llave_reporte(datos_de_configuracion(configuracion), origen='trabajos')
+    reporte = reporte_en_cache(llave)
+    if reporte is not None:
+        return reporte
+
+    config = configuracion_generador(configuracion)
+    obras = obras_de_configuracion(configuracion)
+    estadisticas = estadisticas_columnares(
+        configuracion.fecha_corte, direcciones_de_configuracion(configuracion)
+    )
+    obras = proyectar_obras(obras, config.tipo_reporte)
+
+    generador = GeneradorReportes()
+    fecha = config.fecha_corte.strftime('%Y%m%d')
+    nombre_archivo = f"{config.tipo_reporte}_{fecha}_{configuracion.pk}"
+
+    reporte = ReporteGenerado(
+        configuracion=configuracion,
+        nombre_archivo=nombre_archivo,
+        total_proyectos=estadisticas['total_obras'],
+        presupuesto_total=Decimal(str(round(estadisticas['presupuesto_total'], 2))),
+        beneficiarios_total=estadisticas['beneficiarios_total'],
+        resumen_json=estadisticas,
+        llave_cache=llave,
+        generado_por=usuario
+    )
+
+    if config.formato_salida == 'ambos':
+        # PDF y Excel a la vez, con una sola lectura de las obras
+        futuros = renderizar_ambos(obras, config, estadisticas)
+        reporte.archivo_pdf.save(f"{nombre_archivo}.pdf", ContentFile(futuros['pdf'].result()), save=False)
+        reporte.archivo_excel.save(f"{nombre_archivo}.xlsx", ContentFile(futuros['excel'].result()), save=False)
+
+    elif config.formato_salida == 'pdf':
+        salida = generador.generar_pdf_reporte(obras, config, estadisticas)
+        _guardar_archivo(reporte.archivo_pdf, salida, f"{nombre_archivo}.pdf")
+
+    elif config.formato_salida == 'excel':
+        salida = generador.generar_excel_reporte(obras, config, estadisticas)
+        _guardar_archivo(reporte.archivo_excel, salida, f"{nombre_archivo}.xlsx")
+
+    reporte.save()
+    return reporte
+
+
+# ============================
+# COLA
+# ============================
+
+def crear_configuracion(datos, usuario=None):
+    """Guarda un ReporteConfig a partir de los datos de GenerarReporteSerializer"""
+    configuracion = ReporteConfig.objects.create(
+        nombre=datos.get('nombre_reporte', f"Reporte {datos['tipo_reporte']}"),
+        usuario=usuario,
+        tipo_reporte=datos['tipo_reporte'],
+        periodo=datos['periodo'],
+        fecha_corte=datos['fecha_corte'],
+        incluir_todas_direcciones=datos.get('incluir_todas_direcciones', True),
+        incluir_graficos=datos.get('incluir_graficos', True),
+        incluir_anexos=datos.get('incluir_anexos', False),
+        detalle_completo=datos.get('detalle_completo', False),
+        formato_salida=datos.get('formato', 'pdf')
+    )
+    if datos.get('direcciones'):
+        configuracion.direcciones.set(datos['direcciones'])
+    return configuracion
+
+
+def encolar_reporte(datos, usuario=None):
+    """Crea la configuración y el trabajo, y lo envía al pool local"""
+    with transaction.atomic():
+        return encolar_configuracion(crear_configuracion(datos, usuario), usuario)
+
+
+def encolar_configuracion(configuracion, usuario=None):
+    """Crea el trabajo de una configuración guardada y lo envía al pool local"""
+    with transaction.atomic():
+        trabajo = TrabajoReporte.objects.create(
+            configuracion=configuracion,
+            solicitado_por=usuario
+        )
+        # El pool solo ve el trabajo una vez confirmada la transacción
+        transaction.on_commit(lambda: enviar_a_pool(trabajo.pk))
+    return trabajo
+
+
+def tomar_trabajo(trabajo_id):
+    """Marca un trabajo pendiente como 'procesando'; False si otro ya lo tomó"""
+    return TrabajoReporte.objects.filter(
+        pk=trabajo_id, estado='pendiente'
+    ).update(estado='procesando', iniciado_en=timezone.now()) == 1
+
+
+def procesar_trabajo(trabajo_id):
+    """Procesa un trabajo de la cola si sigue pendiente"""
+    close_old_connections()
+    try:
+        if not tomar_trabajo(trabajo_id):
+            return False
+
+        trabajo = TrabajoReporte.objects.select_related('configuracion').get(pk=trabajo_id)
+        try:
+            reporte = renderizar_configuracion(trabajo.configuracion, trabajo.solicitado_por)
+        except Exception as e:
+            traceback.print_exc()
+            trabajo.estado = 'error'
+            trabajo.error = str(e)
+        else:
+            trabajo.estado = 'completado'
+            trabajo.reporte = reporte
+        trabajo.terminado_en = timezone.now()
+        trabajo.save(update_fields=['estado', 'error', 'reporte', 'terminado_en'])
+        return True
+    finally:
+        close_old_connections()
+
+
+def recuperar_abandonados():
+    """
+    Regresa a 'pendiente' los trabajos que llevan en 'procesando' más de
+    REPORTES_TRABAJO_TIMEOUT segundos: el proceso que los tomó murió sin
+    terminarlos. Regresa cuántos recuperó.
+    """
+    limite = timezone.now() - timedelta(
+        seconds=getattr(settings, 'REPORTES_TRABAJO_TIMEOUT', TIMEOUT_TRABAJO)
+    )
+    return TrabajoReporte.objects.filter(
+        estado='procesando', iniciado_en__lt=limite
+    ).update(estado='pendiente', iniciado_en=None)
+
+
+def procesar_pendientes(limite=None):
+    """Procesa los trabajos pendientes en orden de llegada; regresa cuántos procesó"""
+    recuperar_abandonados()
+    procesados = 0
+    while limite is None or procesados < limite:
+        trabajo_id = (
+            TrabajoReporte.objects.filter(estado='pendiente')
+            .order_by('creado_en')
+            .values_list('pk', flat=True)
+            .first()
+        )
+        if trabajo_id is None:
+            break
+        if procesar_trabajo(trabajo_id):
+            procesados += 1
+    return procesados
+
+
+def get_pool():
+    """Pool de hilos del proceso, creado en el primer uso"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'REPORTES_TRABAJADORES', 2),
+                thread_name_prefix='reportes'
+            )
+        return _pool
+
+
+def enviar_a_pool(trabajo_id):
+    """Envía un trabajo al pool de hilos local"""
+    return get_pool().submit(procesar_trabajo, trabajo_id)
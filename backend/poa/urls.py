@@ -3,13 +3,7 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from . import views
 from . import views_reports
-from .views import ObraViewSet, DireccionViewSet, ReporteViewSet
-
-# El router crea automÃ¡ticamente las URLs de la API
-router = DefaultRouter()
-router.register(r'obras', ObraViewSet, basename='obra')
-router.register(r'direcciones', DireccionViewSet, basename='direccion')
-router.register(r'reportes', ReporteViewSet, basename='reporte')
+from .views import ObraViewSet, TrabajoReporteViewSet, ReporteConfigViewSet
 
 #urlpatterns = router.urls
 
@@ -22,10 +16,12 @@ router.register(r'reportes', ReporteViewSet, basename='reporte')
 #]
 
 
+# api/direcciones/ y api/reportes/{vista_previa,generar,territorial}/ los
+# sirve core/urls.py; aquí solo van rutas que core no tiene
 router = DefaultRouter()
 router.register(r'obras', ObraViewSet, basename='obra')
-router.register(r'direcciones', DireccionViewSet, basename='direccion')
-router.register(r'reportes', ReporteViewSet, basename='reporte')
+router.register(r'reportes/jobs', TrabajoReporteViewSet, basename='trabajo-reporte')
+router.register(r'reportes/configuraciones', ReporteConfigViewSet, basename='reporte-config')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -2,6 +2,9 @@
 import pandas as pd
 import numpy as np
 import re
+from functools import lru_cache
+
+from .estadisticas import parse_beneficiarios_directos, parse_poblacion
 
 # 1. Catálogo de Escalas
 CATALOGO_ESCALAS = {
@@ -30,17 +33,97 @@ def clean_percentage_vectorized(valor):
         return 0.0
 
 # 4. Interpretación de Escalas
+# Número explícito 1-5, o la palabra clave más larga que aparezca primero
+# ("muy alto" gana sobre "alto" sin importar el orden del catálogo).
+PATRON_NUMERO_ESCALA = re.compile(r'\b([1-5])\b')
+PATRON_PALABRAS_ESCALA = re.compile(
+    '|'.join(re.escape(key) for key in sorted(CATALOGO_ESCALAS, key=len, reverse=True))
+)
+
+
+@lru_cache(maxsize=4096)
+def _escala_de_texto(val_str):
+    """Nivel (1-5) de un texto ya normalizado; memorizado por valor"""
+    match = PATRON_NUMERO_ESCALA.search(val_str)
+    if match: return int(match.group(1))
+
+    match = PATRON_PALABRAS_ESCALA.search(val_str)
+    if match: return CATALOGO_ESCALAS[match.group(0)]
+
+    return 1 # Default
+
+
 def interpretar_escala_flexible(valor):
     """Devuelve el valor numérico (1-5)"""
     if pd.isna(valor): return 1
-    val_str = str(valor).strip().lower()
-    
-    # Buscar número explícito
-    match = re.search(r'\b([1-5])\b', val_str)
-    if match: return int(match.group(1))
-    
-    # Buscar palabras clave
-    for key, num in CATALOGO_ESCALAS.items():
-        if key in val_str: return num
-            
-    return 1 # Default
\ No newline at end of file
+    return _escala_de_texto(str(valor).strip().lower())
+
+
+# 5. Versiones por columna (pandas Series)
+# Mismo resultado que las funciones de arriba, pero sobre toda la columna.
+# Las columnas de texto se factorizan: la limpieza corre una vez por valor
+# distinto y el resultado se reparte con los códigos (las escalas y montos
+# de una hoja POA repiten muchísimo).
+
+def _es_numerica(serie):
+    return pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie)
+
+
+def _por_valores_unicos(serie, limpiar, nulo):
+    """Aplica `limpiar` a los valores distintos de la columna y expande el resultado"""
+    codigos, unicos = pd.factorize(serie)
+    limpios = np.asarray(limpiar(pd.Series(unicos.astype(str), dtype=object)))
+    resultado = np.append(limpios, nulo)[codigos]  # código -1 (nulo) toma el último
+    return pd.Series(resultado, index=serie.index)
+
+
+def _a_numero(texto, quitar):
+    return pd.to_numeric(texto.str.replace(quitar, '', regex=True).str.strip(), errors='coerce')
+
+
+def clean_money_series(serie, nulo=0.0):
+    """clean_money_vectorized para una columna completa"""
+    serie = pd.Series(serie, copy=False)
+    if _es_numerica(serie):
+        return serie.astype(float).fillna(nulo)
+    numeros = _por_valores_unicos(serie, lambda u: _a_numero(u, r'[$,]'), np.nan)
+    return numeros.astype(float).fillna(nulo)
+
+
+def clean_percentage_series(serie, nulo=0.0):
+    """clean_percentage_vectorized para una columna completa"""
+    serie = pd.Series(serie, copy=False)
+    if _es_numerica(serie):
+        return serie.astype(float).fillna(nulo)
+    numeros = _por_valores_unicos(serie, lambda u: _a_numero(u, '%'), np.nan)
+    return numeros.astype(float).fillna(nulo)
+
+
+def _escala_de_textos(unicos):
+    texto = unicos.str.strip().str.lower()
+    numero = pd.to_numeric(
+        texto.str.extract(PATRON_NUMERO_ESCALA, expand=False), errors='coerce'
+    )
+    palabra = texto.str.extract(
+        f'({PATRON_PALABRAS_ESCALA.pattern})', expand=False
+    ).map(CATALOGO_ESCALAS)
+    return numero.fillna(palabra).fillna(1).astype(int)
+
+
+def interpretar_escala_series(serie):
+    """interpretar_escala_flexible para una columna completa"""
+    serie = pd.Series(serie, copy=False)
+    return _por_valores_unicos(serie, _escala_de_textos, 1).astype(int)
+
+
+# 6. Beneficiarios (mismas reglas que estadisticas.parse_*)
+def poblacion_series(serie):
+    """parse_poblacion para una columna completa (None si no trae número)"""
+    serie = pd.Series(serie, copy=False)
+    return _por_valores_unicos(serie, lambda u: [parse_poblacion(v) for v in u], None)
+
+
+def beneficiarios_directos_series(serie):
+    """parse_beneficiarios_directos para una columna completa"""
+    serie = pd.Series(serie, copy=False)
+    return _por_valores_unicos(serie, lambda u: [parse_beneficiarios_directos(v) for v in u], None)
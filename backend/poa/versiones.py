@@ -0,0 +1,39 @@
+# Proyecto\POA_Reporte\backend\poa\versiones.py
+from django.db.models import F
+from django.utils import timezone
+
+from .models import VersionDatos
+
+
+def version_datos(modelo='obra'):
+    """Versión actual de los datos de un modelo (0 si nunca ha cambiado)"""
+    version = VersionDatos.objects.filter(modelo=modelo).values_list('version', flat=True).first()
+    return version or 0
+
+
+def estado_versiones(*modelos):
+    """
+    ({modelo: versión}, último cambio) de varios modelos en una consulta;
+    el último cambio es None si ninguno ha cambiado.
+    """
+    filas = VersionDatos.objects.filter(modelo__in=modelos).values_list('modelo', 'version', 'actualizado_en')
+    versiones = dict.fromkeys(modelos, 0)
+    ultimo = None
+    for modelo, version, actualizado_en in filas:
+        versiones[modelo] = version
+        if ultimo is None or actualizado_en > ultimo:
+            ultimo = actualizado_en
+    return versiones, ultimo
+
+
+def incrementar_version(modelo='obra'):
+    """Marca que los datos de un modelo cambiaron"""
+    actualizadas = VersionDatos.objects.filter(modelo=modelo).update(
+        version=F('version') + 1, actualizado_en=timezone.now()
+    )
+    if not actualizadas:
+        _, creada = VersionDatos.objects.get_or_create(modelo=modelo, defaults={'version': 1})
+        if not creada:
+            VersionDatos.objects.filter(modelo=modelo).update(
+                version=F('version') + 1, actualizado_en=timezone.now()
+            )
@@ -1,262 +1,267 @@
 # # Proyecto\POA_Reporte\backend\poa\views.py
 from rest_framework import viewsets
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework import status
-from django.http import FileResponse, HttpResponse
+from django.core.exceptions import ImproperlyConfigured
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from django.utils import timezone
-from django.db.models import Sum, Avg, Count
+from django.utils.decorators import method_decorator
 from datetime import datetime, date
-from collections import Counter
-import zipfile
 import os
-import tempfile
 
-from .models import Obra, Direccion
+from .models import Obra, ReporteConfig, TrabajoReporte
 from .serializers import (
-    ObraSerializer, DireccionSerializer,
-    GenerarReporteSerializer
+    ObraSerializer,
+    GenerarReporteSerializer, ReporteConfigSerializer, TrabajoReporteSerializer
 )
-from .generador import GeneradorReportes, ConfiguracionReporte
+from .trabajos import encolar_reporte, encolar_configuracion
+from .programacion import reporte_programado
+from .paginacion import ObraCursorPagination
+from .lista_obras import filas_obras
+from .renderers import JSONRapidoRenderer, NDJSONRenderer
+from .exportacion import lineas_ndjson, gzip_en_streaming
+from .instantanea import generar_instantanea, CONTENT_TYPE as CONTENT_TYPE_PARQUET
+from .condicional import condicional
 
 
+@method_decorator(condicional('obra'), name='list')
+@method_decorator(condicional('obra'), name='retrieve')
 class ObraViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Obras paginadas por cursor. ?fields=id,programa,... regresa solo esos
+    campos y lee de la base solo las columnas que necesitan.
+    """
     queryset = Obra.objects.all()
     serializer_class = ObraSerializer
+    pagination_class = ObraCursorPagination
+    renderer_classes = [JSONRapidoRenderer, BrowsableAPIRenderer]
 
+    def list(self, request, *args, **kwargs):
+        """Lista en bloque: filas de values() con los campos calculados en SQL"""
+        filas, salida = filas_obras(self.filter_queryset(self.get_queryset()), self.campos_solicitados())
+        pagina = self.paginate_queryset(filas)
+        if pagina is not None:
+            return self.get_paginated_response([salida(fila) for fila in pagina])
+        return Response([salida(fila) for fila in filas])
 
-class DireccionViewSet(viewsets.ReadOnlyModelViewSet):
-    """API para obtener direcciones disponibles"""
-    queryset = Direccion.objects.all()
-    serializer_class = DireccionSerializer
-    pagination_class = None
+    def campos_solicitados(self):
+        """Campos de ?fields= (None si no se pidió un subconjunto)"""
+        valor = self.request.query_params.get('fields')
+        if not valor:
+            return None
+        return [nombre.strip() for nombre in valor.split(',') if nombre.strip()]
 
+    def get_queryset(self):
+        obras = super().get_queryset()
+        campos = self.campos_solicitados()
+        if campos:
+            obras = obras.only(*ObraSerializer.campos_modelo(campos))
+        return obras
 
-class ReporteViewSet(viewsets.ViewSet):
-    """ViewSet para generación de reportes"""
-    
-    @action(detail=False, methods=['get'])
-    def vista_previa(self, request):
-        """Obtiene vista previa del reporte según filtros"""
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fields', self.campos_solicitados())
+        return super().get_serializer(*args, **kwargs)
+
+    @action(detail=False, methods=['post'], parser_classes=[MultiPartParser])
+    def importar(self, request):
+        """Importa la hoja POA enviada en el campo 'archivo'"""
+        # pandas solo se carga cuando alguien importa
+        from .importador import importar_obras
+        
+        archivo = request.FILES.get('archivo')
+        if archivo is None:
+            return Response({
+                'success': False,
+                'error': "Falta el archivo (campo 'archivo')"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        reemplazar = str(request.data.get('reemplazar', '')).lower() in ('1', 'true', 'si', 'sí')
+        hoja = request.data.get('hoja', 0)
+        if isinstance(hoja, str) and hoja.isdigit():
+            hoja = int(hoja)
         try:
-            # Obtener parámetros
-            fecha_corte_str = request.GET.get('fecha_corte')
-            direcciones_ids = request.GET.getlist('direcciones[]')
-            
-            # Validar fecha de corte
-            if fecha_corte_str:
-                try:
-                    fecha_corte = datetime.strptime(fecha_corte_str, '%Y-%m-%d').date()
-                except ValueError:
-                    return Response({
-                        'error': 'Formato de fecha inválido. Use YYYY-MM-DD'
-                    }, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                fecha_corte = date.today()
-            
-            # Filtrar obras
-            obras = Obra.objects.all()
-            
-            # Filtrar por direcciones si se especificaron
-            if direcciones_ids:
-                try:
-                    direcciones_ids = [int(id) for id in direcciones_ids]
-                    # Asumiendo que existe un campo 'direccion_id' o similar en Obra
-                    # Ajusta según tu modelo
-                    # obras = obras.filter(direccion_id__in=direcciones_ids)
-                except (ValueError, TypeError):
-                    pass
-            
-            # Filtrar por fecha
-            obras = obras.filter(fecha_inicio_prog__lte=fecha_corte)
-            
-            # Calcular estadísticas
-            estadisticas = self._calcular_estadisticas(obras)
-            estadisticas['fecha_corte'] = fecha_corte.isoformat()
-            
-            return Response(estadisticas)
-            
-        except Exception as e:
+            resultado = importar_obras(
+                archivo,
+                hoja=hoja,
+                fila_encabezado=int(request.data.get('fila_encabezado', 0)),
+                reemplazar=reemplazar
+            )
+        except ValueError as e:
             return Response({
+                'success': False,
                 'error': str(e)
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-    
-    @action(detail=False, methods=['post'])
-    def generar(self, request):
-        """Genera un reporte según configuración"""
-        try:
-            # Validar datos de entrada
-            serializer = GenerarReporteSerializer(data=request.data)
-            if not serializer.is_valid():
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({'success': True, **resultado})
+
+    @action(detail=False, methods=['get'], renderer_classes=[JSONRapidoRenderer, NDJSONRenderer])
+    def exportar(self, request):
+        """
+        Todas las obras en NDJSON (una por línea), en streaming y ordenadas
+        por id. ?desde=<id> reanuda después de esa obra, ?gzip=1 comprime y
+        ?fields= limita los campos como en la lista.
+        """
+        desde = request.query_params.get('desde')
+        if desde is not None:
+            if not desde.isdigit():
                 return Response({
                     'success': False,
-                    'error': 'Datos inválidos',
-                    'details': serializer.errors
+                    'error': "'desde' debe ser el id de la última obra recibida"
                 }, status=status.HTTP_400_BAD_REQUEST)
-            
-            data = serializer.validated_data
-            
-            # Crear configuración usando la clase del generador
-            config = ConfiguracionReporte(
-                nombre=data.get('nombre_reporte', f"Reporte {data['tipo_reporte']}"),
-                tipo_reporte=data['tipo_reporte'],
-                periodo=data['periodo'],
-                fecha_corte=data['fecha_corte'],
-                formato_salida=data.get('formato', 'pdf'),
-                incluir_graficos=data.get('incluir_graficos', True),
-                incluir_anexos=data.get('incluir_anexos', False)
-            )
-            
-            # Filtrar obras
-            obras = Obra.objects.all()
-            
-            # Filtrar por direcciones si se especificaron
-            if 'direcciones' in data and data['direcciones']:
-                direcciones_ids = data['direcciones']
-                # Ajusta según tu modelo - descomenta la línea siguiente si tienes campo direccion
-                # obras = obras.filter(direccion_id__in=direcciones_ids)
-            
-            # Filtrar por fecha
-            obras = obras.filter(fecha_inicio_prog__lte=config.fecha_corte)
-            
-            # Calcular estadísticas
-            estadisticas = self._calcular_estadisticas(obras)
-            
-            # Generar reporte
-            generador = GeneradorReportes()
-            archivos_generados = {}
-            
-            if config.formato_salida in ['pdf', 'ambos']:
-                archivo_pdf = generador.generar_pdf_reporte(obras, config, estadisticas)
-                archivos_generados['pdf'] = archivo_pdf
-            
-            if config.formato_salida in ['excel', 'ambos']:
-                archivo_excel = generador.generar_excel_reporte(obras, config, estadisticas)
-                archivos_generados['excel'] = archivo_excel
-            
-            # Si se generan ambos formatos, crear ZIP
-            if config.formato_salida == 'ambos':
-                zip_path = tempfile.NamedTemporaryFile(suffix='.zip', delete=False).name
-                with zipfile.ZipFile(zip_path, 'w') as zipf:
-                    if 'pdf' in archivos_generados:
-                        zipf.write(archivos_generados['pdf'], 
-                                 f"{config.nombre}.pdf")
-                    if 'excel' in archivos_generados:
-                        zipf.write(archivos_generados['excel'], 
-                                 f"{config.nombre}.xlsx")
-                
-                response = FileResponse(
-                    open(zip_path, 'rb'),
-                    content_type='application/zip'
-                )
-                response['Content-Disposition'] = f'attachment; filename="{config.nombre}.zip"'
-                
-                # Limpiar archivos temporales después de enviar respuesta
-                for archivo in archivos_generados.values():
-                    if os.path.exists(archivo):
-                        try:
-                            os.unlink(archivo)
-                        except:
-                            pass
-                
-                return response
-            
-            # Si es solo un formato
-            elif config.formato_salida == 'pdf':
-                response = FileResponse(
-                    open(archivos_generados['pdf'], 'rb'),
-                    content_type='application/pdf'
-                )
-                response['Content-Disposition'] = f'attachment; filename="{config.nombre}.pdf"'
-                return response
-            
-            elif config.formato_salida == 'excel':
-                response = FileResponse(
-                    open(archivos_generados['excel'], 'rb'),
-                    content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-                )
-                response['Content-Disposition'] = f'attachment; filename="{config.nombre}.xlsx"'
-                return response
-            
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
+            desde = int(desde)
+
+        partes = lineas_ndjson(
+            self.filter_queryset(self.get_queryset()), self.campos_solicitados(), desde
+        )
+        nombre = f"obras_desde_{desde}.ndjson" if desde else "obras.ndjson"
+        content_type = 'application/x-ndjson'
+        if str(request.query_params.get('gzip', '')).lower() in ('1', 'true', 'si', 'sí'):
+            partes = gzip_en_streaming(partes)
+            nombre += '.gz'
+            content_type = 'application/gzip'
+
+        response = StreamingHttpResponse(partes, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{nombre}"'
+        return response
+
+    @action(detail=False, methods=['get'])
+    @method_decorator(condicional('obra'))
+    def instantanea(self, request):
+        """Instantánea Parquet de las obras; se regenera solo si cambiaron los datos"""
+        try:
+            ruta = generar_instantanea()
+        except ImproperlyConfigured as e:
             return Response({
                 'success': False,
                 'error': str(e)
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-    
-    def _calcular_estadisticas(self, obras):
-        """Calcula estadísticas para el reporte"""
-        # Totales básicos
-        total_obras = obras.count()
-        
-        # Presupuesto
-        presupuesto_total = obras.aggregate(
-            total=Sum('presupuesto_modificado')
-        )['total'] or 0
-        
-        # Si no hay presupuesto modificado, usar anteproyecto
-        if presupuesto_total == 0:
-            presupuesto_total = obras.aggregate(
-                total=Sum('anteproyecto_total')
-            )['total'] or 0
-        
-        presupuesto_promedio = presupuesto_total / total_obras if total_obras > 0 else 0
-        
-        # Beneficiarios - Convertir a entero si es string
-        beneficiarios_total = 0
-        for obra in obras:
-            try:
-                if obra.poblacion_objetivo_num:
-                    if isinstance(obra.poblacion_objetivo_num, str):
-                        # Eliminar comas y convertir
-                        beneficiarios_total += int(obra.poblacion_objetivo_num.replace(',', ''))
-                    else:
-                        beneficiarios_total += int(obra.poblacion_objetivo_num)
-            except (ValueError, TypeError):
-                pass
-        
-        # Avances
-        avance_promedio = obras.aggregate(
-            promedio=Avg('avance_fisico_pct')
-        )['promedio'] or 0
-        
-        # Distribución por estado
-        obras_por_estado = dict(Counter(
-            obras.exclude(estatus_general__isnull=True)
-            .exclude(estatus_general='')
-            .values_list('estatus_general', flat=True)
-        ))
-        
-        # Distribución por área
-        obras_por_area = dict(Counter(
-            obras.exclude(area_responsable__isnull=True)
-            .exclude(area_responsable='')
-            .values_list('area_responsable', flat=True)
-        ))
-        
-        # Obras activas
-        obras_activas = obras.exclude(
-            estatus_general__in=['Completado', 'Cancelado']
-        ).count()
-        
-        # Presupuesto ejecutado
-        presupuesto_ejecutado = 0
-        for obra in obras:
-            presupuesto = obra.presupuesto_modificado or obra.anteproyecto_total or 0
-            avance_financiero = obra.avance_financiero_pct or 0
-            presupuesto_ejecutado += presupuesto * (avance_financiero / 100)
-        
-        return {
-            'total_obras': total_obras,
-            'total_proyectos': total_obras,  # Alias
-            'presupuesto_total': float(presupuesto_total),
-            'presupuesto_promedio': float(presupuesto_promedio),
-            'presupuesto_ejecutado': float(presupuesto_ejecutado),
-            'beneficiarios_total': beneficiarios_total,
-            'avance_promedio': float(avance_promedio),
-            'obras_por_estado': obras_por_estado,
-            'obras_por_area': obras_por_area,
-            'obras_activas': obras_activas,
-        }
\ No newline at end of file
+            }, status=status.HTTP_501_NOT_IMPLEMENTED)
+
+        return FileResponse(
+            open(ruta, 'rb'), content_type=CONTENT_TYPE_PARQUET,
+            as_attachment=True, filename=os.path.basename(ruta)
+        )
+
+    @action(detail=False, methods=['get'])
+    @method_decorator(condicional('obra'))
+    def pivote(self, request):
+        """
+        Obras agrupadas por 1 o 2 dimensiones: ?dimensiones=area_responsable,tipo_obra
+        &medidas=obras,presupuesto,ejecutado,avance_promedio,avance_ponderado
+        &fecha_corte=AAAA-MM-DD (opcional, obras iniciadas a esa fecha).
+        """
+        # numpy solo se carga con el caché columnar
+        from .cache_columnar import pivote_obras, MEDIDAS
+
+        def lista(nombre):
+            valor = request.query_params.get(nombre, '')
+            return [v.strip() for v in valor.split(',') if v.strip()]
+
+        fecha_corte = request.query_params.get('fecha_corte')
+        try:
+            if fecha_corte:
+                try:
+                    fecha_corte = datetime.strptime(fecha_corte, '%Y-%m-%d').date()
+                except ValueError:
+                    raise ValueError("'fecha_corte' debe tener el formato AAAA-MM-DD")
+            resultado = pivote_obras(lista('dimensiones'), lista('medidas') or MEDIDAS, fecha_corte or None)
+        except ValueError as e:
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(resultado)
+
+
+class TrabajoReporteViewSet(viewsets.ReadOnlyModelViewSet):
+    """Cola de reportes: encola, consulta el estado y descarga el resultado"""
+    queryset = TrabajoReporte.objects.select_related('reporte')
+    serializer_class = TrabajoReporteSerializer
+
+    def create(self, request):
+        """Encola un reporte y responde de inmediato con el id del trabajo"""
+        serializer = GenerarReporteSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({
+                'success': False,
+                'error': 'Datos inválidos',
+                'details': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        usuario = request.user if request.user.is_authenticated else None
+        trabajo = encolar_reporte(serializer.validated_data, usuario)
+        return Response(
+            TrabajoReporteSerializer(trabajo).data,
+            status=status.HTTP_202_ACCEPTED
+        )
+
+    @action(detail=True, methods=['get'])
+    def descargar(self, request, pk=None):
+        """Descarga el archivo de un trabajo terminado (?formato=pdf|excel)"""
+        trabajo = self.get_object()
+        if trabajo.estado != 'completado' or trabajo.reporte is None:
+            return Response({
+                'success': False,
+                'error': f'El trabajo está en estado {trabajo.estado}',
+                'estado': trabajo.estado
+            }, status=status.HTTP_409_CONFLICT)
+
+        return respuesta_archivo(trabajo.reporte, request.query_params.get('formato'))
+
+
+class ReporteConfigViewSet(viewsets.ModelViewSet):
+    """
+    Configuraciones guardadas. Las que tienen `programado` se pregeneran al
+    cierre de su periodo (comando programar_reportes) y `descargar` sirve
+    ese archivo sin esperar.
+    """
+    queryset = ReporteConfig.objects.prefetch_related('direcciones')
+    serializer_class = ReporteConfigSerializer
+
+    @action(detail=True, methods=['get'])
+    def descargar(self, request, pk=None):
+        """
+        Descarga el reporte ya generado (?formato=pdf|excel); el pregenerado
+        al último cierre si la configuración es programada. Si todavía no
+        existe para los datos actuales, encola la configuración con su fecha
+        de corte guardada y responde 202 con el trabajo.
+        """
+        configuracion = self.get_object()
+        reporte = reporte_programado(configuracion)
+        if reporte is None:
+            usuario = request.user if request.user.is_authenticated else None
+            trabajo = encolar_configuracion(configuracion, usuario)
+            return Response(
+                TrabajoReporteSerializer(trabajo).data,
+                status=status.HTTP_202_ACCEPTED
+            )
+        return respuesta_archivo(reporte, request.query_params.get('formato'))
+
+
+def respuesta_archivo(reporte, formato=None):
+    """Descarga del PDF o el Excel de un ReporteGenerado (por defecto el PDF)"""
+    if formato is None:
+        formato = 'pdf' if reporte.archivo_pdf else 'excel'
+
+    if formato == 'pdf' and reporte.archivo_pdf:
+        archivo, content_type, extension = (
+            reporte.archivo_pdf, 'application/pdf', 'pdf'
+        )
+    elif formato == 'excel' and reporte.archivo_excel:
+        archivo, content_type, extension = (
+            reporte.archivo_excel,
+            'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            'xlsx'
+        )
+    else:
+        return Response({
+            'success': False,
+            'error': f'El reporte no tiene archivo en formato {formato}'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    response = FileResponse(archivo.open('rb'), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{reporte.nombre_archivo}.{extension}"'
+    return response
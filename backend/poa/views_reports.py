@@ -1,26 +1,18 @@
 # Proyecto\POA_Reporte\backend\poa\views_reports.py
 import json
-import os
+import shutil
 from datetime import datetime
 from django.http import JsonResponse, HttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.db.models import Sum, Count
 from .models import Obra, Direccion
+from .estadisticas import BENEFICIARIOS
 from .serializers import ObraSerializer
-
-# Importa el generador
-from .generador import GeneradorReportes, ConfiguracionReporte
-
-import pandas as pd
-from io import BytesIO
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, landscape
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-import zipfile
+from .salida import SalidaReporte
+from .condicional import condicional
 
 @csrf_exempt
+@condicional('direccion')
 def lista_direcciones(request):
     """Endpoint para listar todas las direcciones"""
     try:
@@ -58,6 +50,7 @@ def lista_direcciones(request):
         )
 
 @csrf_exempt
+@condicional('obra', por_dia=True)
 def vista_previa_reporte(request):
     """Endpoint para vista previa del reporte"""
     try:
@@ -94,7 +87,7 @@ def vista_previa_reporte(request):
             
             # Calcula beneficiarios
             beneficiarios_result = queryset.aggregate(
-                total=Sum('beneficiarios_directos')
+                total=Sum(BENEFICIARIOS)
             )
             beneficiarios_total = beneficiarios_result['total'] or 0
             
@@ -143,6 +136,10 @@ def vista_previa_reporte(request):
 @csrf_exempt
 def generar_reporte(request):
     """Endpoint principal para generar reportes usando el generador"""
+    # El generador (reportlab/openpyxl) se carga con el primer reporte
+    import zipfile
+    from .generador import GeneradorReportes, ConfiguracionReporte
+    
     try:
         if request.method != 'POST':
             return JsonResponse({'error': 'Método no permitido'}, status=405)
@@ -155,6 +152,7 @@ def generar_reporte(request):
         formato = data.get('formato', 'pdf')
         direcciones_ids = data.get('direcciones', [])
         incluir_graficos = data.get('incluir_graficos', True)
+        detalle_completo = data.get('detalle_completo', False)
         nombre_reporte = data.get('nombre_reporte', f'Reporte_{tipo_reporte}')
         
         print(f"Generando reporte: tipo={tipo_reporte}, formato={formato}, fecha={fecha_corte_str}")
@@ -189,7 +187,7 @@ def generar_reporte(request):
             obras = self._crear_obras_ejemplo()
         
         # Calcular estadísticas
-        estadisticas = self._calcular_estadisticas(obras)
+        estadisticas = _calcular_estadisticas(fecha_corte if fecha_corte_str else None)
         
         # Configurar reporte
         config = ConfiguracionReporte(
@@ -198,56 +196,39 @@ def generar_reporte(request):
             periodo=periodo,
             fecha_corte=fecha_corte,
             formato_salida=formato,
-            incluir_graficos=incluir_graficos
+            incluir_graficos=incluir_graficos,
+            detalle_completo=detalle_completo
         )
         
         # Generar reporte usando el generador
         generador = GeneradorReportes()
         
+        # Las salidas se cierran (y se borran si pasaron a disco) al cerrar la respuesta
         if formato == 'pdf':
-            pdf_path = generador.generar_pdf_reporte(obras, config, estadisticas)
-            
-            with open(pdf_path, 'rb') as f:
-                response = HttpResponse(f.read(), content_type='application/pdf')
-                response['Content-Disposition'] = f'attachment; filename="{nombre_reporte}.pdf"'
-            
-            # Limpiar archivo temporal
-            os.unlink(pdf_path)
-            return response
+            salida = generador.generar_pdf_reporte(
+                obras, config, estadisticas, destino=SalidaReporte(f'{nombre_reporte}.pdf')
+            )
+            return salida.respuesta()
             
         elif formato == 'excel':
-            excel_path = generador.generar_excel_reporte(obras, config, estadisticas)
-            
-            with open(excel_path, 'rb') as f:
-                response = HttpResponse(
-                    f.read(),
-                    content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-                )
-                response['Content-Disposition'] = f'attachment; filename="{nombre_reporte}.xlsx"'
-            
-            # Limpiar archivo temporal
-            os.unlink(excel_path)
-            return response
+            salida = generador.generar_excel_reporte(
+                obras, config, estadisticas, destino=SalidaReporte(f'{nombre_reporte}.xlsx')
+            )
+            return salida.respuesta()
             
         elif formato == 'ambos':
             # Generar ambos y crear ZIP
-            pdf_path = generador.generar_pdf_reporte(obras, config, estadisticas)
-            excel_path = generador.generar_excel_reporte(obras, config, estadisticas)
-            
-            # Crear ZIP en memoria
-            zip_buffer = BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                zip_file.write(pdf_path, f'{nombre_reporte}.pdf')
-                zip_file.write(excel_path, f'{nombre_reporte}.xlsx')
-            
-            # Limpiar archivos temporales
-            os.unlink(pdf_path)
-            os.unlink(excel_path)
-            
-            zip_buffer.seek(0)
-            response = HttpResponse(zip_buffer, content_type='application/zip')
-            response['Content-Disposition'] = f'attachment; filename="{nombre_reporte}.zip"'
-            return response
+            salida = SalidaReporte(f'{nombre_reporte}.zip')
+            with zipfile.ZipFile(salida, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+                with generador.generar_pdf_reporte(obras, config, estadisticas) as pdf:
+                    pdf.seek(0)
+                    with zip_file.open(f'{nombre_reporte}.pdf', 'w') as entrada:
+                        shutil.copyfileobj(pdf, entrada)
+                with generador.generar_excel_reporte(obras, config, estadisticas) as excel:
+                    excel.seek(0)
+                    with zip_file.open(f'{nombre_reporte}.xlsx', 'w') as entrada:
+                        shutil.copyfileobj(excel, entrada)
+            return salida.respuesta()
             
         else:
             return JsonResponse({'error': 'Formato no soportado'}, status=400)
@@ -258,56 +239,11 @@ def generar_reporte(request):
         traceback.print_exc()
         return JsonResponse({'error': str(e)}, status=500)
 
-def _calcular_estadisticas(obras):
-    """Calcula estadísticas para el reporte"""
+def _calcular_estadisticas(fecha_corte=None):
+    """Calcula estadísticas para el reporte (desde el caché columnar)"""
+    from .cache_columnar import estadisticas_columnares
     try:
-        total_obras = len(obras)
-        
-        # Calcular presupuesto total
-        presupuesto_total = 0
-        for obra in obras:
-            presupuesto = getattr(obra, 'presupuesto_modificado', 0) or 0
-            if presupuesto <= 0:
-                presupuesto = getattr(obra, 'anteproyecto_total', 0) or 0
-            presupuesto_total += float(presupuesto)
-        
-        # Calcular beneficiarios totales
-        beneficiarios_total = 0
-        for obra in obras:
-            beneficiarios = getattr(obra, 'beneficiarios_directos', 0) or 0
-            beneficiarios_total += float(beneficiarios)
-        
-        # Calcular avance promedio
-        avance_total = 0
-        obras_con_avance = 0
-        for obra in obras:
-            avance = getattr(obra, 'avance_fisico_pct', 0) or 0
-            if avance > 0:
-                avance_total += float(avance)
-                obras_con_avance += 1
-        
-        avance_promedio = avance_total / obras_con_avance if obras_con_avance > 0 else 0
-        
-        # Calcular presupuesto promedio
-        presupuesto_promedio = presupuesto_total / total_obras if total_obras > 0 else 0
-        
-        # Obras por estado
-        obras_por_estado = {}
-        for obra in obras:
-            estado = getattr(obra, 'estatus_general', 'Desconocido') or 'Desconocido'
-            if estado in obras_por_estado:
-                obras_por_estado[estado] += 1
-            else:
-                obras_por_estado[estado] = 1
-        
-        return {
-            'total_obras': total_obras,
-            'presupuesto_total': presupuesto_total,
-            'beneficiarios_total': beneficiarios_total,
-            'avance_promedio': avance_promedio,
-            'presupuesto_promedio': presupuesto_promedio,
-            'obras_por_estado': obras_por_estado
-        }
+        return estadisticas_columnares(fecha_corte)
         
     except Exception as e:
         print(f"Error calculando estadísticas: {str(e)}")
@@ -171,6 +171,9 @@ export function ReportsView() {
       const params = new URLSearchParams({
         fecha_corte: formatFechaAPI(fechaCorte)
       });
+      if (direccionSeleccionada !== 'todas') {
+        params.append('direcciones[]', direccionSeleccionada);
+      }
       
       const response = await fetch(
         `${API_BASE_URL}/api/reportes/vista_previa/?${params}`
@@ -4,15 +4,41 @@ import axios from 'axios';
 
 const API_URL = 'http://127.0.0.1:8000/api/obras/';
 
+// Campos de la obra que usa el tablero (?fields= regresa solo estos)
+const CAMPOS_PROYECTO = [
+  'id', 'programa', 'observaciones', 'area_responsable', 'responsable_operativo',
+  'presupuesto_final', 'presupuesto_modificado', 'anteproyecto_total', 'monto_ejecutado',
+  'avance_fisico_pct', 'avance_financiero_pct', 'poblacion_objetivo_num', 'beneficiarios_directos',
+  'viabilidad_tecnica', 'viabilidad_presupuestal', 'viabilidad_juridica',
+  'viabilidad_temporal', 'viabilidad_administrativa', 'viabilidad_ejecucion_num',
+  'riesgo_nivel', 'riesgo_nivel_num', 'urgencia', 'urgencia_num',
+  'fecha_inicio_prog', 'fecha_termino_prog', 'ubicacion_especifica',
+  'solucion_ofrece', 'beneficio_ciudadania', 'problemas_identificados'
+].join(',');
+
+// Obras por página al cargar la cartera completa
+const TAMANO_PAGINA = 1000;
+
 export async function fetchProjects(): Promise<Project[]> {
   try {
-    const response = await fetch(API_URL);
-    if (!response.ok) throw new Error('Error conectando con Django');
-    
-    const data = await response.json();
-    
-    // Si Django pagina los resultados (results), úsalos. Si es array directo, úsalo.
-    const results = Array.isArray(data) ? data : data.results || [];
+    // La API pagina por cursor: seguir `next` hasta la última página
+    const results: any[] = [];
+    let url: string | null = `${API_URL}?page_size=${TAMANO_PAGINA}&fields=${CAMPOS_PROYECTO}`;
+    while (url) {
+      const response = await fetch(url);
+      if (!response.ok) throw new Error('Error conectando con Django');
+      
+      const data = await response.json();
+      
+      // Si Django pagina los resultados (results), úsalos. Si es array directo, úsalo.
+      if (Array.isArray(data)) {
+        results.push(...data);
+        url = null;
+      } else {
+        results.push(...(data.results || []));
+        url = data.next || null;
+      }
+    }
 
     return results.map((obra: any) => {
       // Presupuesto final según documentación: usar presupuesto_modificado si existe, sino anteproyecto_total